@@ -14,51 +14,87 @@ Usage:
     python a2a_servers/a2a_agent_server.py --agent strategy_trade --port 5004
     python a2a_servers/a2a_agent_server.py --agent forex --port 5005
     python a2a_servers/a2a_agent_server.py --agent risk --port 5006
+
+Requests are served on threads, each with its own agent instance checked
+out of a bounded pool (a2a_servers/agent_pool.py): A2A_CONCURRENCY agents,
+A2A_POOL_MAX_WAITING requests queued behind them, 429 + Retry-After beyond.
+
+GET /metrics serves request, latency, pool, cache and token metrics in the
+Prometheus text format (a2a_servers/metrics.py).
+
+GET /data/<query_name> returns a predefined query's rows as JSON, CSV or
+Arrow IPC without going through the agent (a2a_servers/data_endpoint.py).
+
+Replies are cached per question until the agent's data watermark moves
+(a2a_servers/response_cache.py).
+
+This is Flask's development server. For concurrent callers use the ASGI
+server (a2a_servers/a2a_asgi_server.py), which serves the same endpoints.
 """
 
 import sys
 import os
 import argparse
-from flask import Flask, request, jsonify
+import time
+from flask import Flask, g, request, jsonify
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from a2a_servers.agent_cards import AGENT_CARDS
-
-# Map agent names to their creation functions
-AGENT_FACTORIES = {
-    "market_intel": "agents.market_intel_agent:create_market_intel_agent",
-    "ml_analyst": "agents.ml_analyst_agent:create_ml_analyst_agent",
-    "tech_signal": "agents.tech_signal_agent:create_tech_signal_agent",
-    "strategy_trade": "agents.strategy_trade_agent:create_strategy_trade_agent",
-    "forex": "agents.forex_agent:create_forex_agent",
-    "risk": "agents.risk_agent:create_risk_agent",
-}
-
-
-def create_agent_from_name(agent_name: str):
-    """Dynamically import and create an agent by name."""
-    factory_path = AGENT_FACTORIES[agent_name]
-    module_path, func_name = factory_path.split(":")
-    module = __import__(module_path, fromlist=[func_name])
-    factory_func = getattr(module, func_name)
-    return factory_func()
-
-
-def create_a2a_app(agent_name: str) -> Flask:
+from a2a_servers.a2a_protocol import (
+    AGENT_FACTORIES,
+    a2a_response,
+    agent_card_payload,
+    create_agent_from_name,  # noqa: F401  (re-exported)
+    error_payload,
+    extract_message_text,
+    health_payload,
+    result_text,
+)
+from a2a_servers import data_endpoint
+from a2a_servers import metrics
+from a2a_servers.agent_pool import AgentPool, PoolFull
+from a2a_servers.response_cache import (
+    cache_headers,
+    cache_metadata,
+    get_response_cache,
+    not_modified,
+    wants_fresh,
+)
+from config.settings import (
+    A2A_CONCURRENCY,
+    A2A_POOL_MAX_WAITING,
+    A2A_POOL_PREWARM,
+    A2A_REQUEST_TIMEOUT_SEC,
+)
+
+
+def create_a2a_app(agent_name: str, concurrency: int = A2A_CONCURRENCY,
+                   max_waiting: int = A2A_POOL_MAX_WAITING,
+                   prewarm: int = A2A_POOL_PREWARM) -> Flask:
     """Create a Flask app that serves a single agent via A2A protocol."""
 
     app = Flask(__name__)
-    card = AGENT_CARDS[agent_name]
-
-    # Lazily create the agent on first request
-    _agent_cache = {}
-
-    def get_agent():
-        if "agent" not in _agent_cache:
-            _agent_cache["agent"] = create_agent_from_name(agent_name)
-        return _agent_cache["agent"]
+    cache = get_response_cache()
+
+    # One agent instance per concurrent request (agents aren't thread-safe)
+    pool = AgentPool(agent_name, concurrency, max_waiting)
+    pool.prewarm(prewarm)
+    app.config["AGENT_POOL"] = pool
+    metrics.register_agent(agent_name, pool=pool)
+
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.get("request_started")
+        if started is not None:
+            metrics.record_request(agent_name, request.path, response.status_code,
+                                   time.perf_counter() - started)
+        return response
 
     # =====================================================================
     # A2A Protocol Endpoints
@@ -67,22 +103,7 @@ def create_a2a_app(agent_name: str) -> Flask:
     @app.route("/.well-known/agent.json", methods=["GET"])
     def agent_card():
         """A2A agent discovery endpoint - returns the agent card."""
-        return jsonify({
-            "name": card["name"],
-            "description": card["description"],
-            "url": card["url"],
-            "version": "1.0.0",
-            "capabilities": {
-                "streaming": False,
-                "pushNotifications": False,
-            },
-            "defaultInputModes": card["input_modes"],
-            "defaultOutputModes": card["output_modes"],
-            "skills": [
-                {"id": cap, "name": cap.replace("_", " ").title()}
-                for cap in card["capabilities"]
-            ],
-        })
+        return jsonify(agent_card_payload(agent_name))
 
     @app.route("/a2a", methods=["POST"])
     def handle_a2a_message():
@@ -97,59 +118,79 @@ def create_a2a_app(agent_name: str) -> Flask:
                 return jsonify({"error": "No JSON body provided"}), 400
 
             # Extract the user message from A2A format
-            message_text = ""
-            if "message" in data:
-                msg = data["message"]
-                if isinstance(msg, str):
-                    message_text = msg
-                elif isinstance(msg, dict) and "parts" in msg:
-                    for part in msg["parts"]:
-                        if isinstance(part, dict) and "text" in part:
-                            message_text += part["text"]
-                        elif isinstance(part, str):
-                            message_text += part
-                elif isinstance(msg, dict) and "text" in msg:
-                    message_text = msg["text"]
-            elif "text" in data:
-                message_text = data["text"]
-            elif "query" in data:
-                message_text = data["query"]
+            message_text = extract_message_text(data)
 
             if not message_text:
                 return jsonify({"error": "No message text found in request"}), 400
 
+            # Same question over unchanged data -> cached reply
+            key = cache.key(agent_name, message_text)
+            if not wants_fresh(request.headers, data):
+                entry = cache.get(key)
+                if not_modified(request.headers, key, entry):
+                    return "", 304, cache_headers(key)
+                if entry is not None:
+                    return jsonify(a2a_response(
+                        agent_name, entry["text"], entry["agent_role"],
+                        cache_metadata(key, True, entry),
+                    )), 200, cache_headers(key)
+
             # Use CrewAI agent's kickoff method to process the message
-            agent = get_agent()
-            result = agent.kickoff(message_text)
+            try:
+                with pool.checkout(timeout=A2A_REQUEST_TIMEOUT_SEC) as agent, \
+                        metrics.observe_run(agent_name):
+                    result = agent.kickoff(message_text)
+            except PoolFull as e:
+                return jsonify(error_payload(agent_name, str(e))), 429, \
+                    {"Retry-After": str(e.retry_after)}
+            response_text = result_text(result)
+            cache.put(key, response_text, agent.role)
 
             # Return A2A formatted response
-            response_text = result.raw if hasattr(result, "raw") else str(result)
-
-            return jsonify({
-                "message": {
-                    "role": "agent",
-                    "parts": [{"text": response_text}],
-                },
-                "metadata": {
-                    "agent_name": card["name"],
-                    "agent_role": agent.role,
-                },
-            })
+            return jsonify(a2a_response(
+                agent_name, response_text, agent.role, cache_metadata(key, False),
+            )), 200, cache_headers(key)
 
         except Exception as e:
-            return jsonify({
-                "error": str(e),
-                "agent_name": card["name"],
-            }), 500
+            return jsonify(error_payload(agent_name, str(e))), 500
+
+    @app.route("/data", methods=["GET"])
+    def data_index():
+        """Predefined queries this agent can serve without the LLM."""
+        return jsonify(data_endpoint.index_payload(agent_name))
+
+    @app.route("/data/<query_name>", methods=["GET"])
+    def data_query(query_name):
+        """Rows of one predefined query as JSON, CSV or Arrow IPC."""
+        try:
+            fmt = data_endpoint.pick_format(request.args.get("format"),
+                                            request.headers.get("Accept"))
+            with metrics.observe_run(agent_name, source="data"):
+                result = data_endpoint.fetch(agent_name, query_name,
+                                             request.headers.get("If-None-Match"))
+        except data_endpoint.UnsupportedFormat as e:
+            return jsonify(error_payload(agent_name, str(e))), 406
+        except data_endpoint.UnknownQuery:
+            return jsonify({**error_payload(agent_name, f"Unknown query '{query_name}'"),
+                            **data_endpoint.index_payload(agent_name)}), 404
+        except Exception as e:
+            return jsonify(error_payload(agent_name, str(e))), 500
+
+        headers = data_endpoint.response_headers(result)
+        if result["not_modified"]:
+            return "", 304, headers
+        body, media_type = data_endpoint.render(result, fmt)
+        return app.response_class(body, mimetype=media_type.split(";")[0], headers=headers)
 
     @app.route("/health", methods=["GET"])
     def health_check():
-        """Simple health check endpoint."""
-        return jsonify({
-            "status": "healthy",
-            "agent": card["name"],
-            "capabilities": card["capabilities"],
-        })
+        """Health check with agent pool occupancy."""
+        return jsonify({**health_payload(agent_name), "pool": pool.stats()})
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics_endpoint():
+        """Prometheus scrape endpoint."""
+        return app.response_class(metrics.metrics_text(), content_type=metrics.CONTENT_TYPE)
 
     return app
 
@@ -181,10 +222,12 @@ def main():
     print(f"Listening on: http://{args.host}:{args.port}")
     print(f"Agent card: http://{args.host}:{args.port}/.well-known/agent.json")
     print(f"A2A endpoint: http://{args.host}:{args.port}/a2a")
+    print(f"Data (no LLM): http://{args.host}:{args.port}/data")
     print(f"Health check: http://{args.host}:{args.port}/health")
+    print(f"Metrics: http://{args.host}:{args.port}/metrics")
 
     app = create_a2a_app(args.agent)
-    app.run(host=args.host, port=args.port, debug=False)
+    app.run(host=args.host, port=args.port, debug=False, threaded=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,418 @@
+"""
+A2A Agent Server (ASGI) - the same endpoints as a2a_agent_server.py, served
+by uvicorn instead of Flask's development server.
+
+    GET  /.well-known/agent.json   agent card
+    POST /a2a                      message -> agent reply
+    POST /a2a/stream               message -> server-sent events (a2a_stream.py)
+    POST /tasks                    message -> task id at once (a2a_tasks.py)
+    GET  /tasks/<id>               task state / reply
+    POST /tasks/<id>/cancel        cancel a queued task
+    GET  /data[/<query_name>]      predefined query rows, no LLM (data_endpoint.py)
+    GET  /health                   liveness
+    GET  /metrics                  Prometheus text format (metrics.py)
+
+The event loop only parses requests and writes responses; `agent.kickoff`
+(30-90s of LLM + SQL) runs on worker threads, each with an agent instance
+checked out of a bounded pool (a2a_servers/agent_pool.py), so concurrent
+requests never share one CrewAI agent (they keep per-run state and are not
+safe for concurrent kickoff). A2A_CONCURRENCY requests run at once, up to
+A2A_POOL_MAX_WAITING more wait in line, and beyond that requests get 429
+with Retry-After.
+
+The streaming endpoint (also /a2a with Accept: text/event-stream) answers
+with a `status` event at once, then tokens, tool calls and SQL/LLM progress
+while the agent works, then the same reply POST /a2a would return.
+
+Replies are cached per question until the agent's data watermark moves
+(a2a_servers/response_cache.py).
+
+A request that exceeds A2A_REQUEST_TIMEOUT_SEC gets a 504. The worker thread
+can't be interrupted mid-kickoff, so it finishes in the background and its
+result is discarded.
+
+On SIGINT/SIGTERM uvicorn stops accepting connections and waits up to
+A2A_SHUTDOWN_GRACE_SEC for in-flight requests before the pool is shut down.
+
+Usage:
+    python a2a_servers/a2a_asgi_server.py --agent market_intel --port 5001
+    python a2a_servers/a2a_asgi_server.py --agent forex --port 5005 --concurrency 8 --timeout 120
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import contextlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from a2a_servers.agent_cards import AGENT_CARDS
+from a2a_servers.a2a_protocol import (
+    AGENT_FACTORIES,
+    a2a_response,
+    agent_card_payload,
+    error_payload,
+    extract_message_text,
+    health_payload,
+    result_text,
+)
+from a2a_servers import data_endpoint
+from a2a_servers import metrics
+from a2a_servers.agent_pool import AgentPool, PoolFull, PoolTimeout
+from a2a_servers.a2a_tasks import TaskManager, push_config
+from a2a_servers.a2a_stream import (
+    SSE_HEADERS,
+    RunStream,
+    bind_stream,
+    event_source,
+    sse,
+    wants_stream,
+)
+from a2a_servers.response_cache import (
+    cache_headers,
+    cache_metadata,
+    get_response_cache,
+    not_modified,
+    wants_fresh,
+)
+from config.settings import (
+    A2A_CONCURRENCY,
+    A2A_POOL_MAX_WAITING,
+    A2A_POOL_PREWARM,
+    A2A_REQUEST_TIMEOUT_SEC,
+    A2A_SHUTDOWN_GRACE_SEC,
+    A2A_STREAM_KEEPALIVE_SEC,
+    A2A_STREAM_TOKENS,
+)
+
+
+class AgentRunner:
+    """Runs kickoff on worker threads, each with an agent from the pool."""
+
+    def __init__(self, agent_name: str, concurrency: int = A2A_CONCURRENCY,
+                 max_waiting: int = A2A_POOL_MAX_WAITING, prewarm: int = A2A_POOL_PREWARM):
+        self.agent_name = agent_name
+        self.concurrency = concurrency
+        self.pool = AgentPool(agent_name, concurrency, max_waiting)
+        self.pool.prewarm(prewarm)
+        # A thread per running or queued request; the pool bounds both
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency + max_waiting, thread_name_prefix=f"a2a-{agent_name}",
+        )
+        self._lock = threading.Lock()
+        self.in_flight = 0
+
+    def _kickoff(self, message_text: str, stream: RunStream | None,
+                 deadline: float) -> tuple[str, str]:
+        # Don't wait for an agent past the request's own deadline
+        try:
+            with self.pool.checkout(timeout=max(deadline - time.monotonic(), 0)) as agent:
+                with metrics.observe_run(self.agent_name), bind_stream(stream, agent):
+                    return result_text(agent.kickoff(message_text)), agent.role
+        except PoolTimeout:
+            raise asyncio.TimeoutError() from None  # waited the whole timeout: 504
+
+    async def run(self, message_text: str, timeout: float,
+                  stream: RunStream | None = None) -> tuple[str, str]:
+        """(response_text, agent_role). Raises asyncio.TimeoutError, or
+        PoolFull when every agent is busy and the queue is full.
+        Progress of the run is sent to `stream`, if given."""
+        self.pool.reject_if_full()
+        with self._lock:
+            self.in_flight += 1
+        try:
+            future = self._executor.submit(self._kickoff, message_text, stream,
+                                           time.monotonic() + timeout)
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def create_asgi_app(agent_name: str, concurrency: int = A2A_CONCURRENCY,
+                    request_timeout: float = A2A_REQUEST_TIMEOUT_SEC,
+                    card_url: str | None = None,
+                    max_waiting: int = A2A_POOL_MAX_WAITING,
+                    prewarm: int = A2A_POOL_PREWARM) -> Starlette:
+    """Create an ASGI app that serves a single agent via A2A protocol.
+
+    `card_url` replaces the URL advertised in the agent card (default: the
+    card's own per-port URL).
+    """
+
+    if A2A_STREAM_TOKENS:
+        from config.llm_factory import stream_llm_responses
+
+        stream_llm_responses(True)
+    runner = AgentRunner(agent_name, concurrency, max_waiting, prewarm)
+    cache = get_response_cache()
+    tasks = TaskManager(agent_name, runner, cache)
+
+    async def agent_card(request: Request):
+        """A2A agent discovery endpoint - returns the agent card."""
+        return JSONResponse(agent_card_payload(agent_name, streaming=True, push_notifications=True, url=card_url))
+
+    def busy_response(e: PoolFull):
+        return JSONResponse(error_payload(agent_name, str(e)), status_code=429,
+                            headers={"Retry-After": str(e.retry_after)})
+
+    async def read_message(request: Request):
+        """(body, message text), or (400 response, None)."""
+        try:
+            data = await request.json()
+        except ValueError:
+            data = None
+        if not data or not isinstance(data, dict):
+            return JSONResponse({"error": "No JSON body provided"}, status_code=400), None
+
+        message_text = extract_message_text(data)
+        if not message_text:
+            return JSONResponse({"error": "No message text found in request"}, status_code=400), None
+        return data, message_text
+
+    async def handle_a2a_message(request: Request):
+        """A2A message handler - accepts a message and returns the agent's response."""
+        data, message_text = await read_message(request)
+        if message_text is None:
+            return data
+        if wants_stream(request.headers):
+            return await stream_reply(request, data, message_text)
+
+        # Same question over unchanged data -> cached reply (the key needs the
+        # watermarks, which may cost a SQL round trip: keep it off the loop)
+        key = await asyncio.to_thread(cache.key, agent_name, message_text)
+        if not wants_fresh(request.headers, data):
+            entry = cache.get(key)
+            if not_modified(request.headers, key, entry):
+                return Response(status_code=304, headers=cache_headers(key))
+            if entry is not None:
+                return JSONResponse(
+                    a2a_response(agent_name, entry["text"], entry["agent_role"],
+                                 cache_metadata(key, True, entry)),
+                    headers=cache_headers(key),
+                )
+
+        try:
+            response_text, agent_role = await runner.run(message_text, request_timeout)
+        except PoolFull as e:
+            return busy_response(e)
+        except asyncio.TimeoutError:
+            return JSONResponse(
+                error_payload(agent_name, f"Agent did not respond within {request_timeout:.0f}s"),
+                status_code=504,
+            )
+        except Exception as e:
+            return JSONResponse(error_payload(agent_name, str(e)), status_code=500)
+
+        cache.put(key, response_text, agent_role)
+        return JSONResponse(
+            a2a_response(agent_name, response_text, agent_role, cache_metadata(key, False)),
+            headers=cache_headers(key),
+        )
+
+    async def handle_a2a_stream(request: Request):
+        """Streaming A2A handler - the reply as server-sent events."""
+        data, message_text = await read_message(request)
+        if message_text is None:
+            return data
+        return await stream_reply(request, data, message_text)
+
+    async def stream_reply(request: Request, data: dict, message_text: str):
+        key = await asyncio.to_thread(cache.key, agent_name, message_text)
+        entry = None if wants_fresh(request.headers, data) else cache.get(key)
+        status = sse("status", {"state": "working", "agent_name": AGENT_CARDS[agent_name]["name"]})
+
+        if entry is not None:
+            async def cached():
+                yield status
+                yield sse("message", a2a_response(agent_name, entry["text"], entry["agent_role"],
+                                                  cache_metadata(key, True, entry)))
+            return StreamingResponse(cached(), media_type="text/event-stream",
+                                     headers=SSE_HEADERS)
+
+        try:
+            runner.pool.reject_if_full()  # still possible to answer 429 here
+        except PoolFull as e:
+            return busy_response(e)
+        stream = RunStream(asyncio.get_running_loop())
+
+        async def run_and_cache():
+            # Cached even if the client disconnects before the reply is ready
+            response_text, agent_role = await runner.run(message_text, request_timeout, stream)
+            cache.put(key, response_text, agent_role)
+            return response_text, agent_role
+
+        def on_result(result):
+            response_text, agent_role = result
+            return sse("message", a2a_response(agent_name, response_text, agent_role,
+                                               cache_metadata(key, False)))
+
+        def on_error(e):
+            if isinstance(e, PoolFull):
+                return sse("error", {**error_payload(agent_name, str(e)), "status": 429,
+                                     "retry_after": e.retry_after})
+            if isinstance(e, asyncio.TimeoutError):
+                return sse("error", {**error_payload(
+                    agent_name, f"Agent did not respond within {request_timeout:.0f}s"),
+                    "status": 504})
+            return sse("error", {**error_payload(agent_name, str(e)), "status": 500})
+
+        async def events():
+            yield status
+            run = asyncio.ensure_future(run_and_cache())
+            async for frame in event_source(stream, run, A2A_STREAM_KEEPALIVE_SEC,
+                                            on_result, on_error):
+                yield frame
+
+        return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+    async def submit_task(request: Request):
+        """Queue a message as a background task; reply with its id at once."""
+        data, message_text = await read_message(request)
+        if message_text is None:
+            return data
+        try:
+            push = push_config(data)
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+
+        key = await asyncio.to_thread(cache.key, agent_name, message_text)
+        task = await tasks.submit(message_text, key, wants_fresh(request.headers, data), push)
+        if task is None:
+            return JSONResponse(error_payload(agent_name, "Task queue is full"),
+                                status_code=503, headers={"Retry-After": "30"})
+        return JSONResponse(task, status_code=202,
+                            headers={"Location": f"{request.url.path.rstrip('/')}/{task['id']}"})
+
+    async def get_task(request: Request):
+        task = await tasks.get(request.path_params["task_id"])
+        if task is None:
+            return JSONResponse(error_payload(agent_name, "Unknown task"), status_code=404)
+        return JSONResponse(task)
+
+    async def cancel_task(request: Request):
+        task = await tasks.cancel(request.path_params["task_id"])
+        if task is None:
+            return JSONResponse(error_payload(agent_name, "Unknown task"), status_code=404)
+        if task["status"]["state"] != "canceled":
+            return JSONResponse(task, status_code=409)
+        return JSONResponse(task)
+
+    async def data_index(request: Request):
+        """Predefined queries this agent can serve without the LLM."""
+        return JSONResponse(data_endpoint.index_payload(agent_name))
+
+    def fetch_data(query_name: str, if_none_match: str | None) -> dict:
+        with metrics.observe_run(agent_name, source="data"):
+            return data_endpoint.fetch(agent_name, query_name, if_none_match)
+
+    async def data_query(request: Request):
+        """Rows of one predefined query as JSON, CSV or Arrow IPC."""
+        query_name = request.path_params["query_name"]
+        try:
+            fmt = data_endpoint.pick_format(request.query_params.get("format"),
+                                            request.headers.get("accept"))
+            result = await asyncio.to_thread(fetch_data, query_name,
+                                             request.headers.get("if-none-match"))
+        except data_endpoint.UnsupportedFormat as e:
+            return JSONResponse(error_payload(agent_name, str(e)), status_code=406)
+        except data_endpoint.UnknownQuery:
+            return JSONResponse({**error_payload(agent_name, f"Unknown query '{query_name}'"),
+                                 **data_endpoint.index_payload(agent_name)}, status_code=404)
+        except Exception as e:
+            return JSONResponse(error_payload(agent_name, str(e)), status_code=500)
+
+        headers = data_endpoint.response_headers(result)
+        if result["not_modified"]:
+            return Response(status_code=304, headers=headers)
+        body, media_type = data_endpoint.render(result, fmt)
+        return Response(body, media_type=media_type, headers=headers)
+
+    async def health_check(request: Request):
+        """Health check with agent pool occupancy."""
+        return JSONResponse({**health_payload(agent_name), "pool": runner.pool.stats()})
+
+    async def metrics_endpoint(request: Request):
+        return Response(metrics.metrics_text(), media_type=metrics.CONTENT_TYPE)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        await tasks.start()
+        yield
+        await tasks.stop()
+        runner.shutdown()
+
+    app = Starlette(
+        routes=[
+            Route("/.well-known/agent.json", agent_card, methods=["GET"]),
+            Route("/a2a", handle_a2a_message, methods=["POST"]),
+            Route("/a2a/stream", handle_a2a_stream, methods=["POST"]),
+            Route("/tasks", submit_task, methods=["POST"]),
+            Route("/tasks/{task_id}", get_task, methods=["GET"]),
+            Route("/tasks/{task_id}/cancel", cancel_task, methods=["POST"]),
+            Route("/data", data_index, methods=["GET"]),
+            Route("/data/{query_name}", data_query, methods=["GET"]),
+            Route("/health", health_check, methods=["GET"]),
+            Route("/metrics", metrics_endpoint, methods=["GET"]),
+        ],
+        middleware=[Middleware(metrics.MetricsMiddleware, agent_name=agent_name)],
+        lifespan=lifespan,
+    )
+    metrics.register_agent(agent_name, runner=runner, tasks=tasks)
+    app.state.runner = runner
+    app.state.tasks = tasks
+    return app
+
+
+def main():
+    """Launch a single A2A agent server under uvicorn."""
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="A2A Agent Server (ASGI)")
+    parser.add_argument("--agent", required=True, choices=list(AGENT_FACTORIES.keys()),
+                        help="Which agent to serve")
+    parser.add_argument("--port", type=int, default=5001, help="Port to listen on (default: 5001)")
+    parser.add_argument("--host", default="0.0.0.0", help="Host to bind to (default: 0.0.0.0)")
+    parser.add_argument("--concurrency", type=int, default=A2A_CONCURRENCY,
+                        help=f"Concurrent agent runs (default: {A2A_CONCURRENCY})")
+    parser.add_argument("--timeout", type=float, default=A2A_REQUEST_TIMEOUT_SEC,
+                        help=f"Per-request timeout in seconds (default: {A2A_REQUEST_TIMEOUT_SEC:.0f})")
+    args = parser.parse_args()
+
+    print(f"Starting A2A server for: {AGENT_CARDS[args.agent]['name']}")
+    print(f"Listening on: http://{args.host}:{args.port}")
+    print(f"Concurrency: {args.concurrency} agent run(s), timeout {args.timeout:.0f}s")
+    print(f"Agent card: http://{args.host}:{args.port}/.well-known/agent.json")
+    print(f"A2A endpoint: http://{args.host}:{args.port}/a2a")
+    print(f"Streaming (SSE): http://{args.host}:{args.port}/a2a/stream")
+    print(f"Async tasks: http://{args.host}:{args.port}/tasks")
+    print(f"Data (no LLM): http://{args.host}:{args.port}/data")
+    print(f"Health check: http://{args.host}:{args.port}/health")
+    print(f"Metrics: http://{args.host}:{args.port}/metrics")
+
+    app = create_asgi_app(args.agent, args.concurrency, args.timeout)
+    uvicorn.run(
+        app,
+        host=args.host,
+        port=args.port,
+        timeout_graceful_shutdown=A2A_SHUTDOWN_GRACE_SEC,
+        log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
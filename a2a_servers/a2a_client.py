@@ -0,0 +1,298 @@
+"""
+Async A2A client: one keep-alive connection pool for many agents.
+
+    async with A2AClient() as client:
+        card = await client.discover("http://localhost:5005")
+        reply = await client.send("http://localhost:5005", "USD/INR outlook?", timeout=120)
+        replies = await client.fan_out({
+            "forex": ("http://localhost:5005", "USD/INR outlook?"),
+            "risk": ("http://localhost:5006", "Any high-risk warnings?"),
+        })
+
+  - connections    one httpx.AsyncClient, so repeated calls to an agent reuse
+                   its TCP connection instead of opening one per request
+  - discovery      /.well-known/agent.json is cached per base URL for
+                   A2A_CLIENT_CARD_TTL_SEC; concurrent lookups share one fetch
+  - deadlines      every call has one overall deadline (timeout=); retries
+                   and hedges only spend what is left of it
+  - retries        connection errors, 429, 502, 503 and 504 are retried (up
+                   to A2A_CLIENT_MAX_ATTEMPTS, honouring Retry-After) while
+                   the deadline allows
+  - hedging        with hedge_after=N, a call that hasn't answered after N
+                   seconds is sent again; the first good answer wins and the
+                   other is cancelled. Discovery and task polls hedge by
+                   default; messages only when asked (A2A_CLIENT_HEDGE_AFTER_SEC),
+                   because a hedged message can run the agent twice unless
+                   the server's reply cache answers it
+  - fan_out        sends to many agents at once; each agent's reply, or its
+                   error, comes back under its name, so one slow or offline
+                   agent doesn't fail the rest
+
+Replies are dicts: {"agent", "text", "status", "cache", "attempts",
+"hedged", "elapsed_sec"} plus "error" for a failed agent in fan_out.
+"""
+
+import asyncio
+import sys
+import os
+import time
+
+import httpx
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from a2a_servers.agent_cards import AGENT_CARDS
+from config.settings import (
+    A2A_CLIENT_CARD_TTL_SEC,
+    A2A_CLIENT_HEDGE_AFTER_SEC,
+    A2A_CLIENT_MAX_ATTEMPTS,
+    A2A_CLIENT_TIMEOUT_SEC,
+)
+
+RETRY_STATUSES = {429, 502, 503, 504}
+DISCOVERY_TIMEOUT_SEC = 10
+DISCOVERY_HEDGE_SEC = 1.0
+BACKOFF_BASE_SEC = 0.5
+
+
+class A2AError(Exception):
+    """An agent call that failed for good (after any retries)."""
+
+    def __init__(self, message: str, status: int | None = None, attempts: int = 1):
+        super().__init__(message)
+        self.status = status
+        self.attempts = attempts
+
+
+class A2ATimeout(A2AError):
+    """The call's deadline passed before an answer came back."""
+
+
+def agent_urls(host_url: str | None = None, agents=None) -> dict[str, str]:
+    """{agent_name: base_url}: the per-agent ports from the agent cards, or
+    /agents/<name> on a multi-agent host (a2a_host.py) when host_url is given."""
+    names = agents or list(AGENT_CARDS)
+    if host_url:
+        return {name: f"{host_url.rstrip('/')}/agents/{name}" for name in names}
+    return {name: AGENT_CARDS[name]["url"] for name in names}
+
+
+def message_body(text: str, fresh: bool = False) -> dict:
+    body = {"message": {"role": "user", "parts": [{"text": text}]}}
+    if fresh:
+        body["cache"] = False
+    return body
+
+
+def reply_text(data: dict) -> str:
+    if "message" in data and "parts" in data["message"]:
+        return "".join(p.get("text", "") for p in data["message"]["parts"] if isinstance(p, dict))
+    return str(data)
+
+
+def _retry_after(response: httpx.Response | None, attempt: int) -> float:
+    if response is not None:
+        try:
+            return float(response.headers["Retry-After"])
+        except (KeyError, ValueError):
+            pass
+    return BACKOFF_BASE_SEC * 2 ** (attempt - 1)
+
+
+class A2AClient:
+    """Shared connection pool, card cache and retry policy for A2A calls."""
+
+    def __init__(self, timeout: float = A2A_CLIENT_TIMEOUT_SEC,
+                 hedge_after: float | None = A2A_CLIENT_HEDGE_AFTER_SEC or None,
+                 max_attempts: int = A2A_CLIENT_MAX_ATTEMPTS,
+                 card_ttl: float = A2A_CLIENT_CARD_TTL_SEC,
+                 max_connections: int = 32):
+        self.timeout = timeout
+        self.hedge_after = hedge_after
+        self.max_attempts = max(1, max_attempts)
+        self.card_ttl = card_ttl
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections),
+            headers={"User-Agent": "a2a-client"},
+        )
+        self._cards: dict = {}       # base_url -> (card, fetched_at)
+        self._card_fetches: dict = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    # -- transport ---------------------------------------------------------
+
+    async def _attempt(self, method: str, url: str, deadline: float,
+                       hedge_after: float | None, **kwargs) -> tuple[httpx.Response, bool]:
+        """One logical attempt, hedged once if it is slow. Returns the first
+        good response (or the last failure) and whether a hedge was sent."""
+        loop = asyncio.get_running_loop()
+
+        def start():
+            remaining = max(deadline - loop.time(), 0.001)
+            return asyncio.ensure_future(self._http.request(method, url, timeout=remaining, **kwargs))
+
+        tasks = [start()]
+        hedge_at = loop.time() + hedge_after if hedge_after else None
+        hedged = False
+        last = None
+        try:
+            while tasks:
+                hedge_pending = hedge_at is not None and not hedged and hedge_at < deadline
+                wait_until = hedge_at if hedge_pending else deadline
+                done, _ = await asyncio.wait(tasks, timeout=max(wait_until - loop.time(), 0),
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if hedge_pending:
+                        tasks.append(start())
+                        hedged = True
+                        continue
+                    raise A2ATimeout(f"No answer from {url} before the deadline")
+                for task in done:
+                    tasks.remove(task)
+                    if task.exception() is None and task.result().status_code not in RETRY_STATUSES:
+                        return task.result(), hedged
+                    last = task.exception() or task.result()
+            if isinstance(last, BaseException):
+                raise last
+            return last, hedged
+        finally:
+            for task in tasks:  # the losing hedge, or everything at the deadline
+                task.cancel()
+                task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    async def request(self, method: str, url: str, timeout: float | None = None,
+                      hedge_after: float | None = None, **kwargs) -> tuple[httpx.Response, dict]:
+        """(response, {"attempts", "hedged"}) for a call retried on transient
+        failures within one deadline. Raises A2AError / A2ATimeout."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (timeout or self.timeout)
+        hedged = False
+        for attempt in range(1, self.max_attempts + 1):
+            response = None
+            try:
+                response, was_hedged = await self._attempt(method, url, deadline, hedge_after, **kwargs)
+                hedged = hedged or was_hedged
+                if response.status_code not in RETRY_STATUSES:
+                    return response, {"attempts": attempt, "hedged": hedged}
+                failure = f"HTTP {response.status_code}"
+            except httpx.TimeoutException:
+                raise A2ATimeout(f"No answer from {url} before the deadline", attempts=attempt) from None
+            except A2ATimeout as e:
+                e.attempts = attempt
+                raise
+            except httpx.TransportError as e:
+                failure = f"{type(e).__name__}: {e}"
+            delay = _retry_after(response, attempt)
+            if attempt == self.max_attempts or loop.time() + delay >= deadline:
+                raise A2AError(f"{url}: {failure}", response.status_code if response is not None else None,
+                               attempt)
+            await asyncio.sleep(delay)
+
+    # -- A2A ---------------------------------------------------------------
+
+    async def discover(self, base_url: str, refresh: bool = False) -> dict:
+        """The agent card, cached for card_ttl seconds."""
+        base_url = base_url.rstrip("/")
+        cached = self._cards.get(base_url)
+        if cached is not None and not refresh and time.monotonic() - cached[1] < self.card_ttl:
+            return cached[0]
+        fetch = self._card_fetches.get(base_url)
+        if fetch is None:
+            fetch = asyncio.ensure_future(self._fetch_card(base_url))
+            self._card_fetches[base_url] = fetch
+            fetch.add_done_callback(lambda _: self._card_fetches.pop(base_url, None))
+        return await asyncio.shield(fetch)
+
+    async def _fetch_card(self, base_url: str) -> dict:
+        response, _ = await self.request("GET", f"{base_url}/.well-known/agent.json",
+                                         timeout=DISCOVERY_TIMEOUT_SEC, hedge_after=DISCOVERY_HEDGE_SEC)
+        if response.status_code != 200:
+            raise A2AError(f"{base_url}: agent card HTTP {response.status_code}", response.status_code)
+        card = response.json()
+        self._cards[base_url] = (card, time.monotonic())
+        return card
+
+    async def send(self, base_url: str, text: str, timeout: float | None = None,
+                   fresh: bool = False, hedge_after: float | None = None) -> dict:
+        """Ask one agent; the reply dict. Raises A2AError / A2ATimeout."""
+        started = time.perf_counter()
+        response, info = await self.request(
+            "POST", f"{base_url.rstrip('/')}/a2a", timeout=timeout,
+            hedge_after=self.hedge_after if hedge_after is None else hedge_after,
+            json=message_body(text, fresh),
+        )
+        if response.status_code != 200:
+            raise A2AError(f"{base_url}: HTTP {response.status_code}: {response.text[:300]}",
+                           response.status_code, info["attempts"])
+        data = response.json()
+        metadata = data.get("metadata", {})
+        return {
+            "agent": metadata.get("agent_name", base_url),
+            "text": reply_text(data),
+            "status": response.status_code,
+            "cache": metadata.get("cache"),
+            **info,
+            "elapsed_sec": round(time.perf_counter() - started, 3),
+        }
+
+    async def run_task(self, base_url: str, text: str, timeout: float | None = None,
+                       poll_sec: float = 5) -> dict:
+        """Submit a /tasks task and poll it to completion; the reply dict."""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        deadline = loop.time() + (timeout or self.timeout)
+        base_url = base_url.rstrip("/")
+        response, _ = await self.request("POST", f"{base_url}/tasks", timeout=DISCOVERY_TIMEOUT_SEC,
+                                         json=message_body(text))
+        if response.status_code not in (200, 202):
+            raise A2AError(f"{base_url}: task submit HTTP {response.status_code}", response.status_code)
+        task = response.json()
+        while task["status"]["state"] in ("submitted", "working"):
+            if loop.time() + poll_sec >= deadline:
+                raise A2ATimeout(f"Task {task['id']} still {task['status']['state']} at the deadline")
+            await asyncio.sleep(poll_sec)
+            response, _ = await self.request("GET", f"{base_url}/tasks/{task['id']}",
+                                             timeout=min(DISCOVERY_TIMEOUT_SEC, deadline - loop.time()),
+                                             hedge_after=DISCOVERY_HEDGE_SEC)
+            if response.status_code != 200:
+                raise A2AError(f"{base_url}: task poll HTTP {response.status_code}", response.status_code)
+            task = response.json()
+        if task["status"]["state"] != "completed":
+            raise A2AError(f"Task {task['status']['state']}: {task['status'].get('error', '')}")
+        metadata = task["result"].get("metadata", {})
+        return {
+            "agent": metadata.get("agent_name", base_url),
+            "text": reply_text(task["result"]),
+            "status": 200,
+            "cache": metadata.get("cache"),
+            "task_id": task["id"],
+            "elapsed_sec": round(time.perf_counter() - started, 3),
+        }
+
+    async def fan_out(self, calls: dict, timeout: float | None = None,
+                      tasks: bool = False, **kwargs) -> dict:
+        """{name: (base_url, text)} -> {name: reply}, all sent at once. A
+        failed agent's entry is {"error", "status", "elapsed_sec"} instead."""
+        async def one(base_url, text):
+            started = time.perf_counter()
+            try:
+                if tasks:
+                    return await self.run_task(base_url, text, timeout=timeout, **kwargs)
+                return await self.send(base_url, text, timeout=timeout, **kwargs)
+            except (A2AError, httpx.HTTPError, ValueError) as e:
+                return {"error": str(e) or type(e).__name__, "status": getattr(e, "status", None),
+                        "elapsed_sec": round(time.perf_counter() - started, 3)}
+
+        names = list(calls)
+        results = await asyncio.gather(*(one(*calls[name]) for name in names))
+        return dict(zip(names, results))
@@ -4,92 +4,145 @@ A2A Client Example - Shows how to communicate with the agent servers.
 This demonstrates how external systems (Power BI, chatbots, other agents)
 can call your specialist agents via the A2A protocol.
 
+By default it is a small "briefing over A2A": every agent is discovered and
+asked its question at the same time through the async client library
+(a2a_servers/a2a_client.py: keep-alive connections, cached agent cards,
+deadlines, retries), so the briefing takes as long as the slowest agent, not
+the sum of all six.
+
+Long-running questions can be submitted as tasks instead (ASGI server /
+multi-agent host): POST /tasks returns a task id at once and the reply is
+collected by polling, so a dropped connection doesn't lose the work.
+
+The synchronous helpers below (discover_agent, send_message, ...) share one
+requests.Session, for scripts that call a single agent.
+
 Usage:
     python a2a_servers/a2a_client_example.py
+    python a2a_servers/a2a_client_example.py --tasks
+    python a2a_servers/a2a_client_example.py --host http://localhost:5000 --timeout 120
 """
 
 import sys
 import os
+import time
+import argparse
+import asyncio
 import requests
-import json
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from a2a_servers.a2a_client import A2AClient, agent_urls, message_body, reply_text
 from a2a_servers.agent_cards import AGENT_CARDS
+from config.settings import A2A_CLIENT_TIMEOUT_SEC
+
+# Example queries for each agent
+EXAMPLE_QUERIES = {
+    "market_intel": "What is the overall market sentiment for NASDAQ and NSE today?",
+    "ml_analyst": "Which ML model has the best 7-day accuracy?",
+    "tech_signal": "What are the strongest active buy signals?",
+    "strategy_trade": "Show me the top TIER 1 trade opportunities today.",
+    "forex": "What is the current USD/INR rate and trend?",
+    "risk": "Are there any high-risk warnings or conflicting signals?",
+}
+
+_session = requests.Session()
 
 
 def discover_agent(base_url: str) -> dict:
     """Discover an agent's capabilities via its agent card."""
-    resp = requests.get(f"{base_url}/.well-known/agent.json")
+    resp = _session.get(f"{base_url}/.well-known/agent.json", timeout=10)
     resp.raise_for_status()
     return resp.json()
 
 
-def send_message(base_url: str, message: str) -> str:
+def send_message(base_url: str, message: str, timeout: float = A2A_CLIENT_TIMEOUT_SEC) -> str:
     """Send a message to an agent and get the response."""
-    resp = requests.post(
-        f"{base_url}/a2a",
-        json={
-            "message": {
-                "role": "user",
-                "parts": [{"text": message}],
-            }
-        },
-        headers={"Content-Type": "application/json"},
-    )
+    resp = _session.post(f"{base_url}/a2a", json=message_body(message), timeout=timeout)
+    resp.raise_for_status()
+    return reply_text(resp.json())
+
+
+def submit_task(base_url: str, message: str, push_url: str | None = None) -> str:
+    """Submit a message as a background task and return the task id."""
+    body = message_body(message)
+    if push_url:
+        body["pushNotification"] = {"url": push_url}
+    resp = _session.post(f"{base_url}/tasks", json=body, timeout=30)
+    resp.raise_for_status()
+    return resp.json()["id"]
+
+
+def get_task(base_url: str, task_id: str) -> dict:
+    """Current state of a task (with its reply once completed)."""
+    resp = _session.get(f"{base_url}/tasks/{task_id}", timeout=30)
     resp.raise_for_status()
-    data = resp.json()
+    return resp.json()
 
-    # Extract response text
-    if "message" in data and "parts" in data["message"]:
-        return data["message"]["parts"][0].get("text", "")
-    return str(data)
+
+def wait_for_task(base_url: str, task_id: str, poll_sec: float = 5, timeout: float = 900) -> str:
+    """Poll a task until it finishes and return the reply text."""
+    deadline = time.monotonic() + timeout
+    while True:
+        task = get_task(base_url, task_id)
+        state = task["status"]["state"]
+        if state == "completed":
+            return reply_text(task["result"])
+        if state in ("failed", "canceled"):
+            raise RuntimeError(f"Task {state}: {task['status'].get('error', '')}")
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Task {task_id} still {state} after {timeout:.0f}s")
+        time.sleep(poll_sec)
+
+
+async def briefing(base_urls: dict[str, str], timeout: float, tasks: bool = False) -> dict:
+    """Discover every agent and ask its example question, all in parallel."""
+    async with A2AClient(timeout=timeout) as client:
+        cards = await asyncio.gather(*(client.discover(url) for url in base_urls.values()),
+                                     return_exceptions=True)
+        online = {}
+        for (name, url), card in zip(base_urls.items(), cards):
+            if isinstance(card, Exception):
+                print(f"  OFFLINE - {name} ({url}): {card}")
+                continue
+            print(f"  Discovered: {card['name']}  skills: {[s['name'] for s in card.get('skills', [])]}")
+            online[name] = (url, EXAMPLE_QUERIES[name])
+        return await client.fan_out(online, tasks=tasks)
 
 
 def main():
-    """Example: Discover and query each agent."""
+    """Example: discover and query every agent in parallel."""
+    parser = argparse.ArgumentParser(description="A2A client example")
+    parser.add_argument("--tasks", action="store_true",
+                        help="Submit each query as a task and poll for the reply")
+    parser.add_argument("--host", default=None,
+                        help="Multi-agent host URL (agents under /agents/<name>) instead of ports 5001-5006")
+    parser.add_argument("--timeout", type=float, default=A2A_CLIENT_TIMEOUT_SEC,
+                        help=f"Deadline per agent in seconds (default: {A2A_CLIENT_TIMEOUT_SEC:.0f})")
+    args = parser.parse_args()
+
     print("=" * 60)
     print("A2A CLIENT EXAMPLE")
     print("=" * 60)
 
-    # Example queries for each agent
-    example_queries = {
-        "market_intel": "What is the overall market sentiment for NASDAQ and NSE today?",
-        "ml_analyst": "Which ML model has the best 7-day accuracy?",
-        "tech_signal": "What are the strongest active buy signals?",
-        "strategy_trade": "Show me the top TIER 1 trade opportunities today.",
-        "forex": "What is the current USD/INR rate and trend?",
-        "risk": "Are there any high-risk warnings or conflicting signals?",
-    }
-
-    for agent_name, query in example_queries.items():
-        card = AGENT_CARDS[agent_name]
-        base_url = card["url"]
-
-        print(f"\n--- {card['name']} ({base_url}) ---")
+    base_urls = agent_urls(args.host, list(EXAMPLE_QUERIES))
+    started = time.perf_counter()
+    replies = asyncio.run(briefing(base_urls, args.timeout, args.tasks))
 
-        # Step 1: Discover
-        try:
-            agent_info = discover_agent(base_url)
-            print(f"  Discovered: {agent_info['name']}")
-            print(f"  Skills: {[s['name'] for s in agent_info.get('skills', [])]}")
-        except requests.ConnectionError:
-            print(f"  OFFLINE - Agent not running on {base_url}")
-            continue
-        except Exception as e:
-            print(f"  Discovery error: {e}")
+    for agent_name, reply in replies.items():
+        card = AGENT_CARDS[agent_name]
+        print(f"\n--- {card['name']} ({base_urls[agent_name]}) ---")
+        print(f"  Query: {EXAMPLE_QUERIES[agent_name]}")
+        if "error" in reply:
+            print(f"  Query error: {reply['error']}")
             continue
+        response = reply["text"]
+        # Print first 200 chars of response
+        preview = response[:200] + "..." if len(response) > 200 else response
+        print(f"  Response ({reply['elapsed_sec']:.1f}s): {preview}")
 
-        # Step 2: Send message
-        try:
-            print(f"  Query: {query}")
-            response = send_message(base_url, query)
-            # Print first 200 chars of response
-            preview = response[:200] + "..." if len(response) > 200 else response
-            print(f"  Response: {preview}")
-        except Exception as e:
-            print(f"  Query error: {e}")
+    print(f"\nBriefing: {len(replies)} agent(s) in {time.perf_counter() - started:.1f}s")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,215 @@
+"""
+Multi-agent A2A host - every agent in AGENT_FACTORIES served by ONE process.
+
+launch_all_agents.py starts six Python processes, and each one imports
+CrewAI, Anthropic and pyodbc, builds its own LLM client and opens its own SQL
+connections. The host mounts each agent's ASGI app under its own path:
+
+    GET  /agents/<name>/.well-known/agent.json
+    POST /agents/<name>/a2a
+    POST /agents/<name>/a2a/stream
+    POST /agents/<name>/tasks          (+ GET /tasks/<id>, POST /tasks/<id>/cancel)
+    GET  /agents/<name>/data/<query>   predefined query rows (JSON/CSV/Arrow), no LLM
+    GET  /agents/<name>/health
+    GET  /.well-known/agents.json      all agent cards
+    GET  /health                       host + per-agent status
+    GET  /metrics                      Prometheus metrics for every agent (metrics.py)
+
+and, for existing clients, also listens on the old per-agent ports
+(5001-5006), where the same agent app answers at the root (/a2a, ...).
+
+Shared across agents because they live in one process:
+  - LLM clients   one per distinct (model, max_tokens, temperature)
+                  (config/llm_factory.share_llm_instances)
+  - SQL pool      tools/db_pool.get_pool()
+  - result cache  tools/result_cache.get_result_cache()
+
+Agents are created lazily by default (--prewarm 0): an agent type that never
+receives a request never imports its module or builds an LLM. Each agent
+type has its own instance pool (a2a_servers/agent_pool.py) of --concurrency
+agents.
+
+Usage:
+    python a2a_servers/a2a_host.py
+    python a2a_servers/a2a_host.py --port 5000 --no-compat-ports
+    python a2a_servers/a2a_host.py --agents forex risk
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import contextlib
+import signal
+import time
+from urllib.parse import urlparse
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Mount, Route
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from a2a_servers import metrics
+from a2a_servers.agent_cards import AGENT_CARDS
+from a2a_servers.a2a_asgi_server import create_asgi_app
+from a2a_servers.a2a_protocol import AGENT_FACTORIES, agent_card_payload
+from config.settings import (
+    A2A_CONCURRENCY,
+    A2A_HOST_PORT,
+    A2A_HOST_PUBLIC_URL,
+    A2A_REQUEST_TIMEOUT_SEC,
+    A2A_SHUTDOWN_GRACE_SEC,
+)
+
+# Legacy per-agent ports, taken from the agent cards (market_intel -> 5001, ...)
+AGENT_PORTS = {name: urlparse(card["url"]).port for name, card in AGENT_CARDS.items()}
+
+
+def create_host_app(agents: list[str] | None = None, concurrency: int = A2A_CONCURRENCY,
+                    request_timeout: float = A2A_REQUEST_TIMEOUT_SEC,
+                    public_url: str = A2A_HOST_PUBLIC_URL, prewarm: int = 0) -> Starlette:
+    """One ASGI app with every agent mounted under /agents/<name>."""
+    from config.llm_factory import share_llm_instances
+
+    share_llm_instances(True)
+    agents = agents or list(AGENT_FACTORIES)
+    agent_apps = {
+        name: create_asgi_app(
+            name, concurrency, request_timeout,
+            card_url=f"{public_url.rstrip('/')}/agents/{name}",
+            prewarm=prewarm,
+        )
+        for name in agents
+    }
+    started = time.time()
+
+    async def agents_index(request: Request):
+        """Discovery for the whole host: every mounted agent's card."""
+        return JSONResponse({
+            "agents": [
+                agent_card_payload(name, streaming=True, push_notifications=True, url=f"{public_url.rstrip('/')}/agents/{name}")
+                for name in agent_apps
+            ],
+        })
+
+    async def health_check(request: Request):
+        from a2a_servers.response_cache import get_response_cache
+        from tools.result_cache import get_result_cache
+
+        return JSONResponse({
+            "status": "healthy",
+            "uptime_sec": round(time.time() - started, 1),
+            "agents": {
+                name: {"in_flight": app.state.runner.in_flight,
+                       "tasks_queued": app.state.tasks.queued,
+                       "pool": app.state.runner.pool.stats()}
+                for name, app in agent_apps.items()
+            },
+            "result_cache": get_result_cache().stats(),
+            "response_cache": get_response_cache().stats(),
+        })
+
+    async def metrics_endpoint(request: Request):
+        # One registry per process: series carry an agent label
+        return Response(metrics.metrics_text(), media_type=metrics.CONTENT_TYPE)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        # Mounted apps' own lifespans don't run: start/stop their parts here
+        for agent_app in agent_apps.values():
+            await agent_app.state.tasks.start()
+        yield
+        for agent_app in agent_apps.values():
+            await agent_app.state.tasks.stop()
+            agent_app.state.runner.shutdown()
+
+    app = Starlette(
+        routes=[
+            Route("/.well-known/agents.json", agents_index, methods=["GET"]),
+            Route("/health", health_check, methods=["GET"]),
+            Route("/metrics", metrics_endpoint, methods=["GET"]),
+            *[Mount(f"/agents/{name}", app=agent_app) for name, agent_app in agent_apps.items()],
+        ],
+        lifespan=lifespan,
+    )
+    app.state.agent_apps = agent_apps
+    return app
+
+
+def _server(app, host: str, port: int, lifespan: str):
+    """A uvicorn server that leaves signal handling to serve_host()."""
+    import uvicorn
+
+    class _Server(uvicorn.Server):
+        def install_signal_handlers(self):  # uvicorn < 0.29
+            pass
+
+        @contextlib.contextmanager
+        def capture_signals(self):          # uvicorn >= 0.29
+            yield
+
+    config = uvicorn.Config(
+        app, host=host, port=port, lifespan=lifespan, log_level="warning",
+        timeout_graceful_shutdown=A2A_SHUTDOWN_GRACE_SEC,
+    )
+    return _Server(config)
+
+
+async def serve_host(app: Starlette, host: str, port: int, compat_ports: dict[str, int]) -> None:
+    """Serve the host app on `port` plus each agent app on its legacy port.
+    SIGINT/SIGTERM shut all listeners down together (gracefully)."""
+    servers = [_server(app, host, port, lifespan="on")]
+    for name, agent_port in compat_ports.items():
+        # lifespan off: the host app's lifespan owns the agent worker pools
+        servers.append(_server(app.state.agent_apps[name], host, agent_port, lifespan="off"))
+
+    def stop(*_):
+        for server in servers:
+            server.should_exit = True
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        with contextlib.suppress(ValueError, OSError):
+            signal.signal(sig, stop)
+
+    await asyncio.gather(*(server.serve() for server in servers))
+
+
+def main():
+    """Launch the multi-agent host."""
+    parser = argparse.ArgumentParser(description="Multi-agent A2A host")
+    parser.add_argument("--port", type=int, default=A2A_HOST_PORT,
+                        help=f"Host port (default: {A2A_HOST_PORT})")
+    parser.add_argument("--host", default="0.0.0.0", help="Host to bind to (default: 0.0.0.0)")
+    parser.add_argument("--agents", nargs="+", choices=list(AGENT_FACTORIES.keys()),
+                        help="Agents to mount (default: all)")
+    parser.add_argument("--no-compat-ports", action="store_true",
+                        help="Don't listen on the legacy per-agent ports (5001-5006)")
+    parser.add_argument("--concurrency", type=int, default=A2A_CONCURRENCY,
+                        help=f"Concurrent agent runs per agent (default: {A2A_CONCURRENCY})")
+    parser.add_argument("--timeout", type=float, default=A2A_REQUEST_TIMEOUT_SEC,
+                        help=f"Per-request timeout in seconds (default: {A2A_REQUEST_TIMEOUT_SEC:.0f})")
+    parser.add_argument("--prewarm", type=int, default=0,
+                        help="Agent instances to build per agent type at startup (default: 0, lazy)")
+    args = parser.parse_args()
+
+    app = create_host_app(args.agents, args.concurrency, args.timeout, prewarm=args.prewarm)
+    agents = list(app.state.agent_apps)
+    compat = {} if args.no_compat_ports else {name: AGENT_PORTS[name] for name in agents}
+
+    print("=" * 60)
+    print(f"A2A HOST — {len(agents)} agent(s) on http://{args.host}:{args.port}")
+    print("=" * 60)
+    for name in agents:
+        legacy = f"  (also :{compat[name]}/a2a)" if name in compat else ""
+        print(f"  {name:20s} -> /agents/{name}/a2a{legacy}")
+    print(f"\nDiscovery: http://{args.host}:{args.port}/.well-known/agents.json")
+    print("Press Ctrl+C to stop.\n")
+
+    asyncio.run(serve_host(app, args.host, args.port, compat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+A2A protocol helpers shared by every agent server implementation.
+
+The Flask server (a2a_agent_server.py) and the ASGI server
+(a2a_asgi_server.py) expose the same endpoints with the same payloads; the
+request parsing and response shapes live here so they can't drift apart.
+"""
+
+import sys
+import os
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from a2a_servers.agent_cards import AGENT_CARDS
+
+# Map agent names to their creation functions
+AGENT_FACTORIES = {
+    "market_intel": "agents.market_intel_agent:create_market_intel_agent",
+    "ml_analyst": "agents.ml_analyst_agent:create_ml_analyst_agent",
+    "tech_signal": "agents.tech_signal_agent:create_tech_signal_agent",
+    "strategy_trade": "agents.strategy_trade_agent:create_strategy_trade_agent",
+    "forex": "agents.forex_agent:create_forex_agent",
+    "risk": "agents.risk_agent:create_risk_agent",
+}
+
+# The predefined query set (config/sql_queries.py) behind each agent
+AGENT_QUERY_SETS = {
+    "market_intel": "MARKET_INTEL_QUERIES",
+    "ml_analyst": "ML_ANALYST_QUERIES",
+    "tech_signal": "TECH_SIGNAL_QUERIES",
+    "strategy_trade": "STRATEGY_TRADE_QUERIES",
+    "forex": "FOREX_QUERIES",
+    "risk": "RISK_QUERIES",
+}
+
+
+def agent_queries(agent_name: str) -> dict[str, str]:
+    """{query_name: sql} for an agent's predefined query set."""
+    from config import sql_queries
+
+    return getattr(sql_queries, AGENT_QUERY_SETS[agent_name])
+
+
+def create_agent_from_name(agent_name: str):
+    """Dynamically import and create an agent by name."""
+    factory_path = AGENT_FACTORIES[agent_name]
+    module_path, func_name = factory_path.split(":")
+    module = __import__(module_path, fromlist=[func_name])
+    factory_func = getattr(module, func_name)
+    return factory_func()
+
+
+def extract_message_text(data: dict) -> str:
+    """Pull the user text out of an A2A request body.
+
+    Accepts {"message": "..."}, {"message": {"parts": [...]}},
+    {"message": {"text": ...}}, {"text": ...} and {"query": ...}.
+    """
+    message_text = ""
+    if "message" in data:
+        msg = data["message"]
+        if isinstance(msg, str):
+            message_text = msg
+        elif isinstance(msg, dict) and "parts" in msg:
+            for part in msg["parts"]:
+                if isinstance(part, dict) and "text" in part:
+                    message_text += part["text"]
+                elif isinstance(part, str):
+                    message_text += part
+        elif isinstance(msg, dict) and "text" in msg:
+            message_text = msg["text"]
+    elif "text" in data:
+        message_text = data["text"]
+    elif "query" in data:
+        message_text = data["query"]
+    return message_text
+
+
+def agent_card_payload(agent_name: str, streaming: bool = False,
+                       push_notifications: bool = False, url: str | None = None) -> dict:
+    """The /.well-known/agent.json discovery document (`url` overrides the
+    card's per-port URL, e.g. for an agent mounted on the multi-agent host)."""
+    card = AGENT_CARDS[agent_name]
+    return {
+        "name": card["name"],
+        "description": card["description"],
+        "url": url or card["url"],
+        "version": "1.0.0",
+        "capabilities": {
+            "streaming": streaming,
+            "pushNotifications": push_notifications,
+        },
+        "defaultInputModes": card["input_modes"],
+        "defaultOutputModes": card["output_modes"],
+        "skills": [
+            {"id": cap, "name": cap.replace("_", " ").title()}
+            for cap in card["capabilities"]
+        ],
+    }
+
+
+def result_text(result) -> str:
+    """Text of a CrewAI kickoff result."""
+    return result.raw if hasattr(result, "raw") else str(result)
+
+
+def a2a_response(agent_name: str, response_text: str, agent_role: str,
+                 metadata: dict | None = None) -> dict:
+    """A2A formatted agent reply."""
+    return {
+        "message": {
+            "role": "agent",
+            "parts": [{"text": response_text}],
+        },
+        "metadata": {
+            "agent_name": AGENT_CARDS[agent_name]["name"],
+            "agent_role": agent_role,
+            **(metadata or {}),
+        },
+    }
+
+
+def error_payload(agent_name: str, error: str) -> dict:
+    return {"error": error, "agent_name": AGENT_CARDS[agent_name]["name"]}
+
+
+def health_payload(agent_name: str) -> dict:
+    card = AGENT_CARDS[agent_name]
+    return {
+        "status": "healthy",
+        "agent": card["name"],
+        "capabilities": card["capabilities"],
+    }
@@ -0,0 +1,214 @@
+"""
+Server-sent events for A2A replies that are still being produced.
+
+POST /a2a answers only once `agent.kickoff` returns, 30-90s later. The
+streaming endpoint (POST /a2a/stream, or /a2a with Accept: text/event-stream)
+sends progress as it happens instead:
+
+    event: status     {"state": "working", "agent_name": ...}      at once
+    event: token      {"text": "..."}                              LLM output chunks
+    event: tool       {"phase": "start"|"end"|"error", "tool": ..., ...}
+    event: progress   {"phase": "start"|"end", "name": "sql.query", "category": "sql", ...}
+    event: message    the same A2A reply body POST /a2a returns
+    event: error      {"error": ..., "status": 504|500}
+
+A comment line (": keep-alive") is sent every A2A_STREAM_KEEPALIVE_SEC so
+proxies don't close an idle stream while Claude is thinking.
+
+Where the events come from:
+  - token / tool    CrewAI's event bus (LLMStreamChunkEvent, ToolUsage*Event);
+                    token events need an LLM built with stream=True
+                    (config/llm_factory.stream_llm_responses). They are the raw
+                    model output, including the agent's tool-use reasoning —
+                    the final answer is the `message` event.
+  - progress        tools/tracing.listen_spans: every sql.query and llm.call
+                    span the run opens.
+
+A RunStream is bound to the worker thread for the duration of one kickoff.
+CrewAI emits stream chunks on that thread; tool events may be delivered on
+its own handler pool, so they are matched to the run by agent id instead.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import json
+import threading
+from datetime import datetime
+
+from tools.tracing import listen_spans
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+_current_stream: contextvars.ContextVar = contextvars.ContextVar("a2a_stream", default=None)
+_agent_streams: dict = {}
+_agent_streams_lock = threading.Lock()
+_listeners_installed = False
+_install_lock = threading.Lock()
+
+
+def sse(event: str, data) -> str:
+    """One server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def wants_stream(headers) -> bool:
+    return "text/event-stream" in (headers.get("accept") or "").lower()
+
+
+class RunStream:
+    """Events of one agent run, handed from worker threads to the event loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.closed = False
+
+    def emit(self, event: str, data: dict) -> None:
+        """Thread-safe; silently dropped once the client has gone."""
+        if self.closed:
+            return
+        with contextlib.suppress(RuntimeError):  # loop already closed
+            self._loop.call_soon_threadsafe(self.queue.put_nowait, (event, data))
+
+    def _on_span(self, phase, name, category, attrs, duration_sec, error) -> None:
+        if category not in ("sql", "llm"):
+            return
+        data = {"phase": phase, "name": name, "category": category, **attrs}
+        if phase == "end":
+            data["duration_ms"] = round(duration_sec * 1000, 1)
+            if error:
+                data["error"] = error
+        self.emit("progress", data)
+
+
+@contextlib.contextmanager
+def bind_stream(stream: RunStream | None, agent=None):
+    """Route the events of the kickoff run inside this block to `stream`."""
+    if stream is None:
+        yield
+        return
+    install_crewai_listeners()
+    agent_id = str(getattr(agent, "id", "") or "")
+    if agent_id:
+        with _agent_streams_lock:
+            _agent_streams[agent_id] = stream
+    token = _current_stream.set(stream)
+    try:
+        with listen_spans(stream._on_span):
+            yield
+    finally:
+        _current_stream.reset(token)
+        if agent_id:
+            with _agent_streams_lock:
+                _agent_streams.pop(agent_id, None)
+
+
+def _stream_for(event) -> RunStream | None:
+    stream = _current_stream.get()
+    if stream is None:
+        agent_id = getattr(event, "agent_id", None)
+        if agent_id is None and getattr(event, "agent", None) is not None:
+            agent_id = getattr(event.agent, "id", None)
+        if agent_id is not None:
+            with _agent_streams_lock:
+                stream = _agent_streams.get(str(agent_id))
+    return stream
+
+
+def _duration_ms(event) -> float | None:
+    started, finished = getattr(event, "started_at", None), getattr(event, "finished_at", None)
+    if isinstance(started, datetime) and isinstance(finished, datetime):
+        return round((finished - started).total_seconds() * 1000, 1)
+    return None
+
+
+def install_crewai_listeners() -> bool:
+    """Subscribe (once per process) to CrewAI's stream-chunk and tool events.
+    Returns False when the installed CrewAI has no event bus."""
+    global _listeners_installed
+    with _install_lock:
+        if _listeners_installed:
+            return True
+        try:  # crewai >= 0.175
+            from crewai.events import (
+                LLMStreamChunkEvent,
+                ToolUsageErrorEvent,
+                ToolUsageFinishedEvent,
+                ToolUsageStartedEvent,
+                crewai_event_bus,
+            )
+        except ImportError:
+            try:
+                from crewai.utilities.events import (
+                    LLMStreamChunkEvent,
+                    ToolUsageErrorEvent,
+                    ToolUsageFinishedEvent,
+                    ToolUsageStartedEvent,
+                    crewai_event_bus,
+                )
+            except ImportError:
+                return False
+
+        @crewai_event_bus.on(LLMStreamChunkEvent)
+        def _on_chunk(source, event):
+            stream = _current_stream.get()
+            if stream is not None and event.chunk:
+                stream.emit("token", {"text": event.chunk})
+
+        @crewai_event_bus.on(ToolUsageStartedEvent)
+        def _on_tool_start(source, event):
+            stream = _stream_for(event)
+            if stream is not None:
+                stream.emit("tool", {"phase": "start", "tool": event.tool_name,
+                                     "args": event.tool_args})
+
+        @crewai_event_bus.on(ToolUsageFinishedEvent)
+        def _on_tool_end(source, event):
+            stream = _stream_for(event)
+            if stream is not None:
+                stream.emit("tool", {"phase": "end", "tool": event.tool_name,
+                                     "duration_ms": _duration_ms(event),
+                                     "from_cache": getattr(event, "from_cache", False)})
+
+        @crewai_event_bus.on(ToolUsageErrorEvent)
+        def _on_tool_error(source, event):
+            stream = _stream_for(event)
+            if stream is not None:
+                stream.emit("tool", {"phase": "error", "tool": event.tool_name,
+                                     "error": str(event.error)[:300]})
+
+        _listeners_installed = True
+        return True
+
+
+async def event_source(stream: RunStream, run: asyncio.Future, keepalive_sec: float,
+                       on_result, on_error):
+    """Yield SSE frames for `stream` until `run` completes, then the frame
+    built by `on_result(result)` (or `on_error(exc)`)."""
+    def finished(future):
+        if not future.cancelled():
+            future.exception()  # retrieved here even if the client left
+        stream.queue.put_nowait(None)
+
+    run.add_done_callback(finished)
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(stream.queue.get(), keepalive_sec)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if item is None:
+                break
+            yield sse(*item)
+        try:
+            result = run.result()
+        except Exception as e:
+            yield on_error(e)
+        else:
+            yield on_result(result)
+    finally:
+        # Client gone (or done): the kickoff can't be interrupted, but its
+        # remaining events have nowhere to go
+        stream.closed = True
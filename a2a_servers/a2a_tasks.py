@@ -0,0 +1,398 @@
+"""
+Asynchronous A2A tasks: submit now, collect the reply later.
+
+POST /a2a holds the connection for the whole 30-90s kickoff, and a client
+that gives up first (a2a_client_example.send_message with a short timeout,
+a proxy, a closed laptop) loses the work. Tasks decouple the two:
+
+    POST /tasks                       -> 202 {"id": ..., "status": {"state": "submitted"}}
+    GET  /tasks/<id>                  -> current state, and the reply once completed
+    POST /tasks/<id>/cancel           -> cancels a task that hasn't started
+
+The request body is the same as /a2a, plus optionally
+
+    "pushNotification": {"url": "https://...", "token": "..."}
+
+to have the finished task POSTed to `url` (token sent as
+X-A2A-Notification-Token) instead of polling for it. The POST is made in the
+background (push status "pending" until it is sent or gives up), so a
+request that finishes a task — a cached reply, a cancel — never waits on the
+receiver; pushes still pending when the server stops are sent on the next
+start.
+
+States follow A2A: submitted -> working -> completed | failed | canceled.
+
+Tasks run on A2A_TASK_WORKERS background workers per agent (each holding one
+agent from the pool, waiting rather than failing when it is full), with A2A_TASK_TIMEOUT_SEC per task — waiting for
+the pool included — and at most A2A_TASK_QUEUE_MAX outstanding (submitted or
+working, counted in the store so tasks recovered on restart count too). Every state change is written to
+logs/a2a_tasks.db (SQLite, WAL), so a task outlives the request that
+submitted it, and tasks that were queued or running when the server stopped
+are run again on the next start. Finished tasks are pruned after
+A2A_TASK_RETENTION_DAYS.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+
+from a2a_servers.a2a_protocol import a2a_response
+from a2a_servers.agent_pool import PoolFull
+from a2a_servers.response_cache import cache_metadata
+from config.settings import (
+    A2A_TASK_QUEUE_MAX,
+    A2A_TASK_RETENTION_DAYS,
+    A2A_TASK_TIMEOUT_SEC,
+    A2A_TASK_WORKERS,
+)
+
+_LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs")
+TASK_STORE_FILE = os.path.join(_LOG_DIR, "a2a_tasks.db")
+
+ACTIVE_STATES = ("submitted", "working")
+FINAL_STATES = ("completed", "failed", "canceled")
+
+PUSH_ATTEMPTS = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id          TEXT PRIMARY KEY,
+    agent_name  TEXT NOT NULL,
+    state       TEXT NOT NULL,
+    message     TEXT NOT NULL,
+    created_at  TEXT NOT NULL,
+    updated_at  TEXT NOT NULL,
+    result      TEXT,
+    error       TEXT,
+    push_url    TEXT,
+    push_token  TEXT,
+    push_status TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_tasks_agent_state ON tasks (agent_name, state);
+CREATE INDEX IF NOT EXISTS ix_tasks_updated ON tasks (updated_at);
+"""
+
+
+class TaskStore:
+    """SQLite-backed task table (one row per task)."""
+
+    def __init__(self, path: str = TASK_STORE_FILE,
+                 retention_days: int = A2A_TASK_RETENTION_DAYS):
+        self.path = path
+        self.retention_days = retention_days
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Short-lived connection per operation (see tools/run_store.py)."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def create(self, agent_name: str, message: str, push: dict | None = None) -> dict:
+        now = datetime.now().isoformat(timespec="seconds")
+        task_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO tasks (id, agent_name, state, message, created_at, updated_at, "
+                "push_url, push_token) VALUES (?, ?, 'submitted', ?, ?, ?, ?, ?)",
+                (task_id, agent_name, message, now, now,
+                 (push or {}).get("url"), (push or {}).get("token")),
+            )
+            if self.retention_days:
+                cutoff = (datetime.now() - timedelta(days=self.retention_days)).isoformat()
+                conn.execute(
+                    f"DELETE FROM tasks WHERE updated_at < ? AND state IN ({', '.join('?' * len(FINAL_STATES))})",
+                    (cutoff, *FINAL_STATES),
+                )
+        return self.get(task_id)
+
+    def get(self, task_id: str) -> dict | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return dict(row) if row else None
+
+    def update(self, task_id: str, only_from: tuple = (), **fields) -> bool:
+        """Set columns (result is stored as JSON). With `only_from`, only if the
+        task is currently in one of those states. Returns whether it changed."""
+        if "result" in fields and fields["result"] is not None:
+            fields["result"] = json.dumps(fields["result"], default=str)
+        fields["updated_at"] = datetime.now().isoformat(timespec="seconds")
+        sql = f"UPDATE tasks SET {', '.join(f'{k} = ?' for k in fields)} WHERE id = ?"
+        params = [*fields.values(), task_id]
+        if only_from:
+            sql += f" AND state IN ({', '.join('?' * len(only_from))})"
+            params.extend(only_from)
+        with self._connect() as conn:
+            return conn.execute(sql, params).rowcount > 0
+
+    def active(self, agent_name: str) -> list[dict]:
+        """Unfinished tasks of an agent, oldest first."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM tasks WHERE agent_name = ? AND state IN (?, ?) ORDER BY created_at",
+                (agent_name, *ACTIVE_STATES),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def pending_pushes(self, agent_name: str) -> list[str]:
+        """Finished tasks of an agent whose push hasn't been delivered yet."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT id FROM tasks WHERE agent_name = ? AND push_status = 'pending' "
+                f"AND state IN ({', '.join('?' * len(FINAL_STATES))}) ORDER BY updated_at",
+                (agent_name, *FINAL_STATES),
+            ).fetchall()
+        return [r["id"] for r in rows]
+
+    def active_count(self, agent_name: str) -> int:
+        """Number of unfinished (submitted or working) tasks of an agent."""
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM tasks WHERE agent_name = ? AND state IN (?, ?)",
+                (agent_name, *ACTIVE_STATES),
+            ).fetchone()[0]
+
+    def counts(self, agent_name: str) -> dict[str, int]:
+        with self._connect() as conn:
+            return {
+                r["state"]: r["n"] for r in conn.execute(
+                    "SELECT state, COUNT(*) AS n FROM tasks WHERE agent_name = ? GROUP BY state",
+                    (agent_name,),
+                )
+            }
+
+
+def task_payload(row: dict) -> dict:
+    """Public JSON form of a task (the push token is never echoed)."""
+    payload = {
+        "id": row["id"],
+        "status": {"state": row["state"], "timestamp": row["updated_at"]},
+        "created_at": row["created_at"],
+        "result": json.loads(row["result"]) if row["result"] else None,
+    }
+    if row["error"]:
+        payload["status"]["error"] = row["error"]
+    if row["push_url"]:
+        payload["pushNotification"] = {"url": row["push_url"], "status": row["push_status"]}
+    return payload
+
+
+def push_config(data: dict) -> dict | None:
+    """The request's pushNotification config. Raises ValueError if invalid."""
+    push = data.get("pushNotification")
+    if push is None:
+        return None
+    url = push.get("url") if isinstance(push, dict) else None
+    if not url or urlparse(url).scheme not in ("http", "https"):
+        raise ValueError("pushNotification.url must be an http(s) URL")
+    return {"url": url, "token": push.get("token")}
+
+
+def send_push(row: dict) -> str:
+    """POST the finished task to its push URL, retrying with backoff.
+    Returns the push status recorded on the task."""
+    import requests
+
+    headers = {"Content-Type": "application/json"}
+    if row["push_token"]:
+        headers["X-A2A-Notification-Token"] = row["push_token"]
+    error = None
+    for attempt in range(PUSH_ATTEMPTS):
+        if attempt:
+            time.sleep(2 ** attempt)
+        try:
+            resp = requests.post(row["push_url"], json=task_payload(row), headers=headers, timeout=10)
+            if resp.status_code < 400:
+                return "sent"
+            error = f"HTTP {resp.status_code}"
+        except requests.RequestException as e:
+            error = type(e).__name__
+    return f"failed: {error}"
+
+
+class TaskManager:
+    """Queue + background workers running one agent's tasks."""
+
+    def __init__(self, agent_name: str, runner, cache, store: TaskStore | None = None,
+                 workers: int = A2A_TASK_WORKERS, timeout: float = A2A_TASK_TIMEOUT_SEC,
+                 queue_max: int = A2A_TASK_QUEUE_MAX):
+        self.agent_name = agent_name
+        self.runner = runner
+        self.cache = cache
+        self.store = store
+        self.workers = workers
+        self.timeout = timeout
+        self.queue_max = queue_max
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+        self._pushes: set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+
+    async def start(self) -> None:
+        """Start the workers (once), re-queue tasks left unfinished by a
+        previous run of this server and resend its undelivered pushes."""
+        with self._lock:
+            if self._queue is not None:
+                return
+            self._queue = asyncio.Queue()
+        if self.store is None:
+            self.store = await asyncio.to_thread(get_task_store)
+        for row in await asyncio.to_thread(self.store.active, self.agent_name):
+            if row["state"] == "working":
+                await asyncio.to_thread(self.store.update, row["id"], state="submitted")
+            self._queue.put_nowait(row["id"])
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        for task_id in await asyncio.to_thread(self.store.pending_pushes, self.agent_name):
+            self._schedule_push(task_id)
+
+    async def stop(self) -> None:
+        """Stop the workers and pushes. Tasks they were running stay `working`
+        (pushes `pending`) in the store and are picked up again on the next
+        start."""
+        for worker in (*self._workers, *self._pushes):
+            worker.cancel()
+        await asyncio.gather(*self._workers, *self._pushes, return_exceptions=True)
+        self._workers = []
+        self._pushes.clear()
+        self._queue = None
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def submit(self, message_text: str, key, fresh: bool, push: dict | None) -> dict | None:
+        """Create a task. A cached reply completes it at once; otherwise it is
+        queued. Returns None when queue_max tasks are already outstanding."""
+        await self.start()
+        entry = None if fresh else self.cache.get(key)
+        if entry is None and (await asyncio.to_thread(self.store.active_count, self.agent_name)
+                              >= self.queue_max):
+            return None
+        row = await asyncio.to_thread(self.store.create, self.agent_name, message_text, push)
+        if entry is not None:
+            result = a2a_response(self.agent_name, entry["text"], entry["agent_role"],
+                                  cache_metadata(key, True, entry))
+            row = await self._finish(row["id"], state="completed", result=result)
+        else:
+            self._queue.put_nowait(row["id"])
+        return task_payload(row)
+
+    async def get(self, task_id: str) -> dict | None:
+        await self.start()
+        row = await asyncio.to_thread(self.store.get, task_id)
+        if row is None or row["agent_name"] != self.agent_name:
+            return None
+        return task_payload(row)
+
+    async def cancel(self, task_id: str) -> dict | None:
+        """Cancel a task that hasn't started (a running kickoff can't be
+        interrupted). Returns the task, or None if unknown."""
+        task = await self.get(task_id)
+        if task is None:
+            return None
+        if await asyncio.to_thread(self.store.update, task_id, only_from=("submitted",),
+                                   state="canceled"):
+            row = await self._finish(task_id)
+            return task_payload(row)
+        return task
+
+    async def _finish(self, task_id: str, **fields) -> dict:
+        """Record the final state and queue the push, without waiting for it."""
+        row = await asyncio.to_thread(self.store.get, task_id)
+        if row["push_url"]:
+            fields["push_status"] = "pending"
+        if fields:
+            await asyncio.to_thread(self.store.update, task_id, **fields)
+            row = await asyncio.to_thread(self.store.get, task_id)
+        if row["push_url"]:
+            self._schedule_push(task_id)
+        return row
+
+    def _schedule_push(self, task_id: str) -> None:
+        push = asyncio.create_task(self._push(task_id))
+        self._pushes.add(push)
+        push.add_done_callback(self._pushes.discard)
+
+    async def _push(self, task_id: str) -> None:
+        try:
+            row = await asyncio.to_thread(self.store.get, task_id)
+            status = await asyncio.to_thread(send_push, row)
+            await asyncio.to_thread(self.store.update, task_id, push_status=status)
+        except Exception:
+            pass  # stays `pending`; resent on the next start
+
+    async def _work(self) -> None:
+        while True:
+            task_id = await self._queue.get()
+            try:
+                await self._run(task_id)
+            except Exception as e:
+                # Keep the worker alive, but don't leave the task `working`
+                try:
+                    if await asyncio.to_thread(self.store.update, task_id, only_from=ACTIVE_STATES,
+                                               state="failed", error=f"{type(e).__name__}: {e}"[:500]):
+                        await self._finish(task_id)
+                except Exception:
+                    pass  # store unreachable: the task is re-run on the next start
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, task_id: str) -> None:
+        if not await asyncio.to_thread(self.store.update, task_id, only_from=ACTIVE_STATES,
+                                       state="working"):
+            return  # canceled while queued
+        row = await asyncio.to_thread(self.store.get, task_id)
+        key = await asyncio.to_thread(self.cache.key, self.agent_name, row["message"])
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                try:
+                    response_text, agent_role = await self.runner.run(row["message"], remaining)
+                    break
+                except PoolFull as e:
+                    # Interactive traffic has every agent: wait our turn,
+                    # but not past the task's timeout
+                    await asyncio.sleep(min(e.retry_after, max(deadline - loop.time(), 0)))
+        except asyncio.TimeoutError:
+            await self._finish(task_id, state="failed",
+                               error=f"Agent did not respond within {self.timeout:.0f}s")
+            return
+        except Exception as e:
+            await self._finish(task_id, state="failed", error=str(e)[:500])
+            return
+        self.cache.put(key, response_text, agent_role)
+        result = a2a_response(self.agent_name, response_text, agent_role, cache_metadata(key, False))
+        await self._finish(task_id, state="completed", result=result)
+
+
+_store: TaskStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_task_store() -> TaskStore:
+    """Process-wide store at logs/a2a_tasks.db."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = TaskStore()
+        return _store
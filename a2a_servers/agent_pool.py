@@ -0,0 +1,179 @@
+"""
+Bounded pool of agent instances for one agent type.
+
+CrewAI agents keep per-run state (executor, messages, tools handler) and are
+not safe for concurrent `kickoff`, so a request must have an instance to
+itself for the duration of its run. The pool holds up to `size` instances;
+a request checks one out, runs, and returns it:
+
+    with pool.checkout(timeout=180) as agent:
+        agent.kickoff(...)
+
+When every instance is busy, up to `max_waiting` requests queue for the next
+free one. Beyond that checkout raises PoolFull at once, and the servers
+answer 429 with a Retry-After estimated from recent kickoff durations. An
+instance whose kickoff raised is discarded (its state is unknown) and
+rebuilt on demand.
+
+`prewarm(n)` builds instances in a background thread at startup so the first
+requests don't pay for agent construction.
+
+stats() feeds /health: size, created, idle, in_use, waiting (queue depth),
+checkouts, rejected and wait/kickoff times.
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from a2a_servers import a2a_protocol
+
+
+class PoolFull(Exception):
+    """No instance free and the wait queue is full (or the wait timed out)."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class PoolTimeout(PoolFull):
+    """Queued for an instance, but none came free within the timeout."""
+
+
+class AgentPool:
+    """Up to `size` instances of one agent, checked out one request at a time."""
+
+    def __init__(self, agent_name: str, size: int, max_waiting: int):
+        self.agent_name = agent_name
+        self.size = size
+        self.max_waiting = max_waiting
+        self._idle: list = []
+        self._cond = threading.Condition()
+        self.created = 0        # instances alive (idle + in use + being built)
+        self.in_use = 0
+        self.waiting = 0
+        self.checkouts = 0
+        self.rejected = 0
+        self._wait_total = 0.0
+        self.wait_max = 0.0
+        self._kickoff_ewma = None
+
+    def _build(self):
+        # Looked up on the module so tests/benchmarks can swap the factory
+        return a2a_protocol.create_agent_from_name(self.agent_name)
+
+    def prewarm(self, count: int) -> threading.Thread | None:
+        """Build up to `count` idle instances in a background thread."""
+        count = min(count, self.size)
+        if count <= 0:
+            return None
+
+        def warm():
+            for _ in range(count):
+                with self._cond:
+                    if self.created >= self.size:
+                        return
+                    self.created += 1
+                try:
+                    agent = self._build()
+                except Exception:
+                    with self._cond:
+                        self.created -= 1
+                        self._cond.notify()
+                    return
+                with self._cond:
+                    self._idle.append(agent)
+                    self._cond.notify()
+
+        thread = threading.Thread(target=warm, name=f"prewarm-{self.agent_name}", daemon=True)
+        thread.start()
+        return thread
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free: queued runs / pool size x the
+        typical kickoff duration."""
+        per_run = self._kickoff_ewma or 30.0
+        return max(1, min(300, math.ceil(per_run * (self.waiting + 1) / max(self.size, 1))))
+
+    def reject_if_full(self) -> None:
+        """Raise PoolFull now if a checkout would be refused (lets async
+        callers answer 429 without handing the request to a thread)."""
+        with self._cond:
+            if not self._idle and self.created >= self.size and self.waiting >= self.max_waiting:
+                self.rejected += 1
+                raise PoolFull(f"{self.agent_name}: all {self.size} agents busy and "
+                               f"{self.waiting} request(s) queued", self.retry_after())
+
+    def _acquire(self, timeout: float | None):
+        """An idle instance, or None when this caller should build one."""
+        start = time.monotonic()
+        self.reject_if_full()
+        with self._cond:
+            self.waiting += 1
+            try:
+                while not self._idle and self.created >= self.size:
+                    remaining = None if timeout is None else timeout - (time.monotonic() - start)
+                    if remaining is not None and remaining <= 0:
+                        self.rejected += 1
+                        raise PoolTimeout(f"{self.agent_name}: no agent free within {timeout:.0f}s",
+                                          self.retry_after())
+                    self._cond.wait(remaining)
+            finally:
+                self.waiting -= 1
+            waited = time.monotonic() - start
+            self._wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            self.checkouts += 1
+            self.in_use += 1
+            if self._idle:
+                return self._idle.pop()
+            self.created += 1
+            return None
+
+    @contextmanager
+    def checkout(self, timeout: float | None = None):
+        """Lend an instance for one run. Raises PoolFull."""
+        agent = self._acquire(timeout)
+        if agent is None:
+            try:
+                agent = self._build()
+            except BaseException:
+                with self._cond:
+                    self.created -= 1
+                    self.in_use -= 1
+                    self._cond.notify()
+                raise
+        started = time.monotonic()
+        ok = False
+        try:
+            yield agent
+            ok = True
+        finally:
+            elapsed = time.monotonic() - started
+            with self._cond:
+                self.in_use -= 1
+                if ok:
+                    self._idle.append(agent)
+                    self._kickoff_ewma = (elapsed if self._kickoff_ewma is None
+                                          else 0.8 * self._kickoff_ewma + 0.2 * elapsed)
+                else:
+                    self.created -= 1  # discard: per-run state may be half-updated
+                self._cond.notify()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "size": self.size,
+                "created": self.created,
+                "idle": len(self._idle),
+                "in_use": self.in_use,
+                "waiting": self.waiting,
+                "max_waiting": self.max_waiting,
+                "checkouts": self.checkouts,
+                "rejected": self.rejected,
+                "wait_ms_avg": round(self._wait_total / self.checkouts * 1000, 1) if self.checkouts else None,
+                "wait_ms_max": round(self.wait_max * 1000, 1),
+                "kickoff_sec_avg": round(self._kickoff_ewma, 2) if self._kickoff_ewma else None,
+            }
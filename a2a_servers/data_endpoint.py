@@ -0,0 +1,174 @@
+"""
+LLM-free data endpoint: the rows behind an agent's skills.
+
+Power BI and other structured consumers want the table, not an LLM
+paraphrase of it. Every agent server also answers
+
+    GET /data                         the agent's predefined query names
+    GET /data/<query_name>            rows of that query (config/sql_queries.py)
+
+straight from SQL through the shared result cache (tools/result_cache.py),
+without touching the agent pool or Claude. Output format, by ?format= or the
+Accept header:
+
+    json    {"query", "columns", "rows": [{col: value}], "row_count", "cache"}
+    csv     text/csv with a header row
+    arrow   Arrow IPC stream (application/vnd.apache.arrow.stream); needs pyarrow
+
+Dates are ISO strings and decimals floats in JSON/CSV; Arrow keeps native
+types. The ETag is derived from the query and its data watermark, so a
+client sending If-None-Match gets 304 — without any SQL — until new data
+lands. A query reading a table no watermark covers gets no ETag and runs
+every time.
+"""
+
+import csv
+import datetime
+import decimal
+import hashlib
+import importlib.util
+import io
+import json
+
+from a2a_servers.a2a_protocol import agent_queries
+
+FORMATS = {
+    "json": "application/json",
+    "csv": "text/csv; charset=utf-8",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+CACHE_CONTROL = "private, no-cache"
+
+
+class UnknownQuery(KeyError):
+    pass
+
+
+class UnsupportedFormat(ValueError):
+    pass
+
+
+def pick_format(requested: str | None, accept: str | None) -> str:
+    """Output format from ?format=, else the Accept header, else json."""
+    if requested:
+        fmt = requested.lower()
+        if fmt not in FORMATS:
+            raise UnsupportedFormat(f"Unknown format '{requested}' (use one of: {', '.join(FORMATS)})")
+    else:
+        accept = (accept or "").lower()
+        fmt = next((f for f, media_type in FORMATS.items()
+                    if media_type.split(";")[0] in accept), "json")
+    if fmt == "arrow" and importlib.util.find_spec("pyarrow") is None:
+        raise UnsupportedFormat("Arrow output needs pyarrow (pip install pyarrow)")
+    return fmt
+
+
+def query_sql(agent_name: str, query_name: str) -> str:
+    queries = agent_queries(agent_name)
+    if query_name not in queries:
+        raise UnknownQuery(query_name)
+    return queries[query_name]
+
+
+def fetch(agent_name: str, query_name: str, if_none_match: str | None = None) -> dict:
+    """Run (or reuse) a predefined query. Blocking: SQL round trip on a miss.
+    When If-None-Match names the current data, no SQL runs at all and the
+    result has not_modified=True."""
+    from tools.result_cache import cached_query
+    from tools.watermarks import query_watermark
+
+    sql = query_sql(agent_name, query_name)
+    try:
+        watermark = query_watermark(sql)
+    except Exception:
+        watermark = ()
+    etag = None
+    if watermark:
+        digest = hashlib.sha256(repr((agent_name, query_name, watermark)).encode()).hexdigest()
+        etag = f'"{digest[:32]}"'
+    result = {"query": query_name, "etag": etag, "data_as_of": {t: d for t, d in watermark},
+              "not_modified": _matches(if_none_match, etag)}
+    if not result["not_modified"]:
+        result["columns"], result["rows"], result["hit"] = cached_query(sql)
+    return result
+
+
+def _matches(if_none_match: str | None, etag: str | None) -> bool:
+    if not etag or not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return etag in tags or "*" in tags
+
+
+def response_headers(result: dict) -> dict:
+    if result["etag"] is None:
+        return {"Cache-Control": "no-store"}
+    return {"ETag": result["etag"], "Cache-Control": CACHE_CONTROL}
+
+
+def _plain(value):
+    """JSON/CSV-friendly scalar."""
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    return value
+
+
+def to_json(result: dict) -> bytes:
+    columns = result["columns"]
+    return json.dumps({
+        "query": result["query"],
+        "columns": columns,
+        "rows": [{c: _plain(v) for c, v in zip(columns, row)} for row in result["rows"]],
+        "row_count": len(result["rows"]),
+        "cache": {"hit": result["hit"], "data_as_of": result["data_as_of"]},
+    }, default=str).encode("utf-8")
+
+
+def to_csv(result: dict) -> bytes:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(result["columns"])
+    for row in result["rows"]:
+        writer.writerow(["" if v is None else _plain(v) for v in row])
+    return out.getvalue().encode("utf-8")
+
+
+def to_arrow(result: dict) -> bytes:
+    """Arrow IPC stream of the rows; native types where pyarrow can infer
+    them, strings for columns it can't."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise UnsupportedFormat("Arrow output needs pyarrow (pip install pyarrow)") from None
+
+    arrays = []
+    for i, _ in enumerate(result["columns"]):
+        values = [row[i] for row in result["rows"]]
+        try:
+            arrays.append(pa.array(values))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            arrays.append(pa.array([None if v is None else str(v) for v in values], pa.string()))
+    table = pa.Table.from_arrays(arrays, names=list(result["columns"]))
+    metadata = {b"query": result["query"].encode(),
+                b"data_as_of": json.dumps(result["data_as_of"]).encode()}
+    table = table.replace_schema_metadata(metadata)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+SERIALIZERS = {"json": to_json, "csv": to_csv, "arrow": to_arrow}
+
+
+def render(result: dict, fmt: str) -> tuple[bytes, str]:
+    """(body, media type). Raises UnsupportedFormat."""
+    return SERIALIZERS[fmt](result), FORMATS[fmt]
+
+
+def index_payload(agent_name: str) -> dict:
+    return {"queries": sorted(agent_queries(agent_name)), "formats": list(FORMATS)}
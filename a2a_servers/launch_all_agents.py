@@ -1,5 +1,5 @@
 """
-Launch all A2A agent servers simultaneously.
+Launch and supervise all A2A agent servers.
 Each agent runs on its own port:
   - Market Intel:    port 5001
   - ML Analyst:      port 5002
@@ -8,19 +8,46 @@ Each agent runs on its own port:
   - Forex:           port 5005
   - Risk:            port 5006
 
+All six are spawned at once; an agent counts as up only when its /health
+answers 200, and the time from spawn to ready is reported per agent. After
+that the supervisor keeps them running:
+
+  - an agent that exits, or fails /health A2A_SUPERVISOR_HEALTH_FAILURES
+    times in a row, is restarted with exponential backoff (1s, 2s, 4s ... up
+    to A2A_SUPERVISOR_BACKOFF_MAX_SEC; reset once it has stayed up a minute)
+  - an agent not ready within A2A_SUPERVISOR_READY_TIMEOUT_SEC is killed and
+    restarted the same way
+  - with --watch, a change to any project .py file triggers a rolling
+    restart: one agent at a time, the next only once the previous is ready
+    again, so at most one port is down. If a restarted agent doesn't come
+    back, the roll stops and the rest keep running the old code.
+
 Usage:
     python a2a_servers/launch_all_agents.py
+    python a2a_servers/launch_all_agents.py --server asgi --watch
 """
 
 import sys
 import os
+import argparse
+import signal
 import subprocess
 import time
-import signal
+import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from config.settings import (
+    A2A_SHUTDOWN_GRACE_SEC,
+    A2A_SUPERVISOR_BACKOFF_MAX_SEC,
+    A2A_SUPERVISOR_HEALTH_FAILURES,
+    A2A_SUPERVISOR_HEALTH_INTERVAL_SEC,
+    A2A_SUPERVISOR_READY_TIMEOUT_SEC,
+)
+
 AGENTS = [
     ("market_intel", 5001),
     ("ml_analyst", 5002),
@@ -30,59 +57,287 @@ AGENTS = [
     ("risk", 5006),
 ]
 
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_SCRIPTS = {
+    "flask": os.path.join(PROJECT_ROOT, "a2a_servers", "a2a_agent_server.py"),
+    "asgi": os.path.join(PROJECT_ROOT, "a2a_servers", "a2a_asgi_server.py"),
+}
+WATCH_SKIP_DIRS = {".git", "__pycache__", "logs", "venv", ".venv", "env", "node_modules"}
 
-def main():
-    """Launch all agent servers as subprocesses."""
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    server_script = os.path.join(project_root, "a2a_servers", "a2a_agent_server.py")
+TICK_SEC = 0.5
+READY_POLL_SEC = 0.5
+STABLE_SEC = 60          # up this long -> backoff starts over at 1s
+BACKOFF_BASE_SEC = 1.0
+WATCH_INTERVAL_SEC = 2.0
+
+
+class AgentProcess:
+    """One agent server subprocess and its supervision state."""
+
+    def __init__(self, name: str, port: int, script: str):
+        self.name = name
+        self.port = port
+        self.script = script
+        self.proc: subprocess.Popen | None = None
+        self.state = "stopped"     # starting | ready | backoff | stopped
+        self.spawned_at = 0.0
+        self.ready_at = 0.0
+        self.startup_sec: float | None = None
+        self.restarts = 0
+        self.failures = 0          # consecutive, drives the backoff
+        self.health_failures = 0
+        self.next_check = 0.0
+        self.restart_at = 0.0
+
+    @property
+    def health_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/health"
+
+    def spawn(self) -> None:
+        self.proc = subprocess.Popen(
+            [sys.executable, self.script, "--agent", self.name, "--port", str(self.port)],
+            cwd=PROJECT_ROOT,
+        )
+        self.state = "starting"
+        self.spawned_at = time.monotonic()
+        self.next_check = self.spawned_at
+        self.health_failures = 0
+
+    def stop(self, grace: float = A2A_SHUTDOWN_GRACE_SEC) -> None:
+        """Terminate, and kill if it hasn't exited within `grace` seconds."""
+        self.state = "stopped"
+        if self.proc is None or self.proc.poll() is not None:
+            return
+        self.proc.terminate()
+        try:
+            self.proc.wait(timeout=grace)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+
+    def healthy(self) -> bool:
+        try:
+            with urllib.request.urlopen(self.health_url, timeout=2) as r:
+                return r.status == 200
+        except Exception:
+            return False
+
+
+def _source_mtimes(root: str) -> dict:
+    mtimes = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in WATCH_SKIP_DIRS and not d.startswith(".")]
+        for filename in filenames:
+            if filename.endswith(".py"):
+                path = os.path.join(dirpath, filename)
+                try:
+                    mtimes[path] = os.stat(path).st_mtime
+                except OSError:
+                    pass
+    return mtimes
+
+
+class Supervisor:
+    """Starts every agent in parallel and keeps them up."""
+
+    def __init__(self, agents: list[tuple[str, int]], server: str = "flask", watch: bool = False,
+                 ready_timeout: float = A2A_SUPERVISOR_READY_TIMEOUT_SEC,
+                 health_interval: float = A2A_SUPERVISOR_HEALTH_INTERVAL_SEC,
+                 health_failures: int = A2A_SUPERVISOR_HEALTH_FAILURES,
+                 backoff_max: float = A2A_SUPERVISOR_BACKOFF_MAX_SEC):
+        script = SERVER_SCRIPTS[server]
+        self.agents = [AgentProcess(name, port, script) for name, port in agents]
+        self.watch = watch
+        self.ready_timeout = ready_timeout
+        self.health_interval = health_interval
+        self.health_failures = health_failures
+        self.backoff_max = backoff_max
+        self._checker = ThreadPoolExecutor(max_workers=len(self.agents), thread_name_prefix="health")
+        self._stopping = False
+        self._started_at = 0.0
+        self._all_ready_reported = False
+        self._rolling: deque = deque()
+        self._rolling_agent: AgentProcess | None = None
+        self._mtimes: dict = {}
+        self._next_watch = 0.0
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def start(self) -> None:
+        self._started_at = time.monotonic()
+        for agent in self.agents:
+            print(f"  Starting {agent.name} on port {agent.port}...")
+            agent.spawn()
+        if self.watch:
+            self._mtimes = _source_mtimes(PROJECT_ROOT)
+            self._next_watch = time.monotonic() + WATCH_INTERVAL_SEC
+
+    def run(self) -> None:
+        """Supervise until stop() (or Ctrl+C)."""
+        while not self._stopping:
+            self.tick()
+            time.sleep(TICK_SEC)
+
+    def stop(self) -> None:
+        self._stopping = True
+        print("\nShutting down all agents...")
+        for agent in self.agents:
+            if agent.proc is not None and agent.proc.poll() is None:
+                agent.proc.terminate()
+        for agent in self.agents:
+            agent.stop()
+            print(f"  Stopped {agent.name} (port {agent.port})")
+        self._checker.shutdown(wait=False)
+        print("All agents stopped.")
+
+    # -- supervision -------------------------------------------------------
+
+    def tick(self) -> None:
+        now = time.monotonic()
+        due = []
+        for agent in self.agents:
+            if agent.state == "backoff" and now >= agent.restart_at:
+                print(f"  Restarting {agent.name} (attempt {agent.failures})")
+                agent.restarts += 1
+                agent.spawn()
+            elif agent.state in ("starting", "ready"):
+                if agent.proc.poll() is not None:
+                    self._failed(agent, f"exited with code {agent.proc.returncode}")
+                elif agent.state == "starting" and now - agent.spawned_at > self.ready_timeout:
+                    agent.proc.kill()
+                    agent.proc.wait()
+                    self._failed(agent, f"not ready after {self.ready_timeout:.0f}s")
+                elif now >= agent.next_check:
+                    due.append(agent)
+
+        # Health checks run in parallel so one hung agent doesn't stall the rest
+        for agent, ok in zip(due, self._checker.map(AgentProcess.healthy, due)):
+            self._checked(agent, ok, time.monotonic())
+
+        if not self._all_ready_reported and all(a.state == "ready" for a in self.agents):
+            self._all_ready_reported = True
+            self.report()
+        if self.watch and now >= self._next_watch:
+            self._next_watch = now + WATCH_INTERVAL_SEC
+            self._check_sources()
+        self._advance_roll()
+
+    def _checked(self, agent: AgentProcess, ok: bool, now: float) -> None:
+        if agent.state == "starting":
+            agent.next_check = now + READY_POLL_SEC
+            if ok:
+                agent.state = "ready"
+                agent.ready_at = now
+                agent.startup_sec = round(now - agent.spawned_at, 2)
+                agent.next_check = now + self.health_interval
+                print(f"  {agent.name} ready in {agent.startup_sec:.2f}s "
+                      f"(pid {agent.proc.pid}, port {agent.port})")
+            return
+
+        agent.next_check = now + self.health_interval
+        if ok:
+            agent.health_failures = 0
+            if agent.failures and now - agent.ready_at >= STABLE_SEC:
+                agent.failures = 0
+            return
+        agent.health_failures += 1
+        if agent.health_failures >= self.health_failures:
+            agent.stop(grace=5)
+            self._failed(agent, f"failed /health {agent.health_failures} times in a row")
+
+    def _failed(self, agent: AgentProcess, reason: str) -> None:
+        agent.failures += 1
+        delay = min(BACKOFF_BASE_SEC * 2 ** (agent.failures - 1), self.backoff_max)
+        agent.state = "backoff"
+        agent.restart_at = time.monotonic() + delay
+        print(f"WARNING: {agent.name} (port {agent.port}) {reason}; restarting in {delay:.0f}s")
+        if agent is self._rolling_agent:
+            print(f"WARNING: rolling restart stopped: {agent.name} did not come back "
+                  f"({len(self._rolling)} agent(s) left on the previous code)")
+            self._rolling.clear()
+            self._rolling_agent = None
+
+    # -- rolling restart ---------------------------------------------------
+
+    def _check_sources(self) -> None:
+        mtimes = _source_mtimes(PROJECT_ROOT)
+        changed = sorted(p for p in mtimes.keys() | self._mtimes.keys()
+                         if mtimes.get(p) != self._mtimes.get(p))
+        self._mtimes = mtimes
+        if not changed:
+            return
+        names = ", ".join(os.path.relpath(p, PROJECT_ROOT) for p in changed[:3])
+        more = f" (+{len(changed) - 3} more)" if len(changed) > 3 else ""
+        print(f"Code changed: {names}{more} -> rolling restart")
+        self.rolling_restart()
+
+    def rolling_restart(self) -> None:
+        """Restart every agent, one at a time, each once the previous is ready."""
+        queued = {a.name for a in self._rolling}
+        self._rolling.extend(a for a in self.agents if a.name not in queued)
+
+    def _advance_roll(self) -> None:
+        current = self._rolling_agent
+        if current is not None and current.state != "ready":
+            return  # still coming back up
+        self._rolling_agent = None
+        while self._rolling:
+            agent = self._rolling.popleft()
+            if agent.state == "backoff":
+                continue  # about to start on the new code anyway
+            print(f"  Rolling restart: {agent.name}")
+            agent.stop()
+            agent.restarts += 1
+            agent.spawn()
+            self._rolling_agent = agent
+            return
 
-    processes = []
+    # -- reporting ---------------------------------------------------------
+
+    def report(self) -> None:
+        total = max(a.ready_at for a in self.agents) - self._started_at
+        print("\n" + "=" * 60)
+        print(f"ALL AGENTS READY in {total:.2f}s:")
+        for agent in self.agents:
+            print(f"  {agent.name:20s} -> http://localhost:{agent.port}/a2a  "
+                  f"(PID: {agent.proc.pid}, startup {agent.startup_sec:.2f}s)")
+        print("=" * 60)
+        print("\nPress Ctrl+C to stop all agents.\n")
+
+    def status(self) -> list[dict]:
+        return [{"agent": a.name, "port": a.port, "state": a.state,
+                 "pid": a.proc.pid if a.proc is not None else None,
+                 "startup_sec": a.startup_sec, "restarts": a.restarts}
+                for a in self.agents]
+
+
+def main():
+    """Launch all agent servers as supervised subprocesses."""
+    parser = argparse.ArgumentParser(description="Launch and supervise all A2A agent servers")
+    parser.add_argument("--server", choices=list(SERVER_SCRIPTS), default="flask",
+                        help="Server per agent: flask (a2a_agent_server.py, default) "
+                             "or asgi (a2a_asgi_server.py)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Rolling restart when a project .py file changes")
+    args = parser.parse_args()
 
     print("=" * 60)
     print("LAUNCHING ALL A2A AGENT SERVERS")
     print("=" * 60)
 
-    for agent_name, port in AGENTS:
-        print(f"  Starting {agent_name} on port {port}...")
-        proc = subprocess.Popen(
-            [
-                sys.executable,
-                server_script,
-                "--agent", agent_name,
-                "--port", str(port),
-            ],
-            cwd=project_root,
-        )
-        processes.append((agent_name, port, proc))
-        time.sleep(1)  # Stagger startup
+    supervisor = Supervisor(AGENTS, server=args.server, watch=args.watch)
 
-    print("\n" + "=" * 60)
-    print("ALL AGENTS RUNNING:")
-    for agent_name, port, proc in processes:
-        print(f"  {agent_name:20s} -> http://localhost:{port}/a2a  (PID: {proc.pid})")
-    print("=" * 60)
-    print("\nPress Ctrl+C to stop all agents.\n")
+    def terminate(*_):
+        raise KeyboardInterrupt
+
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, terminate)
 
-    # Wait for Ctrl+C
+    supervisor.start()
     try:
-        while True:
-            # Check if any process has died
-            for agent_name, port, proc in processes:
-                if proc.poll() is not None:
-                    print(f"WARNING: {agent_name} (port {port}) has exited "
-                          f"with code {proc.returncode}")
-            time.sleep(5)
+        supervisor.run()
     except KeyboardInterrupt:
-        print("\nShutting down all agents...")
-        for agent_name, port, proc in processes:
-            proc.terminate()
-            print(f"  Stopped {agent_name} (port {port})")
-
-        # Wait for all to exit
-        for _, _, proc in processes:
-            proc.wait(timeout=10)
-
-        print("All agents stopped.")
+        supervisor.stop()
 
 
 if __name__ == "__main__":
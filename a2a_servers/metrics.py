@@ -0,0 +1,287 @@
+"""
+Prometheus-style metrics for the A2A agent servers — no client library.
+
+GET /metrics on every agent server (and on the multi-agent host) returns the
+text exposition format, so Prometheus, Grafana Agent or a plain `curl` can
+scrape it:
+
+    a2a_requests_total{agent,endpoint,status}          counter
+    a2a_request_duration_seconds{agent,endpoint}       histogram, wall time
+    a2a_kickoff_duration_seconds{agent}                histogram, one agent run
+    a2a_llm_duration_seconds{agent}                    histogram, Claude time per run
+    a2a_sql_duration_seconds{agent,source}             histogram, SQL time per run / data call
+    a2a_llm_calls_total / a2a_sql_queries_total{agent} counters
+    a2a_llm_tokens_total{agent,type}                   prompt / completion tokens
+    a2a_in_flight{agent}                               gauge
+    a2a_pool_*{agent}                                  size, in_use, waiting, saturation, rejected
+    a2a_tasks_queued{agent}                            gauge
+    a2a_response_cache_* / a2a_result_cache_*          hits, misses, entries, hit ratio
+
+LLM and SQL time are the sums of the llm.call / sql.query spans (tools/
+tracing.py) a run opens, observed with `listen_spans`; token counts come from
+the llm.call span attributes set by config/llm_factory.py.
+
+Everything lives in one process-wide registry; gauges are read from their
+sources (pool, caches, task queue) at scrape time.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+from tools.tracing import listen_spans
+
+# Seconds: sub-second /data and cache hits up to multi-minute agent runs
+BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 90, 120, 180, 300)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_HELP = {
+    "a2a_requests_total": ("counter", "HTTP requests by agent, endpoint and status."),
+    "a2a_request_duration_seconds": ("histogram", "HTTP request wall time."),
+    "a2a_kickoff_duration_seconds": ("histogram", "Agent kickoff wall time."),
+    "a2a_llm_duration_seconds": ("histogram", "Time in LLM calls per agent run."),
+    "a2a_sql_duration_seconds": ("histogram", "Time in SQL queries per agent run or data call."),
+    "a2a_llm_calls_total": ("counter", "LLM calls made by agent runs."),
+    "a2a_sql_queries_total": ("counter", "SQL queries executed (result-cache misses)."),
+    "a2a_llm_tokens_total": ("counter", "LLM tokens by type (prompt, completion)."),
+}
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry:
+    """Counters and histograms keyed by (name, labels), plus named scrape-time
+    collectors that yield (name, type, help, labels, value)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict = {}
+        self._histograms: dict = {}
+        self._collectors: dict = {}
+        self.started = time.time()
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [[0] * len(BUCKETS), 0.0, 0]
+            index = bisect.bisect_left(BUCKETS, value)
+            if index < len(BUCKETS):
+                hist[0][index] += 1
+            hist[1] += value
+            hist[2] += 1
+
+    def set_collector(self, key: str, collector) -> None:
+        """Register (or replace) the scrape-time collector named `key`."""
+        with self._lock:
+            self._collectors[key] = collector
+
+    def render(self) -> str:
+        """The registry in Prometheus text exposition format."""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {k: ([*v[0]], v[1], v[2]) for k, v in self._histograms.items()}
+            collectors = list(self._collectors.values())
+
+        families: dict = {}
+        for (name, labels), value in counters.items():
+            families.setdefault(name, []).append(f"{name}{_labels(labels)} {_number(value)}")
+        for (name, labels), (buckets, total, count) in histograms.items():
+            lines = families.setdefault(name, [])
+            cumulative = 0
+            for bound, n in zip(BUCKETS, buckets):
+                cumulative += n
+                lines.append(f"{name}_bucket{_labels(labels + (('le', _number(bound)),))} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {count}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(round(total, 6))}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+
+        help_text = dict(_HELP)
+        for collector in collectors:
+            try:
+                samples = list(collector())
+            except Exception:
+                continue  # a source that can't be read must not break the scrape
+            for name, kind, doc, labels, value in samples:
+                if value is None:
+                    continue
+                help_text.setdefault(name, (kind, doc))
+                families.setdefault(name, []).append(
+                    f"{name}{_labels(tuple(sorted(labels.items())))} {_number(value)}")
+
+        help_text["a2a_uptime_seconds"] = ("gauge", "Seconds since the server started.")
+        families["a2a_uptime_seconds"] = [f"a2a_uptime_seconds {round(time.time() - self.started, 1)}"]
+
+        out = []
+        for name in sorted(families):
+            kind, doc = help_text.get(name, ("untyped", ""))
+            out.append(f"# HELP {name} {doc}")
+            out.append(f"# TYPE {name} {kind}")
+            out.extend(families[name])
+        return "\n".join(out) + "\n"
+
+
+_registry = Registry()
+
+
+def get_registry() -> Registry:
+    return _registry
+
+
+@contextmanager
+def observe_run(agent_name: str, source: str = "agent"):
+    """Account the LLM/SQL spans opened inside the block to one agent run
+    (source="agent") or data call (source="data")."""
+    totals = {"llm": 0.0, "sql": 0.0, "llm_calls": 0, "sql_queries": 0,
+              "prompt_tokens": 0, "completion_tokens": 0}
+
+    def on_span(phase, name, category, attrs, duration_sec, error):
+        if phase != "end" or category not in ("llm", "sql"):
+            return
+        totals[category] += duration_sec
+        if category == "llm":
+            totals["llm_calls"] += 1
+            totals["prompt_tokens"] += attrs.get("prompt_tokens", 0)
+            totals["completion_tokens"] += attrs.get("completion_tokens", 0)
+        else:
+            totals["sql_queries"] += 1
+
+    started = time.perf_counter()
+    try:
+        with listen_spans(on_span):
+            yield
+    finally:
+        registry = _registry
+        if source == "agent":
+            registry.observe("a2a_kickoff_duration_seconds", time.perf_counter() - started,
+                             agent=agent_name)
+            registry.observe("a2a_llm_duration_seconds", totals["llm"], agent=agent_name)
+            registry.inc("a2a_llm_calls_total", totals["llm_calls"], agent=agent_name)
+            registry.inc("a2a_llm_tokens_total", totals["prompt_tokens"], agent=agent_name, type="prompt")
+            registry.inc("a2a_llm_tokens_total", totals["completion_tokens"], agent=agent_name,
+                         type="completion")
+        registry.observe("a2a_sql_duration_seconds", totals["sql"], agent=agent_name, source=source)
+        registry.inc("a2a_sql_queries_total", totals["sql_queries"], agent=agent_name)
+
+
+def endpoint_label(path: str) -> str:
+    """Bounded-cardinality endpoint name for a request path."""
+    path = path.rstrip("/") or "/"
+    for prefix, label in (("/tasks/", "/tasks/{id}"), ("/data/", "/data/{query_name}")):
+        if path.startswith(prefix):
+            return "/tasks/{id}/cancel" if label == "/tasks/{id}" and path.endswith("/cancel") else label
+    if path in ("/a2a", "/a2a/stream", "/tasks", "/data", "/health", "/metrics",
+                "/.well-known/agent.json"):
+        return path
+    return "other"
+
+
+def record_request(agent_name: str, path: str, status: int, duration_sec: float) -> None:
+    endpoint = endpoint_label(path)
+    _registry.inc("a2a_requests_total", agent=agent_name, endpoint=endpoint, status=str(status))
+    _registry.observe("a2a_request_duration_seconds", duration_sec,
+                      agent=agent_name, endpoint=endpoint)
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting and timing every HTTP request of one agent app
+    (streamed responses are timed to their last byte)."""
+
+    def __init__(self, app, agent_name: str):
+        self.app = app
+        self.agent_name = agent_name
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Under a Mount (Starlette >= 0.35), `path` still carries the prefix
+            path, root = scope["path"], scope.get("root_path", "")
+            if root and path.startswith(root):
+                path = path[len(root):] or "/"
+            record_request(self.agent_name, path, status["code"], time.perf_counter() - started)
+
+
+def pool_collector(agent_name: str, runner=None, pool=None, tasks=None):
+    """Scrape-time gauges for one agent: in-flight, pool occupancy, task queue."""
+    pool = pool or runner.pool
+
+    def collect():
+        stats = pool.stats()
+        labels = {"agent": agent_name}
+        # Flask has no runner: its in-flight runs are those holding or awaiting an agent
+        in_flight = runner.in_flight if runner is not None else stats["in_use"] + stats["waiting"]
+        yield "a2a_in_flight", "gauge", "Agent runs in flight.", labels, in_flight
+        yield "a2a_pool_size", "gauge", "Agent instances the pool may hold.", labels, stats["size"]
+        yield "a2a_pool_created", "gauge", "Agent instances built and alive.", labels, stats["created"]
+        yield "a2a_pool_in_use", "gauge", "Agent instances running a kickoff.", labels, stats["in_use"]
+        yield "a2a_pool_waiting", "gauge", "Requests queued for an agent instance.", labels, stats["waiting"]
+        yield ("a2a_pool_saturation", "gauge", "in_use / size.", labels,
+               round(stats["in_use"] / stats["size"], 3) if stats["size"] else None)
+        yield ("a2a_pool_rejected_total", "counter", "Requests refused because pool and queue were full.",
+               labels, stats["rejected"])
+        yield "a2a_pool_checkouts_total", "counter", "Agent instance checkouts.", labels, stats["checkouts"]
+        if tasks is not None:
+            yield "a2a_tasks_queued", "gauge", "Background tasks waiting for a worker.", labels, tasks.queued
+
+    return collect
+
+
+def cache_collector():
+    """Scrape-time gauges for the process-wide response and result caches."""
+    def collect():
+        from a2a_servers.response_cache import get_response_cache
+        from tools.result_cache import get_result_cache
+
+        for prefix, stats in (("a2a_response_cache", get_response_cache().stats()),
+                              ("a2a_result_cache", get_result_cache().stats())):
+            what = "A2A reply" if prefix == "a2a_response_cache" else "SQL result"
+            yield f"{prefix}_hits_total", "counter", f"{what} cache hits.", {}, stats["hits"]
+            yield f"{prefix}_misses_total", "counter", f"{what} cache misses.", {}, stats["misses"]
+            yield f"{prefix}_entries", "gauge", f"{what} cache entries.", {}, stats["entries"]
+            yield f"{prefix}_hit_ratio", "gauge", f"{what} cache hit ratio.", {}, stats["hit_ratio"]
+
+    return collect
+
+
+def register_agent(agent_name: str, runner=None, pool=None, tasks=None) -> None:
+    """Gauges for one agent's server plus the process-wide caches."""
+    _registry.set_collector(f"agent:{agent_name}", pool_collector(agent_name, runner, pool, tasks))
+    _registry.set_collector("caches", cache_collector())
+
+
+def metrics_text() -> str:
+    return _registry.render()
@@ -0,0 +1,181 @@
+"""
+Watermark-aware cache of A2A agent replies.
+
+Dashboards ask the same questions ("today's TIER 1 setups") many times a day,
+and each /a2a call is a full CrewAI loop with SQL and LLM. A reply can only
+change when the data behind the agent changes, so replies are cached under
+
+    (agent name, normalized message text, watermark of the agent's query set)
+
+where the watermark is the latest date of every table the agent's predefined
+queries read (tools/watermarks.py). New data moves the watermark, which
+changes the key: the next identical question re-runs the agent, and until
+then it is answered from memory.
+
+HTTP semantics:
+  - ETag is derived from the key, so it changes exactly when the answer may
+  - Cache-Control: private, no-cache  (clients may keep it but revalidate)
+  - If-None-Match with the current ETag -> 304 when the reply is cached
+  - "Cache-Control: no-cache" on the request, or {"cache": false} in the
+    body, forces a fresh run (whose reply then replaces the cached one)
+
+Reply metadata carries {"cache": {"hit": ..., "etag": ..., "data_as_of": ...}}.
+
+If watermarks can't be read (SQL Server down) nothing is cached or served
+from cache — a stale answer is never returned without a watermark to prove
+it current. Neither is anything for an agent whose queries read a table no
+watermark covers (risk: portfolio and alerts; tech_signal: signal outcomes;
+strategy_trade: the trade log) — its reply can change with the watermark
+standing still. Entries also expire after A2A_RESPONSE_CACHE_TTL_SEC.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from config.settings import (
+    A2A_RESPONSE_CACHE_ENABLED,
+    A2A_RESPONSE_CACHE_MAX_ENTRIES,
+    A2A_RESPONSE_CACHE_TTL_SEC,
+)
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def normalize_message(text: str) -> str:
+    """Case/whitespace/trailing-punctuation insensitive form of a question."""
+    return " ".join(text.lower().split()).rstrip("?!. ")
+
+
+def agent_watermark(agent_name: str) -> tuple:
+    """((table, 'YYYY-MM-DD'|None), ...) over every table the agent's
+    predefined queries read; () if any of them reads a table outside the
+    watermark registry."""
+    from a2a_servers.a2a_protocol import agent_queries
+    from tools.watermarks import get_watermarks, tables_in, unwatermarked_tables
+
+    queries = agent_queries(agent_name).values()
+    if any(unwatermarked_tables(sql) for sql in queries):
+        return ()
+    marks = get_watermarks()
+    tables = sorted({t for sql in queries for t in tables_in(sql)})
+    return tuple((t, marks[t].isoformat() if marks.get(t) else None) for t in tables)
+
+
+class CacheKey:
+    __slots__ = ("agent_name", "message", "watermark", "etag")
+
+    def __init__(self, agent_name: str, message: str, watermark: tuple):
+        self.agent_name = agent_name
+        self.message = message
+        self.watermark = watermark
+        digest = hashlib.sha256(repr((agent_name, message, watermark)).encode()).hexdigest()
+        self.etag = f'"{digest[:32]}"'
+
+
+class ResponseCache:
+    """LRU of agent replies keyed by CacheKey.etag."""
+
+    def __init__(self, max_entries: int = A2A_RESPONSE_CACHE_MAX_ENTRIES,
+                 ttl_sec: float = A2A_RESPONSE_CACHE_TTL_SEC,
+                 enabled: bool = A2A_RESPONSE_CACHE_ENABLED):
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self.enabled = enabled
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, agent_name: str, message_text: str) -> CacheKey | None:
+        """Key for a question, or None when caching is off / no watermark."""
+        if not self.enabled:
+            return None
+        try:
+            watermark = agent_watermark(agent_name)
+        except Exception:
+            return None
+        if not watermark:
+            return None  # nothing proves a cached reply current
+        return CacheKey(agent_name, normalize_message(message_text), watermark)
+
+    def get(self, key: CacheKey | None) -> dict | None:
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key.etag)
+            if entry is not None and time.monotonic() - entry["stored"] <= self.ttl_sec:
+                self._entries.move_to_end(key.etag)
+                self.hits += 1
+                return entry
+            self.misses += 1
+            return None
+
+    def put(self, key: CacheKey | None, text: str, agent_role: str) -> None:
+        if key is None:
+            return
+        with self._lock:
+            self._entries[key.etag] = {
+                "text": text,
+                "agent_role": agent_role,
+                "cached_at": datetime.now().isoformat(timespec="seconds"),
+                "stored": time.monotonic(),
+            }
+            self._entries.move_to_end(key.etag)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+            }
+
+
+def wants_fresh(headers, data: dict) -> bool:
+    """Client asked to bypass the cache for this request."""
+    return "no-cache" in (headers.get("cache-control") or "").lower() or data.get("cache") is False
+
+
+def not_modified(headers, key: CacheKey | None, entry: dict | None) -> bool:
+    """If-None-Match names the current reply, which we still hold."""
+    if key is None or entry is None:
+        return False
+    tags = [t.strip() for t in (headers.get("if-none-match") or "").split(",")]
+    return key.etag in tags or "*" in tags
+
+
+def cache_metadata(key: CacheKey | None, hit: bool, entry: dict | None = None) -> dict:
+    if key is None:
+        return {"cache": {"hit": False, "cacheable": False}}
+    return {"cache": {
+        "hit": hit,
+        "etag": key.etag,
+        "cached_at": entry["cached_at"] if entry else None,
+        "data_as_of": {t: d for t, d in key.watermark},
+    }}
+
+
+def cache_headers(key: CacheKey | None) -> dict:
+    if key is None:
+        return {"Cache-Control": "no-store"}
+    return {"ETag": key.etag, "Cache-Control": CACHE_CONTROL}
+
+
+_cache: ResponseCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide reply cache (shared by every agent on the multi-agent host)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
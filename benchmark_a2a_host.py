@@ -0,0 +1,202 @@
+"""
+Benchmark: six single-agent A2A processes (launch_all_agents.py layout) vs.
+one multi-agent host (a2a_servers/a2a_host.py).
+
+For each layout this reports
+  - startup: spawn until every agent answers /health
+  - RSS idle: total resident memory once healthy
+  - RSS warm: total resident memory after one /a2a request per agent
+
+The agent factory is replaced by a stub that imports the modules a real
+agent pulls in (--imports; whichever of them are installed are loaded) and
+answers instantly, so the memory numbers reflect import/runtime footprint,
+not LLM calls. Processes are spawned together, as launch_all_agents.py does.
+
+No SQL Server, API key or network needed.
+
+Usage:
+    py -3.12 benchmark_a2a_host.py
+    py -3.12 benchmark_a2a_host.py --imports crewai,anthropic,pyodbc
+"""
+
+import argparse
+import importlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_IMPORTS = "crewai,anthropic,pyodbc,pandas,pyarrow"
+
+
+def _rss_mb(pid: int):
+    """Resident set size of a process in MB (None if unavailable)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss / (1024 * 1024)
+    except Exception:
+        return None
+
+
+def _stub_factory(imports: list[str]):
+    class StubAgent:
+        role = "Stub Agent"
+
+        def kickoff(self, message):
+            return f"stub reply to: {message}"
+
+    def factory(agent_name):
+        for module in imports:
+            try:
+                importlib.import_module(module)
+            except Exception:
+                pass  # not installed here (or no native driver); skip
+        return StubAgent()
+
+    return factory
+
+
+def _serve(mode: str, agent: str, port: int, compat: dict, imports: list[str]):
+    """Child-process body."""
+    from a2a_servers import a2a_protocol
+
+    factory = _stub_factory(imports)
+    a2a_protocol.create_agent_from_name = factory
+    if mode == "agent":
+        from a2a_servers import a2a_agent_server
+
+        a2a_agent_server.create_agent_from_name = factory
+        a2a_agent_server.create_a2a_app(agent).run(host="127.0.0.1", port=port, debug=False)
+    else:
+        import asyncio
+        from a2a_servers.a2a_host import create_host_app, serve_host
+
+        app = create_host_app()
+        asyncio.run(serve_host(app, "127.0.0.1", port, compat))
+
+
+def _free_ports(n: int) -> list[int]:
+    socks, ports = [], []
+    for _ in range(n):
+        s = socket.socket()
+        s.bind(("127.0.0.1", 0))
+        socks.append(s)
+        ports.append(s.getsockname()[1])
+    for s in socks:
+        s.close()
+    return ports
+
+
+def _wait_healthy(urls: list[str], timeout: float = 60) -> None:
+    import requests
+
+    pending = set(urls)
+    deadline = time.monotonic() + timeout
+    while pending and time.monotonic() < deadline:
+        for url in list(pending):
+            try:
+                if requests.get(f"{url}/health", timeout=0.5).ok:
+                    pending.discard(url)
+            except requests.RequestException:
+                pass
+        if pending:
+            time.sleep(0.05)
+    if pending:
+        raise RuntimeError(f"not healthy: {sorted(pending)}")
+
+
+def _warm(urls: list[str]) -> None:
+    import requests
+
+    for url in urls:
+        requests.post(f"{url}/a2a", json={"text": "warm up"}, timeout=120).raise_for_status()
+
+
+def _measure(layout: str, agents: list[str], imports: str) -> dict:
+    script = os.path.abspath(__file__)
+    ports = _free_ports(len(agents) + 1)
+    procs = []
+    start = time.perf_counter()
+    if layout == "6 processes":
+        for agent, port in zip(agents, ports):
+            procs.append(subprocess.Popen(
+                [sys.executable, script, "--serve", "agent", "--agent", agent,
+                 "--port", str(port), "--imports", imports],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            ))
+        urls = [f"http://127.0.0.1:{p}" for p in ports[:len(agents)]]
+    else:
+        compat = dict(zip(agents, ports[1:]))
+        procs.append(subprocess.Popen(
+            [sys.executable, script, "--serve", "host", "--port", str(ports[0]),
+             "--compat", json.dumps(compat), "--imports", imports],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        ))
+        # Legacy per-agent ports, i.e. what existing clients call
+        urls = [f"http://127.0.0.1:{compat[a]}" for a in agents]
+    try:
+        _wait_healthy(urls)
+        startup = time.perf_counter() - start
+        idle = sum(_rss_mb(p.pid) or 0 for p in procs)
+        _warm(urls)
+        warm = sum(_rss_mb(p.pid) or 0 for p in procs)
+    finally:
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            p.wait(timeout=30)
+    return {"layout": layout, "startup_sec": startup, "rss_idle_mb": idle,
+            "rss_warm_mb": warm, "processes": len(procs)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="6-process vs. single-host A2A benchmark.")
+    parser.add_argument("--imports", default=DEFAULT_IMPORTS,
+                        help=f"Modules the stub agent imports (default: {DEFAULT_IMPORTS})")
+    parser.add_argument("--serve", choices=["agent", "host"], help=argparse.SUPPRESS)
+    parser.add_argument("--agent", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--compat", default="{}", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    imports = [m.strip() for m in args.imports.split(",") if m.strip()]
+
+    if args.serve:
+        _serve(args.serve, args.agent, args.port, json.loads(args.compat), imports)
+        return
+
+    from a2a_servers.a2a_protocol import AGENT_FACTORIES
+
+    agents = list(AGENT_FACTORIES)
+    loadable = []
+    for module in imports:
+        try:
+            importlib.import_module(module)
+            loadable.append(module)
+        except Exception:
+            pass
+
+    print("=" * 78)
+    print(f"A2A HOSTING BENCHMARK — {len(agents)} agents, stub imports: "
+          f"{', '.join(loadable) or '(none installed)'}")
+    print("=" * 78)
+    print(f"  {'layout':14s} {'procs':>6s} {'startup s':>10s} {'RSS idle MB':>12s} {'RSS warm MB':>12s}")
+    for layout in ("6 processes", "single host"):
+        r = _measure(layout, agents, ",".join(imports))
+        print(f"  {r['layout']:14s} {r['processes']:6d} {r['startup_sec']:10.2f} "
+              f"{r['rss_idle_mb']:12.1f} {r['rss_warm_mb']:12.1f}")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Benchmark: Flask development A2A server vs. the ASGI server in
+a2a_servers/a2a_asgi_server.py.
+
+Each server runs in its own subprocess with the agent factory replaced by a
+stub whose kickoff() sleeps for --latency-ms (standing in for the Claude
+round trip) and then builds a ~2 KB reply. A pool of --clients keep-alive
+clients then sends --requests POST /a2a messages.
+
+Besides throughput and latency, the stub counts "overlapping kickoffs":
+kickoff() entered on an agent instance that is already running one. That is
+what happens to a real CrewAI agent when one cached instance serves
+concurrent requests; with the agent pool it should stay 0. Both servers use
+a pool of --concurrency agents; requests refused with 429 because the pool
+and its queue (A2A_POOL_MAX_WAITING) are full count as errors.
+
+No SQL Server, CrewAI or API key needed.
+
+Usage:
+    py -3.12 benchmark_a2a_server.py
+    py -3.12 benchmark_a2a_server.py --clients 16 --requests 320 --latency-ms 500 --concurrency 16
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+SERVERS = ["flask", "asgi"]
+AGENT = "forex"
+
+
+class StubAgent:
+    """Stands in for a CrewAI agent: fixed latency, no network."""
+
+    role = "Stub Forex Analyst"
+    _lock = threading.Lock()
+    overlaps = 0
+    calls = 0
+
+    def __init__(self, latency_sec: float, stats_path: str):
+        self.latency_sec = latency_sec
+        self.stats_path = stats_path
+        self._busy = False
+
+    def kickoff(self, message: str) -> str:
+        with StubAgent._lock:
+            if self._busy:
+                StubAgent.overlaps += 1
+            self._busy = True
+            StubAgent.calls += 1
+        try:
+            time.sleep(self.latency_sec)
+            return f"USD/INR outlook for: {message}\n" + "| pair | close | signal |\n" * 60
+        finally:
+            with StubAgent._lock:
+                self._busy = False
+                with open(self.stats_path, "w") as f:
+                    json.dump({"calls": StubAgent.calls, "overlaps": StubAgent.overlaps}, f)
+
+
+def _serve(server: str, port: int, latency_ms: float, concurrency: int, stats_path: str):
+    """Child-process body: run one server with the stub agent factory."""
+    from a2a_servers import a2a_protocol
+
+    def stub_factory(agent_name):
+        return StubAgent(latency_ms / 1000, stats_path)
+
+    a2a_protocol.create_agent_from_name = stub_factory
+    if server == "flask":
+        from a2a_servers import a2a_agent_server
+
+        a2a_agent_server.create_agent_from_name = stub_factory
+        app = a2a_agent_server.create_a2a_app(AGENT, concurrency=concurrency)
+        app.run(host="127.0.0.1", port=port, debug=False)   # as a2a_agent_server.main()
+    else:
+        import uvicorn
+        from a2a_servers.a2a_asgi_server import create_asgi_app
+
+        app = create_asgi_app(AGENT, concurrency=concurrency, request_timeout=120)
+        uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(url: str, timeout: float = 30) -> None:
+    import requests
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(f"{url}/health", timeout=1).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"server at {url} did not become healthy")
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round((len(ordered) - 1) * q / 100)))]
+
+
+def _drive(url: str, clients: int, total: int) -> dict:
+    """Send `total` messages from `clients` threads (one keep-alive Session each)."""
+    import requests
+
+    local = threading.local()
+    body = {"message": {"role": "user", "parts": [{"text": "What is USD/INR doing today?"}]}}
+
+    def one(_):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            ok = session.post(f"{url}/a2a", json=body, timeout=120).status_code == 200
+        except requests.RequestException:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(one, range(total)))
+    wall = time.perf_counter() - start
+    latencies = [r[0] * 1000 for r in results]
+    return {
+        "requests": total,
+        "errors": sum(1 for r in results if not r[1]),
+        "wall_sec": wall,
+        "throughput_rps": total / wall,
+        "p50_ms": _percentile(latencies, 50),
+        "p95_ms": _percentile(latencies, 95),
+        "max_ms": max(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="A2A server benchmark (stub LLM).")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=160)
+    parser.add_argument("--latency-ms", type=float, default=250)
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="Agent instance pool size (both servers)")
+    parser.add_argument("--serve", choices=SERVERS, help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--stats", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        _serve(args.serve, args.port, args.latency_ms, args.concurrency, args.stats)
+        return
+
+    print("=" * 78)
+    print(f"A2A SERVER BENCHMARK — {args.requests} requests, {args.clients} clients, "
+          f"stub LLM {args.latency_ms:.0f} ms, agent pool {args.concurrency}")
+    print("=" * 78)
+    print(f"  {'server':8s} {'req/s':>8s} {'p50 ms':>9s} {'p95 ms':>9s} {'max ms':>9s} "
+          f"{'errors':>7s} {'overlapping kickoffs':>21s}")
+
+    for server in SERVERS:
+        port = _free_port()
+        stats = os.path.join(tempfile.mkdtemp(), "stub_stats.json")
+        proc = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--serve", server,
+             "--port", str(port), "--latency-ms", str(args.latency_ms),
+             "--concurrency", str(args.concurrency), "--stats", stats],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        url = f"http://127.0.0.1:{port}"
+        try:
+            _wait_ready(url)
+            _drive(url, args.clients, args.clients)  # warm-up: agent creation, connections
+            result = _drive(url, args.clients, args.requests)
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+        with open(stats) as f:
+            overlaps = json.load(f)["overlaps"]
+        print(f"  {server:8s} {result['throughput_rps']:8.1f} {result['p50_ms']:9.0f} "
+              f"{result['p95_ms']:9.0f} {result['max_ms']:9.0f} {result['errors']:7d} "
+              f"{overlaps:21d}")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
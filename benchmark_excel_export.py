@@ -0,0 +1,140 @@
+"""
+Benchmark: default pandas/openpyxl Excel export vs. the streaming write-only
+engine in tools/excel_export.py.
+
+Builds a synthetic screening snapshot shaped like the NSE weekly export
+(2,000 rows x 60 mixed columns by default) and writes it with each engine.
+Every engine runs in a fresh subprocess so the peak RSS reported is that
+engine's alone, not the high-water mark left behind by the previous one.
+
+No SQL Server needed.
+
+Usage:
+    py -3.12 benchmark_excel_export.py
+    py -3.12 benchmark_excel_export.py --rows 5000 --cols 80 --repeat 3
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+ENGINES = ["pandas_openpyxl", "streaming", "streaming_chunked"]
+
+
+def _peak_rss_mb():
+    """Peak resident set size of this process in MB (None if unavailable)."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KB, macOS bytes
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+    except ImportError:
+        return None
+
+
+def _synthetic_snapshot(rows, cols):
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(42)
+    data = {
+        "ticker": [f"TICK{i:04d}.NS" for i in range(rows)],
+        "company_name": [f"Company {i} Limited" for i in range(rows)],
+        "market": "NSE",
+        "fetch_date": pd.Timestamp("2026-10-16"),
+    }
+    for c in range(cols - len(data)):
+        if c % 5 == 0:
+            data[f"category_{c}"] = rng.choice(["STRONG", "MODERATE", "WEAK"], rows)
+        else:
+            values = rng.normal(50, 20, rows)
+            values[rng.random(rows) < 0.05] = np.nan
+            data[f"metric_{c}"] = values
+    return pd.DataFrame(data)
+
+
+def _run_engine(engine, rows, cols, chunk_rows):
+    """Child-process body: write one workbook, print a JSON result line."""
+    df = _synthetic_snapshot(rows, cols)
+    baseline_mb = _peak_rss_mb()
+    path = os.path.join(tempfile.mkdtemp(), f"{engine}.xlsx")
+
+    start = time.perf_counter()
+    if engine == "pandas_openpyxl":
+        df.to_excel(path, index=False, sheet_name="Snapshot")
+    else:
+        from tools.excel_export import StreamingWorkbook
+
+        book = StreamingWorkbook(path)
+        if engine == "streaming_chunked":
+            for i in range(0, len(df), chunk_rows):
+                book.append_frame("Snapshot", df.iloc[i:i + chunk_rows])
+        else:
+            book.append_frame("Snapshot", df)
+        book.save()
+    seconds = time.perf_counter() - start
+
+    size_kb = os.path.getsize(path) / 1024
+    os.remove(path)
+    print(json.dumps({
+        "engine": engine,
+        "seconds": seconds,
+        "peak_rss_mb": _peak_rss_mb(),
+        "baseline_rss_mb": baseline_mb,
+        "file_kb": size_kb,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Excel export engine benchmark.")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--cols", type=int, default=60)
+    parser.add_argument("--chunk-rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--engine", choices=ENGINES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.engine:
+        _run_engine(args.engine, args.rows, args.cols, args.chunk_rows)
+        return
+
+    print("=" * 78)
+    print(f"EXCEL EXPORT BENCHMARK — {args.rows} rows x {args.cols} cols, "
+          f"{args.repeat} run(s) per engine")
+    print("=" * 78)
+    print(f"  {'engine':20s} {'sec/export':>10s} {'peak RSS MB':>12s} "
+          f"{'export delta MB':>16s} {'file KB':>9s}")
+
+    for engine in ENGINES:
+        results = []
+        for _ in range(args.repeat):
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--engine", engine,
+                 "--rows", str(args.rows), "--cols", str(args.cols),
+                 "--chunk-rows", str(args.chunk_rows)],
+                capture_output=True, text=True, check=True,
+            )
+            results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+        secs = sum(r["seconds"] for r in results) / len(results)
+        peak = max((r["peak_rss_mb"] or 0) for r in results)
+        delta = max(((r["peak_rss_mb"] or 0) - (r["baseline_rss_mb"] or 0)) for r in results)
+        print(f"  {engine:20s} {secs:10.2f} {peak:12.1f} {delta:16.1f} "
+              f"{results[0]['file_kb']:9.0f}")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,795 @@
+"""
+Load test: how many concurrent A2A / chat requests the agent servers sustain,
+and where they saturate.
+
+The servers under test are the real ones (a2a_host.py, a2a_asgi_server.py or
+a2a_agent_server.py) with two stand-ins, so no SQL Server, API key or
+network is needed and runs are reproducible:
+
+  - LLM       a scripted model that answers like Claude in CrewAI's ReAct
+              format after --llm-latency-ms: --sql-steps tool calls to
+              predefined queries named in the agent's tool description, then
+              a Final Answer of --reply-chars. With CrewAI installed the real
+              agents run on it (config/llm_factory.use_llm_class); without,
+              a stub agent replays the same tool loop.
+  - database  a SQLite file seeded with synthetic rows for every table the
+              predefined queries read (config/sql_queries.py), served through
+              the shared connection pool (tools/db_pool.py). It answers the
+              watermark batch, and any other query with deterministic rows
+              from the first table it reads, after --sql-latency-ms.
+
+Agent pool, reply/result caches, watermarks, tracing and /metrics are live.
+
+A request mix is weighted targets `agent[:kind]=weight`, kind one of a2a
+(default), stream, data or task, plus `chat` (chat_assistant.ask_question,
+run in this process on a pool of --concurrency chat agents):
+
+    --mix forex=3,risk=1,forex:data=2,chat=1
+
+Questions cycle through --distinct variants per agent, so repeats hit the
+reply cache the way real traffic would (--no-cache sends every message
+fresh). Each --clients value is one stage: that many closed-loop clients
+send --requests requests (or run for --duration seconds). Per stage and
+target the report shows throughput, p50/p95/p99 latency of successful
+requests and the error rate. A stage is marked saturated when its
+throughput grew <10% over the previous stage while p95 rose >20%.
+
+Results, with the config and each server's /health at the end of every
+stage, go to logs/loadtest/loadtest_<timestamp>.json; --compare last (or a
+path) prints throughput and p95 changes against an earlier run.
+
+Usage:
+    py -3.12 benchmark_load.py
+    py -3.12 benchmark_load.py --server host --clients 1,4,16,32 --requests 200
+    py -3.12 benchmark_load.py --mix forex=1,forex:data=4 --distinct 5 --compare last
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import queue
+import random
+import re
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+SERVERS = ["host", "asgi", "flask"]
+KINDS = ["a2a", "stream", "data", "task"]
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "loadtest")
+SYNTHETIC_END = date(2026, 1, 30)   # latest date in every seeded table
+CHAT_QUESTION = "What are the top TIER 1 signals and the best-performing ML model today?"
+OK = {200, 304}
+
+_TABLE_REF = re.compile(r"\b(?:FROM|JOIN)\s+(?:\[?dbo\]?\.)?\[?(\w+)\]?", re.IGNORECASE)
+_QUERY_NAME = re.compile(r"\b[a-z][a-z0-9]*(?:_[a-z0-9]+)+\b")
+_TOOL_NAME = re.compile(r"Tool Name:\s*(\w+)")
+_ACTION_QUERY = re.compile(r'"query_name"\s*:\s*"(\w+)"')
+
+
+# =============================================================================
+# Stand-in database
+# =============================================================================
+
+def source_tables() -> dict[str, str]:
+    """{table: date column} for every table a predefined query reads."""
+    from tools.watermarks import WATERMARK_REGISTRY, query_sets
+
+    tables = {}
+    for queries in query_sets().values():
+        for sql in queries.values():
+            for table in _TABLE_REF.findall(sql):
+                tables.setdefault(table, "trading_date")
+    tables.update(WATERMARK_REGISTRY)
+    return tables
+
+
+def seed_database(path: str, seed: int, tickers: int, days: int) -> dict:
+    """Synthetic rows (ticker x day) in every source table. Returns counts."""
+    rng = random.Random(seed)
+    names = [f"TCK{i:03d}" for i in range(tickers)]
+    dates = [(SYNTHETIC_END - timedelta(days=d)).isoformat() for d in range(days)]
+    signals = ["BUY", "SELL", "HOLD"]
+    conn = sqlite3.connect(path)
+    tables = source_tables()
+    for table, date_col in tables.items():
+        conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+        conn.execute(f'CREATE TABLE "{table}" (id INTEGER PRIMARY KEY, ticker TEXT, "{date_col}" TEXT, '
+                     f'value REAL, signal TEXT, confidence REAL)')
+        rows = [(None, t, d, round(rng.uniform(5, 500), 4), rng.choice(signals), round(rng.random(), 3))
+                for d in dates for t in names]
+        conn.executemany(f'INSERT INTO "{table}" VALUES (?, ?, ?, ?, ?, ?)', rows)
+        conn.execute(f'CREATE INDEX "ix_{table}_date" ON "{table}" ("{date_col}")')
+    conn.commit()
+    conn.close()
+    return {"tables": len(tables), "rows_per_table": tickers * days}
+
+
+class StandInCursor:
+    """pyodbc-shaped cursor over the synthetic SQLite tables."""
+
+    def __init__(self, conn: sqlite3.Connection, tables: dict, latency_sec: float):
+        self._cursor = conn.cursor()
+        self._tables = tables
+        self._latency_sec = latency_sec
+        self.description = None
+
+    def execute(self, sql: str, *params):
+        from tools.watermarks import WATERMARK_REGISTRY
+
+        time.sleep(self._latency_sec)  # the SQL Server round trip
+        if "STRING_AGG" in sql and "watermark" in sql:
+            parts = [f"SELECT '{t}' AS table_name, MAX(\"{c}\") AS watermark FROM \"{t}\""
+                     for t, c in WATERMARK_REGISTRY.items() if t in self._tables]
+            self._cursor.execute(" UNION ALL ".join(parts))
+        else:
+            read = [t for t in _TABLE_REF.findall(sql) if t in self._tables]
+            if not read:
+                self._cursor.execute("SELECT 0 AS value WHERE 0")
+            else:
+                limit = 5 + zlib.crc32(sql.encode()) % 46
+                self._cursor.execute(f'SELECT * FROM "{read[0]}" ORDER BY "{self._tables[read[0]]}" DESC, '
+                                     f'id LIMIT {limit}')
+        self.description = self._cursor.description
+        return self
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def close(self):
+        self._cursor.close()
+
+
+class StandInConnection:
+    def __init__(self, path: str, tables: dict, latency_sec: float):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._tables = tables
+        self._latency_sec = latency_sec
+
+    def cursor(self):
+        return StandInCursor(self._conn, self._tables, self._latency_sec)
+
+    def close(self):
+        self._conn.close()
+
+
+def stand_in_pool(path: str, latency_sec: float, size: int):
+    """A tools.db_pool.ConnectionPool whose connections are StandInConnections."""
+    from tools.db_pool import ConnectionPool
+
+    tables = source_tables()
+
+    class StandInPool(ConnectionPool):
+        def _open(self):
+            return StandInConnection(path, tables, latency_sec)
+
+    return StandInPool(conn_str=f"sqlite:{path}", max_size=size)
+
+
+# =============================================================================
+# Scripted LLM
+# =============================================================================
+
+class ScriptedModel:
+    """Deterministic stand-in for Claude in CrewAI's ReAct text format: a
+    tool call per step up to `sql_steps` (to a query named in the prompt),
+    then a Final Answer. Prompt/completion tokens are estimated at 4 chars."""
+
+    def __init__(self, latency_sec: float, sql_steps: int, reply_chars: int):
+        from tools.watermarks import query_sets
+
+        self.latency_sec = latency_sec
+        self.sql_steps = sql_steps
+        self.reply_chars = reply_chars
+        self.query_names = {name for queries in query_sets().values() for name in queries}
+        # chat_assistant prefixes its names (market_..., forex_...)
+        self.query_names |= {f"{prefix}_{name}" for prefix in
+                             ("market", "ml", "tech", "strategy", "forex", "risk", "valuation")
+                             for name in self.query_names}
+
+    def respond(self, llm, messages) -> str:
+        time.sleep(self.latency_sec)
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        prompt = "\n".join(str(m.get("content") or "") for m in messages)
+        question = next((str(m.get("content")) for m in messages if m.get("role") == "user"), prompt)
+        steps_done = sum(1 for m in messages if m.get("role") == "assistant")
+        seed = zlib.crc32(question.encode())
+
+        tool = _TOOL_NAME.search(prompt)
+        queries = sorted({q for q in _QUERY_NAME.findall(prompt) if q in self.query_names})
+        if tool and queries and steps_done < self.sql_steps:
+            query = queries[(seed + steps_done) % len(queries)]
+            out = (f"Thought: I need the {query} data.\nAction: {tool.group(1)}\n"
+                   f'Action Input: {{"query_name": "{query}"}}')
+        else:
+            line = f"| {seed % 997:>3} | synthetic finding for the question | {seed % 89:>2}% |\n"
+            body = (line * (self.reply_chars // len(line) + 1))[:self.reply_chars]
+            out = f"Thought: I now know the final answer\nFinal Answer: {body}"
+
+        track = getattr(llm, "_track_token_usage_internal", None)
+        if track is not None:
+            track({"prompt_tokens": len(prompt) // 4, "completion_tokens": len(out) // 4})
+        return out
+
+
+def crewai_llm_class(model: ScriptedModel):
+    """A CrewAI LLM class backed by `model`, built with crewai.LLM's kwargs."""
+    try:
+        from crewai.llms.base_llm import BaseLLM as Base   # crewai >= 1.0
+    except ImportError:
+        from crewai import LLM as Base                      # older: subclass LLM itself
+
+    class ScriptedLLM(Base):
+        def __init__(self, model: str = "scripted", **kwargs):
+            kwargs.pop("stream", None)
+            super().__init__(model=model, **kwargs)
+
+        def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+            return scripted.respond(self, messages)
+
+        def supports_function_calling(self) -> bool:
+            return False
+
+        def supports_stop_words(self) -> bool:
+            return True
+
+        def get_context_window_size(self) -> int:
+            return 200_000
+
+    scripted = model
+    return ScriptedLLM
+
+
+class _PlainLLM:
+    def __init__(self, model: ScriptedModel):
+        self._model = model
+
+    def call(self, messages, **kwargs):
+        return self._model.respond(self, messages)
+
+    def _track_token_usage_internal(self, usage_data):
+        pass
+
+
+class StubAgent:
+    """CrewAI-free agent: the same prompt -> tool -> observation loop over the
+    real result cache, with the LLM call traced like build_llm's."""
+
+    def __init__(self, role: str, tool_name: str, query_set: dict, model: ScriptedModel):
+        from config.llm_factory import _trace_calls
+
+        self.role = role
+        self.tool_name = tool_name
+        self.query_set = query_set
+        self.llm = _trace_calls(_PlainLLM(model), "scripted")
+
+    def kickoff(self, message: str) -> str:
+        from tools.result_cache import cached_query
+
+        system = (f"Tool Name: {self.tool_name}\nTool Arguments: {{'query_name': str}}\n"
+                  f"Tool Description: Available queries: {', '.join(self.query_set)}")
+        messages = [{"role": "system", "content": system}, {"role": "user", "content": message}]
+        for _ in range(10):
+            out = self.llm.call(messages)
+            if "Final Answer:" in out:
+                return out.split("Final Answer:", 1)[1].strip()
+            query = _ACTION_QUERY.search(out)
+            if query is None or query.group(1) not in self.query_set:
+                observation = "Query not found."
+            else:
+                columns, rows, _ = cached_query(self.query_set[query.group(1)])
+                observation = "\n".join([" | ".join(columns)] +
+                                        [" | ".join("NULL" if v is None else str(v) for v in row)
+                                         for row in rows])
+            messages.append({"role": "assistant", "content": f"{out}\nObservation: {observation}"})
+        return "Agent stopped after 10 iterations."
+
+
+def crewai_available() -> bool:
+    try:
+        import crewai  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def install_stand_ins(args) -> str:
+    """Point this process at the stand-in database and scripted LLM.
+    Returns the agent mode in effect (crewai or stub)."""
+    from tools import db_pool
+
+    db_pool._default_pool = stand_in_pool(args.db, args.sql_latency_ms / 1000, args.sql_pool)
+    model = ScriptedModel(args.llm_latency_ms / 1000, args.sql_steps, args.reply_chars)
+    mode = args.agents
+    if mode == "auto":
+        mode = "crewai" if crewai_available() else "stub"
+    if mode == "crewai":
+        from config import llm_factory
+
+        llm_factory.use_llm_class(crewai_llm_class(model))
+    else:
+        from a2a_servers import a2a_protocol
+        from a2a_servers.agent_cards import AGENT_CARDS
+
+        def stub_factory(agent_name):
+            return StubAgent(AGENT_CARDS[agent_name]["name"], f"{agent_name}_data_query",
+                             a2a_protocol.agent_queries(agent_name), model)
+
+        a2a_protocol.create_agent_from_name = stub_factory
+    return mode
+
+
+def _chat_agent(mode: str, model_args):
+    if mode == "crewai":
+        import chat_assistant
+
+        return chat_assistant.create_chat_agent()
+    from tools.watermarks import query_sets
+
+    queries = {name: sql for qs in query_sets().values() for name, sql in qs.items()}
+    return StubAgent("Stock Data AI Assistant", "stock_data_query", queries, model_args)
+
+
+def _ask_chat(mode: str, agent, question: str) -> str:
+    if mode == "crewai":
+        import chat_assistant
+
+        return chat_assistant.ask_question(agent, question)
+    return agent.kickoff(question)
+
+
+# =============================================================================
+# Servers under test
+# =============================================================================
+
+def _serve(args) -> None:
+    """Child-process body: one server over the stand-ins."""
+    install_stand_ins(args)
+    if args.serve == "flask":
+        from a2a_servers.a2a_agent_server import create_a2a_app
+
+        app = create_a2a_app(args.agent, concurrency=args.concurrency)
+        app.run(host="127.0.0.1", port=args.port, debug=False, threaded=True)
+        return
+
+    import uvicorn
+
+    if args.serve == "host":
+        from a2a_servers.a2a_host import create_host_app
+
+        app = create_host_app(args.agent.split(","), concurrency=args.concurrency,
+                              request_timeout=args.timeout)
+    else:
+        from a2a_servers.a2a_asgi_server import create_asgi_app
+
+        app = create_asgi_app(args.agent, concurrency=args.concurrency, request_timeout=args.timeout)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(url: str, proc: subprocess.Popen, log_path: str, timeout: float = 120) -> None:
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with code {proc.returncode}; see {log_path}")
+        try:
+            if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"server at {url} did not become healthy; see {log_path}")
+
+
+def start_servers(args, agents: list[str], workdir: str) -> tuple[dict, list]:
+    """Spawn the servers for `agents`. Returns ({agent: base_url}, [(proc, url)])."""
+    passthrough = ["--db", args.db, "--agents", args.agents, "--concurrency", str(args.concurrency),
+                   "--timeout", str(args.timeout), "--llm-latency-ms", str(args.llm_latency_ms),
+                   "--sql-latency-ms", str(args.sql_latency_ms), "--sql-steps", str(args.sql_steps),
+                   "--reply-chars", str(args.reply_chars), "--sql-pool", str(args.sql_pool)]
+    groups = [",".join(agents)] if args.server == "host" else agents
+    urls, servers = {}, []
+    for group in groups:
+        port = _free_port()
+        log_path = os.path.join(workdir, f"server_{group.replace(',', '_')}.log")
+        with open(log_path, "w") as log:
+            proc = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), "--serve", args.server, "--agent", group,
+                 "--port", str(port), *passthrough],
+                stdout=subprocess.DEVNULL, stderr=log,
+            )
+        url = f"http://127.0.0.1:{port}"
+        servers.append((proc, url, log_path))
+        for agent in group.split(","):
+            urls[agent] = f"{url}/agents/{agent}" if args.server == "host" else url
+    for proc, url, log_path in servers:
+        _wait_ready(url, proc, log_path)
+    return urls, servers
+
+
+def stop_servers(servers: list) -> None:
+    for proc, _, _ in servers:
+        proc.terminate()
+    for proc, _, _ in servers:
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+# =============================================================================
+# Load
+# =============================================================================
+
+def parse_mix(mix: str) -> list[tuple[str, str, float]]:
+    """'forex=3,forex:data=1,chat=1' -> [(agent, kind, weight), ...]."""
+    from a2a_servers.a2a_protocol import AGENT_FACTORIES
+
+    targets = []
+    for item in mix.split(","):
+        name, _, weight = item.strip().partition("=")
+        agent, _, kind = name.partition(":")
+        if agent == "chat":
+            kind = "chat"
+        elif agent not in AGENT_FACTORIES:
+            raise SystemExit(f"Unknown agent '{agent}' in --mix (use: {', '.join(AGENT_FACTORIES)}, chat)")
+        elif (kind or "a2a") not in KINDS:
+            raise SystemExit(f"Unknown kind '{kind}' in --mix (use: {', '.join(KINDS)})")
+        targets.append((agent, kind or "a2a", float(weight or 1)))
+    return targets
+
+
+def target_name(agent: str, kind: str) -> str:
+    return agent if kind in ("a2a", "chat") else f"{agent}:{kind}"
+
+
+def request_plan(targets, distinct: int, seed: int):
+    """Endless deterministic stream of (target, agent, kind, payload)."""
+    from a2a_servers.a2a_client_example import EXAMPLE_QUERIES
+    from a2a_servers.a2a_protocol import agent_queries
+
+    rng = random.Random(seed)
+    weights = [w for _, _, w in targets]
+    queries = {agent: sorted(agent_queries(agent))[:distinct]
+               for agent, kind, _ in targets if kind == "data"}
+    while True:
+        agent, kind, _ = rng.choices(targets, weights)[0]
+        variant = rng.randrange(distinct)
+        if kind == "data":
+            payload = queries[agent][variant % len(queries[agent])]
+        elif kind == "chat":
+            payload = f"{CHAT_QUESTION} (#{variant})"
+        else:
+            payload = f"{EXAMPLE_QUERIES[agent]} (#{variant})"
+        yield target_name(agent, kind), agent, kind, payload
+
+
+class Driver:
+    """Sends one request of any kind; returns its status (int or error name)."""
+
+    def __init__(self, urls: dict, args, chat_mode: str | None):
+        from a2a_servers.a2a_client import A2AClient
+
+        self.urls = urls
+        self.args = args
+        # No retries or hedges: the harness measures what the server does
+        self.client = A2AClient(timeout=args.timeout + 30, hedge_after=None, max_attempts=1)
+        self.chat_mode = chat_mode
+        self._chat_agents: queue.Queue = queue.Queue()
+        self._chat_created = 0
+        self._chat_lock = threading.Lock()
+        self._chat_executor = ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="chat")
+        self._chat_model = None
+        if chat_mode is not None:
+            self._chat_model = ScriptedModel(args.llm_latency_ms / 1000, args.sql_steps, args.reply_chars)
+
+    def _chat(self, question: str) -> int:
+        with self._chat_lock:
+            build = self._chat_agents.empty() and self._chat_created < self.args.concurrency
+            if build:
+                self._chat_created += 1
+        agent = _chat_agent(self.chat_mode, self._chat_model) if build else self._chat_agents.get()
+        try:
+            _ask_chat(self.chat_mode, agent, question)
+        finally:
+            self._chat_agents.put(agent)
+        return 200
+
+    async def send(self, agent: str, kind: str, payload: str):
+        from a2a_servers.a2a_client import A2AError, message_body
+
+        fresh = self.args.no_cache
+        try:
+            if kind == "chat":
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._chat_executor, self._chat, payload)
+            url = self.urls[agent]
+            if kind == "a2a":
+                return (await self.client.send(url, payload, fresh=fresh))["status"]
+            if kind == "task":
+                await self.client.run_task(url, payload, poll_sec=0.2)
+                return 200
+            if kind == "data":
+                response, _ = await self.client.request("GET", f"{url}/data/{payload}")
+                return response.status_code
+            response, _ = await self.client.request("POST", f"{url}/a2a/stream",
+                                                    json=message_body(payload, fresh))
+            if response.status_code == 200 and "event: message" not in response.text:
+                return "stream_error"
+            return response.status_code
+        except A2AError as e:
+            return e.status or type(e).__name__
+        except Exception as e:
+            return type(e).__name__
+
+    async def aclose(self):
+        await self.client.aclose()
+        self._chat_executor.shutdown(wait=False)
+
+
+async def run_stage(driver: Driver, plan, clients: int, total: int, duration: float) -> tuple[list, float]:
+    """Closed loop: `clients` workers, each sending its next request as soon
+    as the previous one finishes. Returns ([(target, sec, status)], wall_sec)."""
+    loop = asyncio.get_running_loop()
+    results = []
+    sent = 0
+    stop_at = loop.time() + duration if duration else None
+
+    async def worker():
+        nonlocal sent
+        while (not total or sent < total) and (stop_at is None or loop.time() < stop_at):
+            sent += 1
+            target, agent, kind, payload = next(plan)
+            started = time.perf_counter()
+            status = await driver.send(agent, kind, payload)
+            results.append((target, time.perf_counter() - started, status))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    return results, time.perf_counter() - started
+
+
+def summarize(results: list, wall_sec: float) -> dict:
+    """Per-target and overall throughput, latency percentiles and errors."""
+    from tools.perf_regression import percentile
+
+    def stats(rows):
+        ok = [sec * 1000 for _, sec, status in rows if status in OK]
+        errors = {}
+        for _, _, status in rows:
+            if status not in OK:
+                errors[str(status)] = errors.get(str(status), 0) + 1
+        return {
+            "requests": len(rows),
+            "ok": len(ok),
+            "error_rate": round(1 - len(ok) / len(rows), 4) if rows else None,
+            "errors": errors,
+            "throughput_rps": round(len(rows) / wall_sec, 2) if wall_sec else None,
+            "p50_ms": round(percentile(ok, 50), 1) if ok else None,
+            "p95_ms": round(percentile(ok, 95), 1) if ok else None,
+            "p99_ms": round(percentile(ok, 99), 1) if ok else None,
+            "mean_ms": round(sum(ok) / len(ok), 1) if ok else None,
+        }
+
+    targets = {}
+    for row in results:
+        targets.setdefault(row[0], []).append(row)
+    return {"wall_sec": round(wall_sec, 2), "all": stats(results),
+            "targets": {name: stats(rows) for name, rows in sorted(targets.items())}}
+
+
+def server_health(servers: list) -> dict:
+    import httpx
+
+    health = {}
+    for _, url, _ in servers:
+        try:
+            health[url] = httpx.get(f"{url}/health", timeout=5).json()
+        except Exception as e:
+            health[url] = {"error": str(e)}
+    return health
+
+
+def mark_saturation(stages: list) -> None:
+    for prev, stage in zip(stages, stages[1:]):
+        prev_all, cur = prev["all"], stage["all"]
+        if not (prev_all["throughput_rps"] and cur["throughput_rps"] and prev_all["p95_ms"] and cur["p95_ms"]):
+            continue
+        stage["saturated"] = (cur["throughput_rps"] < prev_all["throughput_rps"] * 1.1
+                              and cur["p95_ms"] > prev_all["p95_ms"] * 1.2)
+
+
+# =============================================================================
+# Report
+# =============================================================================
+
+def _ms(value) -> str:
+    return "-" if value is None else f"{value:.0f}"
+
+
+def print_stage(stage: dict) -> None:
+    flag = "  << saturated" if stage.get("saturated") else ""
+    overall = stage["all"]
+    print(f"\n  {stage['clients']} client(s): {overall['requests']} requests in {stage['wall_sec']:.1f}s, "
+          f"{overall['throughput_rps']:.1f} req/s{flag}")
+    print(f"    {'target':22s} {'n':>5s} {'req/s':>7s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s} "
+          f"{'errors':>7s}")
+    for name, t in [*stage["targets"].items(), ("ALL", overall)]:
+        errors = f"{t['error_rate'] * 100:.1f}%" if t["error_rate"] else "0"
+        print(f"    {name:22s} {t['requests']:5d} {t['throughput_rps']:7.1f} {_ms(t['p50_ms']):>8s} "
+              f"{_ms(t['p95_ms']):>8s} {_ms(t['p99_ms']):>8s} {errors:>7s}")
+        if t["errors"]:
+            print(f"    {'':22s} {', '.join(f'{k}: {v}' for k, v in sorted(t['errors'].items()))}")
+
+
+def _pct(new, old) -> str:
+    if new is None or not old:
+        return "-"
+    return f"{(new - old) / old * 100:+.0f}%"
+
+
+def previous_result(exclude: str | None = None) -> str | None:
+    if not os.path.isdir(RESULTS_DIR):
+        return None
+    files = sorted(f for f in os.listdir(RESULTS_DIR) if f.startswith("loadtest_") and f.endswith(".json"))
+    files = [os.path.join(RESULTS_DIR, f) for f in files]
+    files = [f for f in files if f != exclude]
+    return files[-1] if files else None
+
+
+def print_comparison(current: dict, baseline_path: str) -> None:
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\n  vs. {os.path.basename(baseline_path)} (req/s change, p95 change):")
+    old_stages = {s["clients"]: s for s in baseline["stages"]}
+    if not any(stage["clients"] in old_stages for stage in current["stages"]):
+        print(f"    no stage in common (earlier --clients {','.join(map(str, old_stages))})")
+        return
+    for stage in current["stages"]:
+        old = old_stages.get(stage["clients"])
+        if old is None:
+            continue
+        for name, t in [*stage["targets"].items(), ("ALL", stage["all"])]:
+            o = old["all"] if name == "ALL" else old["targets"].get(name)
+            if o is None:
+                continue
+            print(f"    {stage['clients']:>3d} clients  {name:22s} req/s {_pct(t['throughput_rps'], o['throughput_rps']):>6s}"
+                  f"   p95 {_pct(t['p95_ms'], o['p95_ms']):>6s}")
+
+
+# =============================================================================
+# Main
+# =============================================================================
+
+async def run_load(args, targets, urls, servers, chat_mode) -> list:
+    driver = Driver(urls, args, chat_mode)
+    stages = []
+    try:
+        # Warm-up, not recorded: builds an agent per target and opens connections
+        for agent, kind, _ in targets:
+            plan = request_plan([(agent, kind, 1)], args.distinct, args.seed)
+            _, _, _, payload = next(plan)
+            await driver.send(agent, kind, payload)
+        for index, clients in enumerate(args.clients):
+            plan = request_plan(targets, args.distinct, args.seed + index)
+            results, wall = await run_stage(driver, plan, clients, args.requests, args.duration)
+            stage = {"clients": clients, **summarize(results, wall), "server_health": server_health(servers)}
+            stages.append(stage)
+            mark_saturation(stages)
+            print_stage(stage)
+    finally:
+        await driver.aclose()
+    return stages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="A2A / chat load test (scripted LLM, synthetic DB).")
+    parser.add_argument("--server", choices=SERVERS, default="host",
+                        help="host: every agent in one a2a_host.py process (default); "
+                             "asgi / flask: one server process per agent")
+    parser.add_argument("--mix", default="market_intel=1,ml_analyst=1,tech_signal=1,"
+                                         "strategy_trade=1,forex=1,risk=1",
+                        help="Weighted targets agent[:kind]=weight; kinds a2a, stream, data, task; "
+                             "'chat' for chat_assistant")
+    parser.add_argument("--clients", default="1,4,16",
+                        help="Concurrent clients per stage, comma-separated (default: 1,4,16)")
+    parser.add_argument("--requests", type=int, default=100, help="Requests per stage (default: 100)")
+    parser.add_argument("--duration", type=float, default=0,
+                        help="Seconds per stage instead of a request count")
+    parser.add_argument("--distinct", type=int, default=10,
+                        help="Distinct questions / queries per agent (default: 10)")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the reply cache on every message")
+    parser.add_argument("--concurrency", type=int, default=4, help="Agent pool size per agent (default: 4)")
+    parser.add_argument("--timeout", type=float, default=120, help="Server request timeout (default: 120)")
+    parser.add_argument("--agents", choices=["auto", "crewai", "stub"], default="auto",
+                        help="crewai: real agents on the scripted LLM; stub: CrewAI-free agents "
+                             "(default: crewai when installed)")
+    parser.add_argument("--llm-latency-ms", type=float, default=300, help="Per LLM call (default: 300)")
+    parser.add_argument("--sql-latency-ms", type=float, default=20, help="Per SQL query (default: 20)")
+    parser.add_argument("--sql-steps", type=int, default=2, help="Tool calls per agent run (default: 2)")
+    parser.add_argument("--sql-pool", type=int, default=8, help="Stand-in SQL connections per process")
+    parser.add_argument("--reply-chars", type=int, default=2000, help="Final answer length (default: 2000)")
+    parser.add_argument("--tickers", type=int, default=50, help="Synthetic tickers per table (default: 50)")
+    parser.add_argument("--days", type=int, default=60, help="Synthetic days per table (default: 60)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--compare", help="Earlier result file to compare with, or 'last'")
+    parser.add_argument("--serve", choices=SERVERS, help=argparse.SUPPRESS)
+    parser.add_argument("--agent", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        _serve(args)
+        return
+
+    args.clients = [int(c) for c in str(args.clients).split(",")]
+    targets = parse_mix(args.mix)
+    agents = sorted({agent for agent, kind, _ in targets if kind != "chat"})
+    baseline = previous_result() if args.compare == "last" else args.compare
+
+    workdir = tempfile.mkdtemp(prefix="loadtest_")
+    args.db = os.path.join(workdir, "synthetic.db")
+    seeded = seed_database(args.db, args.seed, args.tickers, args.days)
+    chat_mode = install_stand_ins(args) if any(kind == "chat" for _, kind, _ in targets) else None
+    agent_mode = chat_mode or (args.agents if args.agents != "auto" else
+                               "crewai" if crewai_available() else "stub")
+
+    print("=" * 78)
+    print(f"A2A LOAD TEST — {args.server} server(s), {agent_mode} agents, pool {args.concurrency}/agent, "
+          f"LLM {args.llm_latency_ms:.0f} ms x {args.sql_steps + 1}, SQL {args.sql_latency_ms:.0f} ms")
+    print(f"  mix: {args.mix}")
+    print(f"  synthetic DB: {seeded['tables']} tables x {seeded['rows_per_table']} rows ({args.db})")
+    print("=" * 78)
+
+    urls, servers = start_servers(args, agents, workdir) if agents else ({}, [])
+    try:
+        stages = asyncio.run(run_load(args, targets, urls, servers, chat_mode))
+    finally:
+        stop_servers(servers)
+
+    saturated = next((s for s in stages if s.get("saturated")), None)
+    if saturated is not None:
+        print(f"\n  Saturates at ~{saturated['clients']} clients "
+              f"({saturated['all']['throughput_rps']:.1f} req/s)")
+
+    config = {k: v for k, v in vars(args).items() if k not in ("serve", "agent", "port", "db", "compare")}
+    result = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "agent_mode": agent_mode,
+        "config": config,
+        "stages": stages,
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"loadtest_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(path, "w") as f:
+        json.dump(result, f, indent=2, default=str)
+    print(f"\n  Saved {path}")
+
+    if baseline:
+        print_comparison(result, baseline)
+    elif args.compare:
+        print("\n  No earlier result to compare with.")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
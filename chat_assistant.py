@@ -10,6 +10,12 @@ through an AI assistant -- but now backed by specialized CrewAI agents.
 Usage:
     python chat_assistant.py                  # Interactive chat mode
     python chat_assistant.py --query "..."    # Single query mode
+    python chat_assistant.py --no-fast-path   # Send every question to the LLM
+
+Questions that map to exactly one predefined query ("What is the current
+USD/INR rate?") are answered straight from it by a keyword router
+(tools/intent_router.py) in well under a second and without tokens;
+everything else goes to the agent.
 
 Example questions:
     "Which TIER 1 BULLISH signals were generated today?"
@@ -29,7 +35,7 @@ from datetime import datetime
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from crewai import Agent, Crew, Task, Process
-from config.settings import AGENT_VERBOSE, AGENT_MAX_RPM
+from config.settings import AGENT_VERBOSE, AGENT_MAX_RPM, CHAT_FAST_PATH
 from config.llm_factory import build_llm
 from config.sql_queries import (
     MARKET_INTEL_QUERIES,
@@ -39,8 +45,10 @@ from config.sql_queries import (
     FOREX_QUERIES,
     RISK_QUERIES,
     VALUATION_QUERIES,
+    QUERY_DESCRIPTIONS,
 )
 from tools.sql_tool import SQLQueryTool, PredefinedSQLQueryTool
+from tools import intent_router
 from tools.calculation_tools import (
     AccuracyCalculatorTool,
     PnLCalculatorTool,
@@ -57,6 +65,13 @@ ALL_QUERIES.update({f"forex_{k}": v for k, v in FOREX_QUERIES.items()})
 ALL_QUERIES.update({f"risk_{k}": v for k, v in RISK_QUERIES.items()})
 ALL_QUERIES.update({f"valuation_{k}": v for k, v in VALUATION_QUERIES.items()})
 
+# Descriptions under the same prefixed names, for the fast-path router
+ALL_DESCRIPTIONS = {
+    name: QUERY_DESCRIPTIONS[name.split("_", 1)[1]]
+    for name in ALL_QUERIES if name.split("_", 1)[1] in QUERY_DESCRIPTIONS
+}
+_router = intent_router.IntentRouter(ALL_DESCRIPTIONS)
+
 
 def create_chat_agent() -> Agent:
     """
@@ -143,8 +158,30 @@ def create_chat_agent() -> Agent:
     return agent
 
 
-def ask_question(agent: Agent, question: str) -> str:
-    """Send a question to the chat agent by creating a mini-crew."""
+def answer_directly(question: str) -> str | None:
+    """Templated answer from the one predefined query the question clearly
+    asks for (tools/intent_router.py), or None to let the LLM handle it."""
+    route = _router.route(question)
+    if route is None:
+        return None
+    try:
+        return intent_router.answer(route, ALL_QUERIES[route.query_name],
+                                    ALL_DESCRIPTIONS[route.query_name])
+    except Exception:
+        return None  # SQL trouble: the agent can still try, and explain
+
+
+def ask_question(agent: Agent, question: str, fast_path: bool = CHAT_FAST_PATH) -> str:
+    """Send a question to the chat agent by creating a mini-crew.
+
+    With `fast_path`, a question that maps to a single predefined query is
+    answered from it directly, without the Crew or any LLM call.
+    """
+    if fast_path:
+        answer = answer_directly(question)
+        if answer is not None:
+            return answer
+
     today = datetime.now().strftime("%B %d, %Y")
     task = Task(
         description=(
@@ -168,7 +205,7 @@ def ask_question(agent: Agent, question: str) -> str:
     return result.raw if hasattr(result, "raw") else str(result)
 
 
-def interactive_chat():
+def interactive_chat(fast_path: bool = CHAT_FAST_PATH):
     """Run an interactive chat session."""
     print()
     print("=" * 60, flush=True)
@@ -205,17 +242,19 @@ def interactive_chat():
 
         print("\n[Thinking...]\n", flush=True)
         try:
-            answer = ask_question(agent, question)
+            answer = ask_question(agent, question, fast_path)
             print(f"Assistant: {answer}\n")
         except Exception as e:
             print(f"Error: {e}\n")
 
 
-def single_query(question: str):
+def single_query(question: str, fast_path: bool = CHAT_FAST_PATH):
     """Answer a single question and exit."""
     print(f"Question: {question}\n")
-    agent = create_chat_agent()
-    answer = ask_question(agent, question)
+    # No agent (or LLM) needed when the fast path answers
+    answer = answer_directly(question) if fast_path else None
+    if answer is None:
+        answer = ask_question(create_chat_agent(), question, fast_path=False)
     print(f"Answer:\n{answer}")
 
 
@@ -228,13 +267,19 @@ def main():
         type=str,
         help="Ask a single question (non-interactive mode)",
     )
+    parser.add_argument(
+        "--no-fast-path",
+        action="store_true",
+        help="Send every question to the LLM, even ones a predefined query answers",
+    )
 
     args = parser.parse_args()
+    fast_path = CHAT_FAST_PATH and not args.no_fast_path
 
     if args.query:
-        single_query(args.query)
+        single_query(args.query, fast_path)
     else:
-        interactive_chat()
+        interactive_chat(fast_path)
 
 
 if __name__ == "__main__":
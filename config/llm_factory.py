@@ -22,11 +22,56 @@ settings for SQL/SMTP config only and must not pay to import CrewAI.
 
 from __future__ import annotations
 
+import contextvars
+import threading
+
 from config.settings import (
     LLM_MODEL,
     model_rejects_temperature,
     resolve_max_tokens,
 )
+from tools.tracing import span
+
+
+# (model, max_tokens, temperature, stream) -> LLM, when sharing is enabled
+_shared_llms: dict | None = None
+_shared_lock = threading.Lock()
+_stream = False
+_llm_class = None
+# The llm.call span of the call in progress on this thread (token usage goes there)
+_llm_span: contextvars.ContextVar = contextvars.ContextVar("llm_span", default=None)
+
+
+def share_llm_instances(enabled: bool = True) -> None:
+    """Reuse one LLM object (and its HTTP client) per distinct configuration.
+
+    Off by default. A process hosting several agents (a2a_servers/a2a_host.py)
+    turns it on so every agent with the same settings talks to Claude through
+    one client instead of each building its own.
+    """
+    global _shared_llms
+    with _shared_lock:
+        _shared_llms = {} if enabled else None
+
+
+def stream_llm_responses(enabled: bool = True) -> None:
+    """Ask Claude for streamed responses on LLMs built from now on.
+
+    Off by default (batch runs gain nothing from it). The A2A ASGI server
+    turns it on so CrewAI publishes each chunk as it arrives, which its
+    /a2a/stream endpoint forwards to the client.
+    """
+    global _stream
+    _stream = enabled
+
+
+def use_llm_class(cls=None) -> None:
+    """Build LLMs from `cls` (same constructor kwargs as crewai.LLM) instead
+    of crewai.LLM; None restores the default. For load tests and offline runs
+    (benchmark_load.py's scripted model) — spans and token accounting still apply.
+    """
+    global _llm_class
+    _llm_class = cls
 
 
 def build_llm(max_tokens: int, temperature: float | None = None, model: str | None = None):
@@ -42,7 +87,10 @@ def build_llm(max_tokens: int, temperature: float | None = None, model: str | No
     Returns:
         crewai.LLM configured for the resolved model.
     """
-    from crewai import LLM  # imported lazily — keeps SQL/SMTP-only scripts light
+    if _llm_class is not None:
+        LLM = _llm_class
+    else:
+        from crewai import LLM  # imported lazily — keeps SQL/SMTP-only scripts light
 
     resolved = model or LLM_MODEL
     kwargs = {
@@ -51,8 +99,65 @@ def build_llm(max_tokens: int, temperature: float | None = None, model: str | No
     }
     if temperature is not None and not model_rejects_temperature(resolved):
         kwargs["temperature"] = temperature
-
-    return LLM(**kwargs)
+    if _stream:
+        kwargs["stream"] = True
+
+    if _shared_llms is not None:
+        key = (kwargs["model"], kwargs["max_tokens"], kwargs.get("temperature"), _stream)
+        with _shared_lock:
+            if key not in _shared_llms:
+                with span("build_llm", category="crewai", model=resolved):
+                    _shared_llms[key] = _trace_calls(LLM(**kwargs), resolved)
+            return _shared_llms[key]
+
+    with span("build_llm", category="crewai", model=resolved):
+        llm = LLM(**kwargs)
+    return _trace_calls(llm, resolved)
+
+
+def _trace_calls(llm, model: str):
+    """Wrap llm.call in a span so the run timeline shows Claude latency
+    separately from CrewAI's own work, with the call's prompt/completion
+    tokens as span attributes (when the provider reports usage through
+    `_track_token_usage_internal`). Left unwrapped if the provider class
+    doesn't allow instance attributes."""
+    call = getattr(llm, "call", None)
+    if call is None:
+        return llm
+    track_usage = getattr(llm, "_track_token_usage_internal", None)
+
+    def traced_call(*args, **kwargs):
+        with span("llm.call", category="llm", model=model) as llm_span:
+            token = _llm_span.set(llm_span)
+            try:
+                return call(*args, **kwargs)
+            finally:
+                _llm_span.reset(token)
+
+    def traced_usage(usage_data, *args, **kwargs):
+        result = track_usage(usage_data, *args, **kwargs)
+        llm_span = _llm_span.get()
+        attrs = getattr(llm_span, "attrs", None)
+        if attrs is not None and isinstance(usage_data, dict):
+            prompt, completion = usage_tokens(usage_data)
+            llm_span.set(prompt_tokens=attrs.get("prompt_tokens", 0) + prompt,
+                         completion_tokens=attrs.get("completion_tokens", 0) + completion)
+        return result
+
+    try:
+        object.__setattr__(llm, "call", traced_call)
+        if track_usage is not None:
+            object.__setattr__(llm, "_track_token_usage_internal", traced_usage)
+    except (AttributeError, TypeError, ValueError):
+        pass
+    return llm
+
+
+def usage_tokens(usage_data: dict) -> tuple[int, int]:
+    """(prompt, completion) tokens from a provider usage dict."""
+    prompt = (usage_data.get("prompt_tokens") or usage_data.get("input_tokens") or 0)
+    completion = (usage_data.get("completion_tokens") or usage_data.get("output_tokens") or 0)
+    return int(prompt), int(completion)
 
 
 def describe_active_model(model: str | None = None) -> str:
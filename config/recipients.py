@@ -0,0 +1,168 @@
+"""Process-wide recipient directory backed by the `email_recipients` table.
+
+Why this exists: a single briefing run used to resolve recipients three times
+(preflight's check_email_config, the send itself, and the run record after the
+send), and each call opened its own SQL Server connection. The directory loads
+the whole table — every briefing_type at once — in one query, keeps it for
+RECIPIENT_CACHE_TTL_SEC, and every caller reads from that snapshot. A load
+that fails is retried after RECIPIENT_CACHE_ERROR_TTL_SEC instead, so a
+SQL Server blip doesn't pin the env fallback for the whole TTL.
+
+The standalone reports resolve through the same directory. Each has its own
+briefing_type and an env-var list as fallback:
+
+    briefing_type      env fallback (placed in TO)
+    bucket_report      BUCKET_REPORT_EMAIL_TO       (ml/forex bucket + tomorrow)
+    screening_nasdaq   SCREENING_REPORT_EMAIL_TO_NASDAQ
+    screening_nse      SCREENING_REPORT_EMAIL_TO_NSE
+
+Active rows in the table for a briefing_type take precedence; the env var only
+applies when the table has none (or can't be reached). That is the same rule
+daily_briefing has always used with EMAIL_TO.
+
+Call `invalidate()` after editing the table in-process (sql/ scripts, tests)
+to force the next lookup to reload.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+
+from config.settings import EMAIL_TO, RECIPIENT_CACHE_ERROR_TTL_SEC, RECIPIENT_CACHE_TTL_SEC
+
+RECIPIENT_TYPES = ("TO", "CC", "BCC")
+
+
+def _split_env(value: str) -> list[str]:
+    return [addr.strip() for addr in value.split(",") if addr.strip()]
+
+
+def _empty() -> dict[str, list[str]]:
+    return {t: [] for t in RECIPIENT_TYPES}
+
+
+class RecipientDirectory:
+    """Cached {briefing_type: {'TO'|'CC'|'BCC': [addresses]}} snapshot."""
+
+    def __init__(self, ttl_sec: float = RECIPIENT_CACHE_TTL_SEC,
+                 error_ttl_sec: float = RECIPIENT_CACHE_ERROR_TTL_SEC):
+        self.ttl_sec = ttl_sec
+        self.error_ttl_sec = error_ttl_sec
+        self._table: dict[str, dict[str, list[str]]] | None = None
+        self._loaded_at = 0.0
+        self._load_error: str | None = None
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def _load(self) -> dict[str, dict[str, list[str]]]:
+        # Lazy: the shared pool (warmed by preflight) lives in tools/, which
+        # itself imports config.settings.
+        from tools.db_pool import get_pool
+
+        table: dict[str, dict[str, list[str]]] = {}
+        with get_pool().connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT briefing_type, email_address, recipient_type FROM email_recipients "
+                "WHERE is_active = 1 "
+                "ORDER BY briefing_type, recipient_type, id"
+            )
+            for row in cursor.fetchall():
+                btype = (row.briefing_type or "daily_briefing").strip()
+                rtype = (row.recipient_type or "BCC").strip().upper()
+                if rtype not in RECIPIENT_TYPES:
+                    rtype = "BCC"
+                table.setdefault(btype, _empty())[rtype].append(row.email_address.strip())
+            cursor.close()
+        return table
+
+    def _snapshot(self) -> dict[str, dict[str, list[str]]]:
+        with self._lock:
+            ttl = self.error_ttl_sec if self._load_error else self.ttl_sec
+            if self._table is None or time.monotonic() - self._loaded_at > ttl:
+                try:
+                    self._table = self._load()
+                    self._load_error = None
+                except Exception as e:
+                    # Table missing / SQL unreachable: cache the miss briefly,
+                    # so a run doesn't retry a dead connection on every lookup.
+                    self._table = {}
+                    self._load_error = str(e)
+                self._loaded_at = time.monotonic()
+                self.loads += 1
+            return self._table
+
+    def invalidate(self) -> None:
+        """Drop the cached snapshot; the next lookup reloads the table."""
+        with self._lock:
+            self._table = None
+
+    def by_type(self, briefing_type: str = "daily_briefing", env_var: str | None = None,
+                default: str = "", fallback_type: str = "TO") -> dict[str, list[str]]:
+        """Recipients for a briefing_type grouped by TO/CC/BCC.
+
+        Falls back to the comma-separated `env_var` (or `default` when unset),
+        all placed under `fallback_type`, when the table has no active rows.
+        """
+        rows = self._snapshot().get(briefing_type)
+        if rows and any(rows.values()):
+            return {t: list(v) for t, v in rows.items()}
+        result = _empty()
+        fallback = os.getenv(env_var, default) if env_var else default
+        result[fallback_type] = _split_env(fallback)
+        return result
+
+    def flat(self, briefing_type: str = "daily_briefing", **kwargs) -> list[str]:
+        """All recipients for a briefing_type as one list (TO, then CC, then BCC)."""
+        by_type = self.by_type(briefing_type, **kwargs)
+        return by_type["TO"] + by_type["CC"] + by_type["BCC"]
+
+    def stats(self) -> dict:
+        table = self._table or {}
+        return {
+            "loads": self.loads,
+            "age_sec": round(time.monotonic() - self._loaded_at, 1) if self._table is not None else None,
+            "briefing_types": sorted(table),
+            "load_error": self._load_error,
+        }
+
+
+_directory: RecipientDirectory | None = None
+_directory_lock = threading.Lock()
+
+
+def get_directory() -> RecipientDirectory:
+    """Process-wide directory shared by the crew, tools and report scripts."""
+    global _directory
+    with _directory_lock:
+        if _directory is None:
+            _directory = RecipientDirectory()
+        return _directory
+
+
+def invalidate() -> None:
+    get_directory().invalidate()
+
+
+def daily_briefing_recipients_by_type(briefing_type: str = "daily_briefing") -> dict[str, list[str]]:
+    """Briefing recipients with the historical EMAIL_TO-as-BCC fallback."""
+    return get_directory().by_type(briefing_type, default=EMAIL_TO, fallback_type="BCC")
+
+
+def report_recipients(briefing_type: str, env_var: str, default: str = "") -> dict[str, list[str]]:
+    """TO/CC/BCC for a standalone report (table rows, else the env var as TO)."""
+    return get_directory().by_type(briefing_type, env_var=env_var, default=default)
+
+
+def address_message(msg, by_type: dict[str, list[str]]) -> list[str]:
+    """Set To/Cc headers on `msg` and return the full envelope list.
+
+    BCC addresses only go in the envelope — never in a header.
+    """
+    if by_type["TO"]:
+        msg["To"] = ", ".join(by_type["TO"])
+    if by_type["CC"]:
+        msg["Cc"] = ", ".join(by_type["CC"])
+    return by_type["TO"] + by_type["CC"] + by_type["BCC"]
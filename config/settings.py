@@ -87,6 +87,14 @@ SQL_USERNAME = os.getenv("SQL_USERNAME", "")
 SQL_PASSWORD = os.getenv("SQL_PASSWORD", "")
 SQL_TRUSTED_CONNECTION = os.getenv("SQL_TRUSTED_CONNECTION", "yes")
 
+# Max pyodbc connections held by tools/db_pool.py (one per concurrent worker).
+SQL_POOL_SIZE = int(os.getenv("SQL_POOL_SIZE", "4"))
+# Login timeout (seconds) for pooled connections (tools/db_pool.get_pool)
+SQL_CONNECT_TIMEOUT = int(os.getenv("SQL_CONNECT_TIMEOUT", "10"))
+# Latest-date watermark map for every table the predefined queries read
+# (tools/watermarks.py) — resolved once per run, reused for this long.
+WATERMARK_CACHE_TTL_SEC = float(os.getenv("WATERMARK_CACHE_TTL_SEC", "900"))
+
 
 def get_sql_connection_string() -> str:
     """Build the pyodbc connection string based on environment config."""
@@ -119,12 +127,37 @@ SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
 EMAIL_FROM_NAME = os.getenv("EMAIL_FROM_NAME", "")
 EMAIL_FROM = os.getenv("EMAIL_FROM", "")
 EMAIL_TO = os.getenv("EMAIL_TO", "")
+# STARTTLS after EHLO (Office 365 requires it; disable only for a local relay/stub)
+SMTP_USE_TLS = os.getenv("SMTP_USE_TLS", "true").lower() == "true"
+
+# Outbox spool (see tools/outbox.py). Send paths write here and return; a
+# background sender delivers over one SMTP session with retry + backoff.
+OUTBOX_DIR = os.getenv(
+    "OUTBOX_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "outbox"),
+)
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "6"))
+OUTBOX_BACKOFF_BASE_SEC = float(os.getenv("OUTBOX_BACKOFF_BASE_SEC", "30"))
+OUTBOX_BACKOFF_MAX_SEC = float(os.getenv("OUTBOX_BACKOFF_MAX_SEC", "1800"))
+# How long a process keeps retrying backed-off messages before exiting;
+# anything still pending is delivered by the next run or `-m tools.outbox`.
+OUTBOX_LINGER_SEC = float(os.getenv("OUTBOX_LINGER_SEC", "300"))
+
+# Recipient directory cache (config/recipients.py): the email_recipients table
+# is loaded once for all briefing types and reused for this many seconds.
+RECIPIENT_CACHE_TTL_SEC = float(os.getenv("RECIPIENT_CACHE_TTL_SEC", "3600"))
+# A failed load (SQL unreachable) falls back to the env lists and is retried
+# after this many seconds instead of the full TTL.
+RECIPIENT_CACHE_ERROR_TTL_SEC = float(os.getenv("RECIPIENT_CACHE_ERROR_TTL_SEC", "60"))
+
 
 def get_email_recipients_by_type(briefing_type: str = "daily_briefing") -> dict[str, list[str]]:
-    """Fetch active email recipients from the database, grouped by recipient_type.
+    """Active email recipients for a briefing type, grouped by recipient_type.
 
-    Falls back to EMAIL_TO from .env (as BCC) if the database table doesn't
-    exist or the query fails.
+    Served from the shared recipient directory (config/recipients.py), which
+    loads the whole email_recipients table once per RECIPIENT_CACHE_TTL_SEC.
+    Falls back to EMAIL_TO from .env (as BCC) if the table has no active rows
+    for this type or the query fails.
 
     Args:
         briefing_type: Filter recipients by briefing type (default: 'daily_briefing').
@@ -132,32 +165,9 @@ def get_email_recipients_by_type(briefing_type: str = "daily_briefing") -> dict[
     Returns:
         Dict with keys 'TO', 'CC', 'BCC' mapping to lists of email addresses.
     """
-    result: dict[str, list[str]] = {"TO": [], "CC": [], "BCC": []}
-    try:
-        import pyodbc
-        conn = pyodbc.connect(get_sql_connection_string())
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT email_address, recipient_type FROM email_recipients "
-            "WHERE is_active = 1 AND briefing_type = ? "
-            "ORDER BY recipient_type, id",
-            briefing_type,
-        )
-        for row in cursor.fetchall():
-            rtype = (row.recipient_type or "BCC").strip().upper()
-            if rtype not in result:
-                rtype = "BCC"
-            result[rtype].append(row.email_address.strip())
-        conn.close()
-        if any(result.values()):
-            return result
-    except Exception:
-        pass  # Fall through to .env fallback
-
-    # Fallback to .env EMAIL_TO (default to BCC)
-    if EMAIL_TO:
-        result["BCC"] = [addr.strip() for addr in EMAIL_TO.split(",") if addr.strip()]
-    return result
+    from config.recipients import daily_briefing_recipients_by_type
+
+    return daily_briefing_recipients_by_type(briefing_type)
 
 
 def get_email_recipients(briefing_type: str = "daily_briefing") -> list[str]:
@@ -172,3 +182,128 @@ def get_email_recipients(briefing_type: str = "daily_briefing") -> list[str]:
 AGENT_MAX_ITER = int(os.getenv("AGENT_MAX_ITER", "5"))
 AGENT_VERBOSE = os.getenv("AGENT_VERBOSE", "true").lower() == "true"
 AGENT_MAX_RPM = int(os.getenv("AGENT_MAX_RPM", "4"))
+
+# =============================================================================
+# Chat Assistant
+# =============================================================================
+# Questions that clearly map to one predefined query are answered straight
+# from it by a keyword router (tools/intent_router.py) — no Crew, no tokens.
+# Below CHAT_FAST_PATH_MIN_CONFIDENCE (0-1: the share of the question only the
+# best query explains; the question must also be fully covered by one query)
+# the question goes to the LLM as before. test_intent_router.py pins the routing.
+CHAT_FAST_PATH = os.getenv("CHAT_FAST_PATH", "true").lower() == "true"
+CHAT_FAST_PATH_MIN_CONFIDENCE = float(os.getenv("CHAT_FAST_PATH_MIN_CONFIDENCE", "0.3"))
+CHAT_FAST_PATH_MAX_ROWS = int(os.getenv("CHAT_FAST_PATH_MAX_ROWS", "25"))
+
+# =============================================================================
+# Template Rendering
+# =============================================================================
+# On-disk Jinja2 bytecode cache shared by the briefing and every report script
+# (see tools/template_service.py). Safe to delete — it is rebuilt on next render.
+TEMPLATE_CACHE_DIR = os.getenv(
+    "TEMPLATE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "jinja"),
+)
+
+# =============================================================================
+# Run History
+# =============================================================================
+# Runs older than this are pruned from logs/run_history.db (tools/run_store.py)
+RUN_HISTORY_RETENTION_DAYS = int(os.getenv("RUN_HISTORY_RETENTION_DAYS", "365"))
+
+# =============================================================================
+# Tracing
+# =============================================================================
+# Span timeline per pipeline run in logs/traces/<run>.jsonl + .html
+# (tools/tracing.py). No collector or network access involved.
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+
+# =============================================================================
+# Performance Regression Detection
+# =============================================================================
+# A run's total / stage / agent time is flagged when it exceeds the median of
+# the previous PERF_BASELINE_RUNS comparable runs by more than PERF_MAD_K scaled
+# MADs *and* by at least PERF_MIN_DELTA_SEC (tools/perf_regression.py).
+PERF_BASELINE_RUNS = int(os.getenv("PERF_BASELINE_RUNS", "20"))
+PERF_MAD_K = float(os.getenv("PERF_MAD_K", "3.0"))
+PERF_MIN_BASELINE = int(os.getenv("PERF_MIN_BASELINE", "5"))
+PERF_MIN_DELTA_SEC = float(os.getenv("PERF_MIN_DELTA_SEC", "10"))
+
+# =============================================================================
+# Pipeline Logging
+# =============================================================================
+# logs/briefing_YYYYMMDD.log is written by a background QueueListener
+# (tools/run_tracker.setup_logging). It rotates at LOG_MAX_BYTES, keeping
+# LOG_BACKUP_COUNT gzipped backups; previous days' logs are gzipped.
+# LOG_FORMAT=json writes briefing_YYYYMMDD.jsonl (one JSON object per line).
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").strip().lower()
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(20 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+
+# =============================================================================
+# A2A Agent Servers (ASGI)
+# =============================================================================
+# Concurrent agent runs per server, per-request timeout, and how long a
+# shutdown waits for in-flight requests (a2a_servers/a2a_asgi_server.py).
+A2A_CONCURRENCY = int(os.getenv("A2A_CONCURRENCY", "4"))
+A2A_REQUEST_TIMEOUT_SEC = float(os.getenv("A2A_REQUEST_TIMEOUT_SEC", "180"))
+A2A_SHUTDOWN_GRACE_SEC = int(os.getenv("A2A_SHUTDOWN_GRACE_SEC", "30"))
+
+# Agent instance pool (a2a_servers/agent_pool.py): A2A_CONCURRENCY agents per
+# server, requests allowed to queue for one before 429 + Retry-After, and how
+# many instances to build in the background at startup.
+A2A_POOL_MAX_WAITING = int(os.getenv("A2A_POOL_MAX_WAITING", "16"))
+A2A_POOL_PREWARM = int(os.getenv("A2A_POOL_PREWARM", "1"))
+
+# Streaming endpoint (/a2a/stream): ask Claude for streamed output so tokens
+# reach the client as they arrive; comment-line keep-alive interval.
+A2A_STREAM_TOKENS = os.getenv("A2A_STREAM_TOKENS", "true").lower() == "true"
+A2A_STREAM_KEEPALIVE_SEC = float(os.getenv("A2A_STREAM_KEEPALIVE_SEC", "15"))
+
+# Async tasks (/tasks, a2a_servers/a2a_tasks.py): background workers per
+# agent, per-task timeout (waiting for a free agent included), bound on
+# outstanding (submitted + working) tasks, and how long finished tasks are
+# kept in logs/a2a_tasks.db.
+A2A_TASK_WORKERS = int(os.getenv("A2A_TASK_WORKERS", "2"))
+A2A_TASK_TIMEOUT_SEC = float(os.getenv("A2A_TASK_TIMEOUT_SEC", "900"))
+A2A_TASK_QUEUE_MAX = int(os.getenv("A2A_TASK_QUEUE_MAX", "100"))
+A2A_TASK_RETENTION_DAYS = int(os.getenv("A2A_TASK_RETENTION_DAYS", "7"))
+
+# Multi-agent host (a2a_servers/a2a_host.py): one process, every agent under
+# /agents/<name>; the legacy per-agent ports 5001-5006 keep working.
+A2A_HOST_PORT = int(os.getenv("A2A_HOST_PORT", "5000"))
+A2A_HOST_PUBLIC_URL = os.getenv("A2A_HOST_PUBLIC_URL", f"http://localhost:{A2A_HOST_PORT}")
+
+# Supervisor (a2a_servers/launch_all_agents.py): how long an agent may take to
+# pass /health after spawn, the /health interval once up, consecutive failed
+# checks before a restart, and the cap on the exponential restart backoff.
+A2A_SUPERVISOR_READY_TIMEOUT_SEC = float(os.getenv("A2A_SUPERVISOR_READY_TIMEOUT_SEC", "120"))
+A2A_SUPERVISOR_HEALTH_INTERVAL_SEC = float(os.getenv("A2A_SUPERVISOR_HEALTH_INTERVAL_SEC", "5"))
+A2A_SUPERVISOR_HEALTH_FAILURES = int(os.getenv("A2A_SUPERVISOR_HEALTH_FAILURES", "3"))
+A2A_SUPERVISOR_BACKOFF_MAX_SEC = float(os.getenv("A2A_SUPERVISOR_BACKOFF_MAX_SEC", "60"))
+
+# A2A client library (a2a_servers/a2a_client.py): overall deadline per call
+# (above A2A_REQUEST_TIMEOUT_SEC so the server's 504 arrives first), attempts
+# on transient errors, seconds before a slow message is hedged (0 = never),
+# and how long discovered agent cards are reused.
+A2A_CLIENT_TIMEOUT_SEC = float(os.getenv("A2A_CLIENT_TIMEOUT_SEC", "240"))
+A2A_CLIENT_MAX_ATTEMPTS = int(os.getenv("A2A_CLIENT_MAX_ATTEMPTS", "3"))
+A2A_CLIENT_HEDGE_AFTER_SEC = float(os.getenv("A2A_CLIENT_HEDGE_AFTER_SEC", "0"))
+A2A_CLIENT_CARD_TTL_SEC = float(os.getenv("A2A_CLIENT_CARD_TTL_SEC", "300"))
+
+# =============================================================================
+# Query Result Cache
+# =============================================================================
+# SQL results keyed by data watermark (tools/result_cache.py), shared by every
+# agent in a process. TTL is an upper bound on staleness.
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "256"))
+RESULT_CACHE_TTL_SEC = float(os.getenv("RESULT_CACHE_TTL_SEC", "3600"))
+
+# =============================================================================
+# A2A Response Cache
+# =============================================================================
+# Agent replies cached per (agent, normalized question, data watermark) —
+# recomputed only when new data lands (a2a_servers/response_cache.py).
+A2A_RESPONSE_CACHE_ENABLED = os.getenv("A2A_RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+A2A_RESPONSE_CACHE_TTL_SEC = float(os.getenv("A2A_RESPONSE_CACHE_TTL_SEC", "86400"))
+A2A_RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("A2A_RESPONSE_CACHE_MAX_ENTRIES", "512"))
@@ -1278,4 +1278,64 @@ VALUATION_QUERIES = {
     #     HAVING COUNT(*) >= 3
     #     ORDER BY market, avg_margin_of_safety DESC
     # """,
-}
\ No newline at end of file
+}
+
+# =============================================================================
+# Query descriptions (chat fast path)
+# =============================================================================
+# What each predefined query answers, in the words users ask with. The chat
+# assistant's intent router (tools/intent_router.py) matches questions against
+# these; a question that clearly maps to one query is answered from it directly.
+
+QUERY_DESCRIPTIONS = {
+    # Market Intelligence
+    "nasdaq_top_movers": "NASDAQ 100 top movers: biggest gainers and losers by daily price change",
+    "nse_top_movers": "NSE 500 top movers: biggest gainers and losers by daily price change",
+    "nasdaq_market_summary": "NASDAQ 100 market summary and breadth: stocks up, down, unchanged, "
+                             "advancers decliners, average change, volume",
+    "nse_market_summary": "NSE 500 market summary and breadth: stocks up, down, unchanged, "
+                          "advancers decliners, average change, volume",
+    # ML Analyst
+    "model_accuracy_last_7_days": "ML model accuracy over the last 7 days: LR, gradient boosting, "
+                                  "random forest direction accuracy and error",
+    "model_accuracy_last_30_days": "ML model accuracy over the last 30 days: LR, gradient boosting, "
+                                   "random forest direction accuracy and error",
+    "model_accuracy_by_market": "ML model accuracy by market, NASDAQ vs NSE, per model",
+    "recent_predictions_summary": "Latest AI price predictions: predicted vs actual price and change",
+    "strategy1_nasdaq_ml_summary": "Strategy 1 NASDAQ ML classifier run summary: tickers scanned, buy and "
+                                   "sell signal counts, confidence, MACD and trend counts",
+    "strategy1_nse_ml_summary": "Strategy 1 NSE ML classifier run summary: buy and sell signal counts, "
+                                "confidence, trend, success rate",
+    "strategy1_forex_ml_summary": "Forex ML predictions summary: buy sell hold signal counts and "
+                                  "probabilities for currency pairs",
+    "strategy1_forex_ml_accuracy": "Forex ML prediction accuracy: 1 day direction accuracy by buy sell signal",
+    # Technical Signal
+    "active_signals_today": "Active technical signals today: MACD, RSI, Bollinger, stochastic, "
+                            "Fibonacci, pattern buy and sell signals",
+    "signal_outcomes_7d": "Technical signal outcomes after 7 days: signal hit rate and average change",
+    "signal_outcomes_14d": "Technical signal outcomes after 14 days: signal hit rate and average change",
+    "strongest_signals_recent": "Strongest technical signals recently: highest signal strength setups",
+    # Strategy & Trade
+    "top_tier1_opportunities": "Top TIER 1 trade opportunities across both markets: AI model "
+                               "and technical combo",
+    "top_tier2_opportunities": "Top TIER 2 trade opportunities across both markets: AI model "
+                               "and technical combo",
+    "tier_summary_today": "Trade tier summary today: signal counts per tier, bullish vs bearish, by market",
+    "open_trades": "Open trades in the trade log: entry, target and stop loss prices",
+    "nasdaq_tier1_today": "NASDAQ TIER 1 trade signals today",
+    "nse_tier1_today": "NSE TIER 1 trade signals today",
+    "strategy1_nasdaq_top_signals": "Strategy 1 NASDAQ top ML classifier signals: highest confidence "
+                                    "buy and sell signals with RSI",
+    "strategy1_nse_top_signals": "Strategy 1 NSE top ML classifier signals: highest confidence "
+                                 "buy and sell signals with RSI",
+    # Forex
+    "forex_comprehensive_analysis": "Forex currency exchange rates: USD/INR and other pairs, latest "
+                                    "rate, daily and weekly change, moving averages, ML signal",
+    # Risk
+    "portfolio_positions": "My portfolio: open positions and holdings with buy price and quantity",
+    "active_alerts": "Active trading alerts and their thresholds",
+    "high_risk_positions": "High risk warnings: stocks with low grade or misaligned ML and "
+                           "technical signals, RSI overbought oversold",
+    "conflicting_signals": "Conflicting signals: technical direction disagrees with ML prediction",
+    "family_assets_summary": "Family assets summary and net worth: asset types, active items and value",
+}
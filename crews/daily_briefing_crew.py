@@ -17,13 +17,11 @@ Stability features:
 import time
 import os
 import re
-import smtplib
 import traceback
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from crewai import Crew, Task, Process
 from datetime import date, datetime
-from jinja2 import Environment, FileSystemLoader
 
 from agents.market_intel_agent import create_market_intel_agent
 from agents.ml_analyst_agent import create_ml_analyst_agent
@@ -33,8 +31,8 @@ from agents.forex_agent import create_forex_agent
 from agents.risk_agent import create_risk_agent
 from agents.cross_strategy_agent import create_cross_strategy_agent
 
+from config.recipients import invalidate as invalidate_recipients
 from config.settings import (
-    SMTP_SERVER, SMTP_PORT, SMTP_USERNAME, SMTP_PASSWORD,
     EMAIL_FROM, EMAIL_FROM_NAME, EMAIL_TO,
     get_email_recipients, get_email_recipients_by_type,
 )
@@ -43,9 +41,14 @@ from tools.run_tracker import (
     setup_logging,
     _new_run_record,
     _new_agent_record,
+    flag_regressions,
     save_run_record,
 )
-from tools.preflight import run_preflight_checks, check_anthropic_live
+from tools.outbox import enqueue
+from tools.perf_regression import format_regression
+from tools.preflight import live_api_status, run_preflight_checks
+from tools.template_service import format_template_timings, render_template
+from tools.tracing import current_trace, span, trace_run
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -86,7 +89,8 @@ def _run_single_agent(agent, task_description: str, expected_output: str) -> str
         memory=False,
     )
 
-    result = mini_crew.kickoff()
+    with span("crew.kickoff", category="crewai", agent=getattr(agent, "role", "")):
+        result = mini_crew.kickoff()
     return result.raw if hasattr(result, "raw") else str(result)
 
 
@@ -133,7 +137,8 @@ def _run_agent_with_retry(
                     f"  [{agent_name}] Retry attempt {attempt}/{MAX_AGENT_RETRIES} "
                     f"(waiting {RETRY_PAUSE_SECONDS}s)..."
                 )
-                time.sleep(RETRY_PAUSE_SECONDS)
+                with span("retry_pause", category="sleep", seconds=RETRY_PAUSE_SECONDS):
+                    time.sleep(RETRY_PAUSE_SECONDS)
 
             agent = create_fn()
             output = _run_single_agent(agent, task_description, expected_output)
@@ -213,7 +218,10 @@ def _markdown_to_html(text: str) -> str:
 def _send_html_email(
     html_content: str, subject: str, recipients: list[str] | None = None
 ) -> str:
-    """Send a pre-rendered HTML email via SMTP to the daily-briefing recipients.
+    """Queue a pre-rendered HTML email for the daily-briefing recipients.
+
+    The message is spooled to the outbox and delivered by the background
+    sender (tools/outbox.py), so the pipeline doesn't wait on SMTP.
 
     Args:
         recipients: Override the configured distribution list. When given, every
@@ -243,33 +251,22 @@ def _send_html_email(
         html_part = MIMEText(html_content, "html")
         msg.attach(html_part)
 
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.ehlo()
-            server.starttls()
-            server.ehlo()
-            server.login(SMTP_USERNAME, SMTP_PASSWORD)
-            server.sendmail(EMAIL_FROM, all_recipients, msg.as_string())
-
-        return f"Email sent successfully to {len(all_recipients)} recipients with subject: {subject}"
+        msg_id = enqueue(msg, all_recipients)
+        return (
+            f"Email queued successfully for {len(all_recipients)} recipients "
+            f"(outbox {msg_id}) with subject: {subject}"
+        )
 
     except Exception as e:
-        return f"Error sending email: {str(e)}"
-
-
-def _load_template():
-    """Load the shared Jinja2 briefing template."""
-    template_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")
-    env = Environment(loader=FileSystemLoader(template_dir))
-    return env.get_template("briefing_email.html")
+        return f"Error queueing email: {str(e)}"
 
 
 def _compile_and_send_email(agent_results: dict, today: str) -> str:
     """Compile agent results into HTML email using Jinja2 and send via SMTP."""
 
-    template = _load_template()
-
-    # Render the template with agent results
-    html_content = template.render(
+    # Render the shared template with agent results (timed: load_ms/render_ms)
+    html_content = render_template(
+        "briefing_email.html",
         report_date=today,
         mode_notice="",
         market_overview=_markdown_to_html(agent_results.get("market_intel", "No data available.")),
@@ -280,6 +277,7 @@ def _compile_and_send_email(agent_results: dict, today: str) -> str:
         risk_warnings=_markdown_to_html(agent_results.get("risk", "No data available.")),
         cross_strategy=_markdown_to_html(agent_results.get("cross_strategy", "No data available.")),
     )
+    logger.info(f"Template: {format_template_timings('briefing_email.html')}")
 
     subject = f"Daily Trading Briefing - {today}"
     return _send_html_email(html_content, subject)
@@ -303,7 +301,8 @@ def _compile_and_send_data_only_email(
     """
     from tools.fallback_report import build_data_only_sections
 
-    sections = build_data_only_sections()
+    with span("fallback.sections", category="fallback"):
+        sections = build_data_only_sections()
 
     banner = (
         '<tr><td style="padding:14px 30px 0 30px;">'
@@ -319,8 +318,8 @@ def _compile_and_send_data_only_email(
         "</td></tr></table></td></tr>"
     )
 
-    template = _load_template()
-    html_content = template.render(
+    html_content = render_template(
+        "briefing_email.html",
         report_date=today,
         mode_notice=banner,
         market_overview=sections.get("market_overview", "No data available."),
@@ -331,6 +330,7 @@ def _compile_and_send_data_only_email(
         risk_warnings=sections.get("risk_warnings", "No data available."),
         cross_strategy=sections.get("cross_strategy", "No data available."),
     )
+    logger.info(f"Template: {format_template_timings('briefing_email.html')}")
 
     subject = f"Daily Trading Briefing (Raw Data) - {today}"
     if recipients:
@@ -349,6 +349,7 @@ def _compile_and_send_data_only_email(
     return _send_html_email(html_content, subject, recipients=recipients)
 
 
+@trace_run("daily_briefing")
 def run_daily_briefing_with_rate_limiting() -> str:
     """
     Run the full Daily Briefing with rate-limit-safe execution.
@@ -360,17 +361,29 @@ def run_daily_briefing_with_rate_limiting() -> str:
       - Graceful degradation (failed agents → fallback text in email)
       - Structured JSON run history with per-agent timing
       - Detailed log file per day
+      - Span timeline per run (logs/traces/<id>.html, see tools/tracing.py)
     """
 
     run_record = _new_run_record()
+    trace = current_trace()
+    if trace is not None:
+        run_record["trace_file"] = trace.html_path
     pipeline_start = datetime.now()
     today = date.today().strftime("%B %d, %Y")
     agent_results = {}
 
+    # One recipient lookup per run: preflight loads the directory, the send and
+    # the run record reuse that snapshot.
+    invalidate_recipients()
+
     # =========================================================================
     # Pre-Flight Checks
     # =========================================================================
-    can_proceed, preflight_results = run_preflight_checks(verbose=True)
+    with span("preflight", category="preflight"):
+        can_proceed, preflight_results = run_preflight_checks(verbose=True, live_api=True)
+    run_record["stage_durations"]["preflight"] = round(
+        (datetime.now() - pipeline_start).total_seconds(), 1
+    )
     run_record["preflight_passed"] = can_proceed
     run_record["preflight_warnings"] = [
         str(r) for r in preflight_results if not r.passed
@@ -392,14 +405,19 @@ def run_daily_briefing_with_rate_limiting() -> str:
     # If credits/access are unavailable, skip the LLM agents entirely and send
     # a raw-data (no-LLM) briefing so recipients still get the underlying data.
     # =========================================================================
-    api_available, api_reason = check_anthropic_live()
+    # (probed concurrently with the pre-flight checks above)
+    api_available, api_reason = live_api_status(preflight_results)
     run_record["api_available"] = api_available
     if not api_available:
         logger.warning(
             f"Anthropic API unavailable ({api_reason}). "
             "Falling back to RAW DATA email (no Claude analysis)."
         )
+        stage_start = datetime.now()
         result = _compile_and_send_data_only_email(today, api_reason)
+        run_record["stage_durations"]["compile_send"] = round(
+            (datetime.now() - stage_start).total_seconds(), 1
+        )
         run_record["mode"] = "data_only"
         run_record["email_sent"] = "successfully" in result.lower()
         if run_record["email_sent"]:
@@ -410,8 +428,11 @@ def run_daily_briefing_with_rate_limiting() -> str:
         run_record["total_duration_sec"] = round(
             (datetime.now() - pipeline_start).total_seconds(), 1
         )
+        flag_regressions(run_record)
         save_run_record(run_record)
         logger.info(f"Raw-data fallback email result: {result}")
+        for flag in run_record["perf_regressions"]:
+            logger.warning(f"SLOW: {format_regression(flag)}")
         return result
 
     logger.info("Anthropic API available — running full LLM agent pipeline.")
@@ -568,6 +589,7 @@ def run_daily_briefing_with_rate_limiting() -> str:
     ]
 
     # Run each agent with retry + timing + graceful degradation
+    stage_start = datetime.now()
     for idx, (key, number, label, create_fn, task_desc, expected) in enumerate(agent_pipeline):
         agent_rec = _new_agent_record(label)
         run_record["agent_details"][key] = agent_rec
@@ -576,13 +598,15 @@ def run_daily_briefing_with_rate_limiting() -> str:
         logger.info(f"AGENT {number}: {label} Agent")
         logger.info(f"{'=' * 60}")
 
-        agent_results[key] = _run_agent_with_retry(
-            agent_name=label,
-            create_fn=create_fn,
-            task_description=task_desc,
-            expected_output=expected,
-            agent_record=agent_rec,
-        )
+        with span(f"agent:{key}", category="agent", label=label) as agent_span:
+            agent_results[key] = _run_agent_with_retry(
+                agent_name=label,
+                create_fn=create_fn,
+                task_description=task_desc,
+                expected_output=expected,
+                agent_record=agent_rec,
+            )
+            agent_span.set(status=agent_rec["status"], retries=agent_rec["retries"])
 
         if agent_rec["status"] == "success":
             run_record["agents_succeeded"] += 1
@@ -592,14 +616,20 @@ def run_daily_briefing_with_rate_limiting() -> str:
         # Rate-limit pause (skip after last agent)
         if idx < len(agent_pipeline) - 1:
             logger.info(f"--- {label} complete. Pausing {PAUSE_SECONDS}s for rate limit ---")
-            time.sleep(PAUSE_SECONDS)
+            with span("rate_limit_pause", category="sleep", seconds=PAUSE_SECONDS):
+                time.sleep(PAUSE_SECONDS)
 
     # =========================================================================
     # Compile and Send Report (using Jinja2, no LLM needed)
     # =========================================================================
+    run_record["stage_durations"]["agents"] = round(
+        (datetime.now() - stage_start).total_seconds(), 1
+    )
+
     logger.info(f"\n{'=' * 60}")
     logger.info("COMPILING REPORT & SENDING EMAIL")
     logger.info(f"{'=' * 60}")
+    stage_start = datetime.now()
 
     # Safety net: if every agent failed (e.g. credits ran out mid-run), the LLM
     # email would be all "analysis unavailable" placeholders. Send the raw-data
@@ -618,6 +648,9 @@ def run_daily_briefing_with_rate_limiting() -> str:
     if run_record["email_sent"]:
         recipients = get_email_recipients("daily_briefing")
         run_record["email_recipients"] = recipients
+    run_record["stage_durations"]["compile_send"] = round(
+        (datetime.now() - stage_start).total_seconds(), 1
+    )
 
     # =========================================================================
     # Finalize Run Record
@@ -634,6 +667,7 @@ def run_daily_briefing_with_rate_limiting() -> str:
     else:
         run_record["status"] = "failed"
 
+    flag_regressions(run_record)
     save_run_record(run_record)
 
     # Print summary
@@ -652,6 +686,8 @@ def run_daily_briefing_with_rate_limiting() -> str:
     ]
     if failed_names:
         logger.warning(f"  Failed     : {', '.join(failed_names)}")
+    for flag in run_record["perf_regressions"]:
+        logger.warning(f"  SLOW       : {format_regression(flag)}")
 
     logger.info(f"{'=' * 60}")
 
@@ -25,31 +25,26 @@ Usage:
 import argparse
 import datetime
 import os
-import smtplib
 import sys
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
 import pyodbc
-from jinja2 import Environment, FileSystemLoader, select_autoescape
 
+from config.recipients import address_message, report_recipients
 from config.settings import (
     EMAIL_FROM,
     EMAIL_FROM_NAME,
-    SMTP_PASSWORD,
-    SMTP_PORT,
-    SMTP_SERVER,
-    SMTP_USERNAME,
     get_sql_connection_string,
 )
+from tools.outbox import enqueue
+from tools.template_service import format_template_timings, render_template
 
 # Recipients for the Tomorrow Predictions emails — shared with the NASDAQ/NSE reports via
 # the BUCKET_REPORT_EMAIL_TO env var (comma-separated); defaults to the platform owner only.
-REPORT_RECIPIENTS = [
-    addr.strip()
-    for addr in os.getenv("BUCKET_REPORT_EMAIL_TO", "sree.amiri@gmail.com").split(",")
-    if addr.strip()
-]
+# Rows in email_recipients with this briefing_type take precedence over the env var.
+REPORT_BRIEFING_TYPE = "bucket_report"
+REPORT_RECIPIENTS_DEFAULT = "sree.amiri@gmail.com"
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -194,13 +189,8 @@ def build_sections(cfg, pred_date, signals):
 
 
 def render_html(cfg, pred_date, sections):
-    templates_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
-    env = Environment(
-        loader=FileSystemLoader(templates_dir),
-        autoescape=select_autoescape(["html"]),
-    )
-    template = env.get_template("forex_tomorrow_report.html")
-    return template.render(
+    return render_template(
+        "forex_tomorrow_report.html",
         market_name=cfg["market_name"],
         pred_date_str=pred_date.strftime("%A, %B %d, %Y") if pred_date else "N/A",
         generated_at=datetime.datetime.now().strftime("%Y-%m-%d %H:%M"),
@@ -212,23 +202,21 @@ def render_html(cfg, pred_date, sections):
 # Email
 # ---------------------------------------------------------------------------
 def send_email(subject, html_body, from_name=None):
-    if not REPORT_RECIPIENTS:
+    recipients = report_recipients(
+        REPORT_BRIEFING_TYPE, "BUCKET_REPORT_EMAIL_TO", default=REPORT_RECIPIENTS_DEFAULT
+    )
+    if not any(recipients.values()):
         raise RuntimeError("No Tomorrow Predictions recipients configured (set BUCKET_REPORT_EMAIL_TO).")
 
     display_name = from_name or EMAIL_FROM_NAME
     msg = MIMEMultipart("alternative")
     msg["Subject"] = subject
     msg["From"] = f"{display_name} <{EMAIL_FROM}>" if display_name else EMAIL_FROM
-    msg["To"] = ", ".join(REPORT_RECIPIENTS)
+    all_recipients = address_message(msg, recipients)
     msg.attach(MIMEText(html_body, "html"))
 
-    with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-        server.ehlo()
-        server.starttls()
-        server.ehlo()
-        server.login(SMTP_USERNAME, SMTP_PASSWORD)
-        server.sendmail(EMAIL_FROM, REPORT_RECIPIENTS, msg.as_string())
-    return len(REPORT_RECIPIENTS)
+    enqueue(msg, all_recipients)
+    return len(all_recipients)
 
 
 # ---------------------------------------------------------------------------
@@ -248,6 +236,7 @@ def run(dry_run=False):
 
     sections = build_sections(cfg, pred_date, signals)
     html = render_html(cfg, pred_date, sections)
+    print(f"[forex] Template: {format_template_timings('forex_tomorrow_report.html')}")
 
     counts = {d: sum(1 for s in signals if s["direction"] == d) for d in DIRECTIONS}
     print(f"[forex] pred_date={pred_date} | "
@@ -265,7 +254,7 @@ def run(dry_run=False):
         return 0
 
     n = send_email(subject, html, from_name=cfg.get("from_name"))
-    print(f"[forex] Email sent to {n} recipients: {subject}")
+    print(f"[forex] Email queued for {n} recipients: {subject}")
     return 0
 
 
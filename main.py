@@ -99,7 +99,24 @@ def test_email():
             ),
         )
         print(f"\nResult: {result}")
-        return "successfully" in result.lower()
+        if "successfully" not in result.lower():
+            return False
+
+        # The tool only spools the message — wait for the background sender's
+        # first attempt so this still tests the SMTP settings end to end.
+        import re
+        from tools.outbox import wait_for
+
+        msg_id = re.search(r"outbox (\S+)\)", result).group(1)
+        record = wait_for(msg_id, timeout=90)
+        if record and record["status"] == "sent":
+            print(f"Delivered at {record['sent_at']}")
+            return True
+        error = (record or {}).get("last_error") or "no delivery attempt within 90s"
+        print(f"\nEmail test FAILED: {error}")
+        print("Check SMTP_USERNAME and SMTP_PASSWORD in your .env file. For Office 365, "
+              "you may need an App Password if MFA is enabled.")
+        return False
 
     except Exception as e:
         print(f"\nEmail test FAILED: {e}")
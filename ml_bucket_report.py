@@ -21,32 +21,27 @@ Usage:
 import argparse
 import datetime
 import os
-import smtplib
 import sys
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
 import pyodbc
-from jinja2 import Environment, FileSystemLoader, select_autoescape
 
+from config.recipients import address_message, report_recipients
 from config.settings import (
     EMAIL_FROM,
     EMAIL_FROM_NAME,
-    SMTP_PASSWORD,
-    SMTP_PORT,
-    SMTP_SERVER,
-    SMTP_USERNAME,
     get_sql_connection_string,
 )
+from tools.outbox import enqueue
+from tools.template_service import format_template_timings, render_template
 
 # Recipients for the Bucket Tracker emails — intentionally SEPARATE from the
 # shared daily_briefing distribution. Override via the BUCKET_REPORT_EMAIL_TO
 # env var (comma-separated); defaults to the platform owner only.
-REPORT_RECIPIENTS = [
-    addr.strip()
-    for addr in os.getenv("BUCKET_REPORT_EMAIL_TO", "sree.amiri@gmail.com").split(",")
-    if addr.strip()
-]
+# Rows in email_recipients with this briefing_type take precedence over the env var.
+REPORT_BRIEFING_TYPE = "bucket_report"
+REPORT_RECIPIENTS_DEFAULT = "sree.amiri@gmail.com"
 
 # ---------------------------------------------------------------------------
 # Per-market configuration
@@ -356,13 +351,8 @@ def build_sections(cfg, t0, pred_dates, signals, closes):
 
 
 def render_html(cfg, t0, pred_dates, sections):
-    templates_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
-    env = Environment(
-        loader=FileSystemLoader(templates_dir),
-        autoescape=select_autoescape(["html"]),
-    )
-    template = env.get_template("ml_bucket_report.html")
-    return template.render(
+    return render_template(
+        "ml_bucket_report.html",
         market_name=cfg["market_name"],
         report_date=t0.strftime("%A, %B %d, %Y") if t0 else "N/A",
         generated_at=datetime.datetime.now().strftime("%Y-%m-%d %H:%M"),
@@ -375,23 +365,21 @@ def render_html(cfg, t0, pred_dates, sections):
 # Email
 # ---------------------------------------------------------------------------
 def send_email(subject, html_body, from_name=None):
-    if not REPORT_RECIPIENTS:
+    recipients = report_recipients(
+        REPORT_BRIEFING_TYPE, "BUCKET_REPORT_EMAIL_TO", default=REPORT_RECIPIENTS_DEFAULT
+    )
+    if not any(recipients.values()):
         raise RuntimeError("No Bucket Tracker recipients configured (set BUCKET_REPORT_EMAIL_TO).")
 
     display_name = from_name or EMAIL_FROM_NAME
     msg = MIMEMultipart("alternative")
     msg["Subject"] = subject
     msg["From"] = f"{display_name} <{EMAIL_FROM}>" if display_name else EMAIL_FROM
-    msg["To"] = ", ".join(REPORT_RECIPIENTS)
+    all_recipients = address_message(msg, recipients)
     msg.attach(MIMEText(html_body, "html"))
 
-    with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-        server.ehlo()
-        server.starttls()
-        server.ehlo()
-        server.login(SMTP_USERNAME, SMTP_PASSWORD)
-        server.sendmail(EMAIL_FROM, REPORT_RECIPIENTS, msg.as_string())
-    return len(REPORT_RECIPIENTS)
+    enqueue(msg, all_recipients)
+    return len(all_recipients)
 
 
 # ---------------------------------------------------------------------------
@@ -413,6 +401,7 @@ def run(market, dry_run=False):
 
     sections = build_sections(cfg, t0, pred_dates, signals, closes)
     html = render_html(cfg, t0, pred_dates, sections)
+    print(f"[{market}] Template: {format_template_timings('ml_bucket_report.html')}")
 
     s1_count = sum(1 for s in signals if s["mode"] == "S1")
     s1s2_count = sum(1 for s in signals if s["mode"] == "S1S2")
@@ -430,7 +419,7 @@ def run(market, dry_run=False):
         return 0
 
     n = send_email(subject, html, from_name=cfg.get("from_name"))
-    print(f"[{market}] Email sent to {n} recipients: {subject}")
+    print(f"[{market}] Email queued for {n} recipients: {subject}")
     return 0
 
 
@@ -0,0 +1,99 @@
+"""
+Test the chat fast path router (tools/intent_router.py) against the real
+query descriptions (config/sql_queries.py QUERY_DESCRIPTIONS).
+
+Every question in ROUTED must be answered by its predefined query without
+the LLM; every question in TO_LLM must fall through to the agent. No SQL
+Server, CrewAI or API key needed.
+
+Usage:
+    py -3.12 test_intent_router.py
+"""
+
+import sys
+
+from config.settings import CHAT_FAST_PATH_MIN_CONFIDENCE
+from config.sql_queries import QUERY_DESCRIPTIONS
+from tools.intent_router import IntentRouter
+
+ROUTED = [
+    ("What is the current USD/INR rate?", "forex_comprehensive_analysis"),
+    ("what is USD/INR today", "forex_comprehensive_analysis"),
+    ("Show me forex rates", "forex_comprehensive_analysis"),
+    ("Show me TIER 1 trade opportunities", "top_tier1_opportunities"),
+    ("tier 2 opportunities", "top_tier2_opportunities"),
+    ("nse tier 1", "nse_tier1_today"),
+    ("What is my total family net worth?", "family_assets_summary"),
+    ("my family assets", "family_assets_summary"),
+    ("Any high-risk warnings today?", "high_risk_positions"),
+    ("Show my open trades", "open_trades"),
+    ("what are my portfolio holdings", "portfolio_positions"),
+    ("NASDAQ top movers", "nasdaq_top_movers"),
+    ("Which ML model is performing best this week?", "model_accuracy_last_7_days"),
+    ("model accuracy last 30 days", "model_accuracy_last_30_days"),
+    ("Show active alerts", "active_alerts"),
+    ("conflicting signals", "conflicting_signals"),
+    ("signal outcomes after 14 days", "signal_outcomes_14d"),
+    ("active technical signals today", "active_signals_today"),
+    ("forex ML accuracy", "strategy1_forex_ml_accuracy"),
+    ("latest AI predictions", "recent_predictions_summary"),
+    ("strongest signals", "strongest_signals_recent"),
+    ("tier summary", "tier_summary_today"),
+]
+
+TO_LLM = [
+    # forecasts and past dates: today's table doesn't answer them
+    "is usd/inr going up tomorrow",
+    "what was USD/INR on 1 January",
+    "forex outlook for next month",
+    # only partly explained by the best match
+    "how did the nasdaq do last month",
+    "Which NSE stocks are oversold?",
+    "show me open trades for apple",
+    "what was the close price of nvidia on monday",
+    # ambiguous between queries
+    "How did the NASDAQ market do today?",
+    "Which TIER 1 BULLISH signals were generated today?",
+    "What are the top TIER 1 signals and the best-performing ML model today?",
+    "Show me all stocks where AI and technicals are ALIGNED",
+    # reasoning, comparison, single tickers
+    "How did Gradient Boosting perform this week vs Random Forest?",
+    "Why is AAPL down today?",
+    "How is AAPL doing?",
+    "Should I buy RELIANCE.NS?",
+    "compare nasdaq and nse",
+    "USD/INR trend and what should I do",
+    "tell me a joke",
+]
+
+RESULTS = []
+
+
+def check(name, ok, detail=""):
+    ok = bool(ok)
+    RESULTS.append(ok)
+    print(f"  {'PASS' if ok else 'FAIL'}  {name}" + (f"  ({detail})" if detail else ""))
+
+
+def main():
+    router = IntentRouter(QUERY_DESCRIPTIONS)
+    print("=" * 60)
+    print(f"INTENT ROUTER TEST — min confidence {CHAT_FAST_PATH_MIN_CONFIDENCE}")
+    print("=" * 60)
+    for question, expected in ROUTED:
+        route = router.route(question)
+        got = route.query_name if route else None
+        check(f"{question!r} -> {expected}", got == expected,
+              f"got {got}" + (f", confidence {route.confidence}" if route else ""))
+    for question in TO_LLM:
+        route = router.route(question)
+        check(f"{question!r} -> LLM", route is None,
+              f"routed to {route.query_name}, confidence {route.confidence}, "
+              f"coverage {route.coverage}" if route else "")
+    print("=" * 60)
+    print(f"{sum(RESULTS)}/{len(RESULTS)} checks passed")
+    return 0 if all(RESULTS) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+"""
+Test the email outbox (tools/outbox.py) against a local SMTP stub.
+
+Runs an aiosmtpd server on localhost — no Office 365 account or SQL Server
+needed — and checks that the sender:
+  - delivers a batch of spooled messages over ONE SMTP session
+  - retries transient (4xx) failures with backoff, then delivers
+  - gives up immediately on a permanent (5xx) rejection
+  - leaves messages pending when the server is unreachable
+  - keeps BCC addresses in the envelope but out of the headers
+  - returns from enqueue() without waiting on a slow server
+  - sends each message once when two senders drain the same spool
+  - fails a corrupt message and carries on with the rest
+
+Usage:
+    pip install -r requirements-dev.txt
+    py -3.12 test_outbox_smtp.py
+"""
+
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from email import message_from_bytes
+from email.mime.text import MIMEText
+
+from aiosmtpd.controller import Controller
+
+import tools.outbox as outbox_mod
+from tools.outbox import FAILED, INFLIGHT, PENDING, SENT, Outbox, OutboxSender
+
+
+class StubHandler:
+    """Records delivered messages; can fail or stall the next N DATA commands."""
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+        self.fail_next = 0
+        self.fail_code = "451 4.3.0 Try again later"
+        self.delay = 0.0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.add(id(session))
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail_next:
+            self.fail_next -= 1
+            return self.fail_code
+        self.messages.append((list(envelope.rcpt_tos), envelope.content))
+        return "250 OK"
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _msg(subject, to="to@example.com"):
+    msg = MIMEText(f"<p>{subject}</p>", "html")
+    msg["Subject"] = subject
+    msg["From"] = "reports@example.com"
+    msg["To"] = to
+    return msg
+
+
+def _sender(box, port, **kw):
+    kw.setdefault("backoff_base", 0.2)
+    kw.setdefault("backoff_max", 1.0)
+    return OutboxSender(box, host="127.0.0.1", port=port, username="",
+                        password="", use_tls=False, **kw)
+
+
+def _spool(box, subject, recipients=("to@example.com",)):
+    return box.put(_msg(subject).as_bytes(), list(recipients), subject=subject,
+                   sender="reports@example.com")
+
+
+RESULTS = []
+
+
+def check(name, ok, detail=""):
+    ok = bool(ok)
+    RESULTS.append(ok)
+    print(f"  {'PASS' if ok else 'FAIL'}  {name}" + (f"  ({detail})" if detail else ""))
+
+
+def run_connection_reuse(handler, port):
+    box = Outbox(tempfile.mkdtemp())
+    for i in range(5):
+        _spool(box, f"batch {i}")
+    sender = _sender(box, port)
+    before = len(handler.sessions)
+    result = sender.drain()
+    check("5 messages delivered", result["sent"] == 5, str(result))
+    check("one SMTP session for the batch", sender.sessions_opened == 1
+          and len(handler.sessions) - before == 1,
+          f"sender={sender.sessions_opened}, server={len(handler.sessions) - before}")
+    check("records moved to sent/", box.status()["counts"][SENT] == 5)
+
+
+def run_transient_retry(handler, port):
+    box = Outbox(tempfile.mkdtemp())
+    msg_id = _spool(box, "retry me")
+    handler.fail_next = 2
+    handler.fail_code = "451 4.3.0 Try again later"
+    start = time.monotonic()
+    _sender(box, port).run_until_empty(linger=10, poll=0.05)
+    rec = box.record(msg_id)
+    check("delivered after two 451s", rec["status"] == SENT and rec["attempts"] == 3,
+          f"status={rec['status']}, attempts={rec['attempts']}")
+    check("backoff between attempts", time.monotonic() - start >= 0.2 + 0.4 - 0.05,
+          f"{time.monotonic() - start:.2f}s")
+
+
+def run_permanent_failure(handler, port):
+    box = Outbox(tempfile.mkdtemp())
+    msg_id = _spool(box, "rejected")
+    handler.fail_next = 1
+    handler.fail_code = "550 5.7.1 Rejected"
+    _sender(box, port).drain()
+    rec = box.record(msg_id)
+    check("5xx moves straight to failed/", rec["status"] == FAILED and rec["attempts"] == 1,
+          rec["last_error"])
+
+
+def run_server_down():
+    box = Outbox(tempfile.mkdtemp())
+    first = _spool(box, "nobody home 1")
+    second = _spool(box, "nobody home 2")
+    result = _sender(box, _free_port(), timeout=2).drain()
+    rec1, rec2 = box.record(first), box.record(second)
+    check("unreachable server keeps message pending", rec1["status"] == PENDING
+          and rec1["attempts"] == 1 and rec1["last_error"], rec1["last_error"])
+    check("drain stops after the failed connect", rec2["attempts"] == 0, str(result))
+
+
+def run_bcc_and_fast_enqueue(handler, port):
+    box = Outbox(tempfile.mkdtemp())
+    outbox_mod._outbox = box
+    msg = _msg("bcc check")
+    msg["Bcc"] = "hidden@example.com"
+    handler.delay = 1.0
+    start = time.monotonic()
+    msg_id = outbox_mod.enqueue(msg, ["to@example.com", "hidden@example.com"], kick=False)
+    enqueue_ms = (time.monotonic() - start) * 1000
+    check("enqueue returns without waiting on SMTP", enqueue_ms < 200, f"{enqueue_ms:.1f} ms")
+
+    _sender(box, port).drain()
+    handler.delay = 0.0
+    rcpts, content = handler.messages[-1]
+    check("BCC address in envelope", "hidden@example.com" in rcpts, str(rcpts))
+    check("Bcc header stripped", message_from_bytes(content)["Bcc"] is None)
+    check("delivery record sent", box.record(msg_id)["status"] == SENT)
+
+
+def run_two_senders(handler, port):
+    box = Outbox(tempfile.mkdtemp())
+    ids = [_spool(box, f"shared {i}") for i in range(20)]
+    handler.delay = 0.02
+    before = len(handler.messages)
+    errors = []
+
+    def drain():
+        try:
+            _sender(box, port).drain()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=drain) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    handler.delay = 0.0
+    subjects = [message_from_bytes(content)["Subject"] for _, content in handler.messages[before:]]
+    check("two senders: no exceptions", not errors, repr(errors))
+    check("two senders: every message sent exactly once",
+          sorted(subjects) == sorted(f"shared {i}" for i in range(20)), f"{len(subjects)} deliveries")
+    check("two senders: all records in sent/",
+          all(box.record(i)["status"] == SENT for i in ids), str(box.status()["counts"]))
+
+    claimed = _spool(box, "claimed once")
+    first, second = box.claim(claimed), box.claim(claimed)
+    check("a message can be claimed only once", first is not None and second is None)
+    os.utime(box._path(INFLIGHT, claimed, "json"), (0, 0))
+    check("a dead sender's claim returns to pending", box.recover_stale() == 1
+          and box.record(claimed)["status"] == PENDING)
+
+    orphan = _spool(box, "body lost")
+    os.remove(box._path(PENDING, orphan, "eml"))
+    _sender(box, port).drain()
+    check("a message without a body goes to failed/", box.record(orphan)["status"] == FAILED,
+          box.record(orphan)["last_error"])
+
+
+def run_corrupt_message(handler, port):
+    box = Outbox(tempfile.mkdtemp())
+    first = _spool(box, "before corrupt")
+    broken = _spool(box, "corrupt")
+    last = _spool(box, "after corrupt")
+    rec = box.record(broken)
+    del rec["recipients"]
+    box._write_json(box._path(PENDING, broken, "json"), rec)
+    try:
+        result = _sender(box, port).drain()
+    except Exception as e:
+        result = e
+    check("corrupt record doesn't stop the drain", isinstance(result, dict)
+          and result["sent"] == 2 and result["failed"] == 1, repr(result))
+    check("corrupt record goes to failed/", box.record(broken)["status"] == FAILED,
+          box.record(broken)["last_error"])
+    check("nothing left in inflight/", box.status()["counts"][INFLIGHT] == 0
+          and box.record(first)["status"] == box.record(last)["status"] == SENT,
+          str(box.status()["counts"]))
+
+
+def main():
+    port = _free_port()
+    handler = StubHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    print("=" * 60)
+    print(f"OUTBOX TEST — SMTP stub on 127.0.0.1:{port}")
+    print("=" * 60)
+    try:
+        run_connection_reuse(handler, port)
+        run_transient_retry(handler, port)
+        run_permanent_failure(handler, port)
+        run_server_down()
+        run_bcc_and_fast_enqueue(handler, port)
+        run_two_senders(handler, port)
+        run_corrupt_message(handler, port)
+    finally:
+        controller.stop()
+    print("=" * 60)
+    print(f"{sum(RESULTS)}/{len(RESULTS)} checks passed")
+    return 0 if all(RESULTS) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
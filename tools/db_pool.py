@@ -0,0 +1,155 @@
+"""
+Thread-safe pyodbc connection pool.
+
+pyodbc connections must not be shared between threads, and opening one costs
+a full TCP + login round trip against SQL Server. Callers that run queries on
+worker threads (weekly_screening_report's view pool, ...) check a connection
+out, use it, and hand it back so the next task reuses the warm session.
+
+Usage:
+    from tools.db_pool import get_pool
+
+    with get_pool().connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT 1")
+"""
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from config.settings import SQL_CONNECT_TIMEOUT, SQL_POOL_SIZE, get_sql_connection_string
+
+
+class ConnectionPool:
+    """Bounded pool of pyodbc connections.
+
+    At most `max_size` connections exist at once; `acquire` blocks (up to
+    `timeout` seconds) when all of them are checked out. A connection that was
+    in use when an exception escaped is discarded instead of returned, since
+    its transaction/cursor state is unknown.
+
+    After a failed connect the pool fails fast for `retry_after` seconds
+    instead of letting every caller sit through its own login timeout against
+    a server that just proved unreachable.
+    """
+
+    def __init__(self, conn_str: str | None = None, max_size: int = SQL_POOL_SIZE,
+                 connect_timeout: int = 0, retry_after: float = 30.0):
+        self.conn_str = conn_str or get_sql_connection_string()
+        self.max_size = max(1, max_size)
+        self.connect_timeout = connect_timeout
+        self.retry_after = retry_after
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._down_until = 0.0
+        self._down_error: str | None = None
+
+    def _open(self):
+        import pyodbc  # lazily: a pool that never connects doesn't need the ODBC driver
+
+        if time.monotonic() < self._down_until:
+            raise ConnectionError(f"SQL Server unavailable (last connect failed: {self._down_error})")
+        try:
+            conn = pyodbc.connect(self.conn_str, timeout=self.connect_timeout)
+        except Exception as e:
+            self._down_until = time.monotonic() + self.retry_after
+            self._down_error = str(e)
+            raise
+        self._down_until = 0.0
+        self._down_error = None
+        return conn
+
+    def acquire(self, timeout: float | None = None):
+        """Check out a connection, opening a new one if the pool has room."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_open = self._created < self.max_size
+            if can_open:
+                self._created += 1
+        if can_open:
+            try:
+                return self._open()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(
+                f"No SQL connection available within {timeout}s "
+                f"(pool size {self.max_size})"
+            )
+
+    def release(self, conn, discard: bool = False) -> None:
+        """Return a connection to the pool (or close it when discard=True)."""
+        if discard:
+            try:
+                conn.close()
+            except Exception:
+                pass
+            with self._lock:
+                self._created -= 1
+            return
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self, timeout: float | None = None):
+        """Context manager that checks a connection out and back in."""
+        conn = self.acquire(timeout=timeout)
+        try:
+            yield conn
+        except Exception:
+            self.release(conn, discard=True)
+            raise
+        else:
+            self.release(conn)
+
+    def warm(self, n: int = 1) -> None:
+        """Open up to n connections ahead of time so first use skips the login."""
+        conns = [self.acquire() for _ in range(min(n, self.max_size))]
+        for conn in conns:
+            self.release(conn)
+
+    def close_all(self) -> None:
+        """Close every idle connection (checked-out ones close on release)."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self.release(conn, discard=True)
+
+    def stats(self) -> dict:
+        return {
+            "max_size": self.max_size,
+            "open": self._created,
+            "idle": self._idle.qsize(),
+            "in_use": self._created - self._idle.qsize(),
+            "last_connect_error": self._down_error,
+        }
+
+
+_default_pool: ConnectionPool | None = None
+_default_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """Process-wide default pool built from the .env SQL settings.
+
+    Preflight warms it; the agents' SQL tools, the fallback report and the
+    recipient directory then reuse the same logged-in session(s).
+    """
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = ConnectionPool(connect_timeout=SQL_CONNECT_TIMEOUT)
+        return _default_pool
@@ -1,9 +1,9 @@
 """
 Office 365 email sending tool for the Report Compiler Agent.
-Sends the final HTML briefing email via SMTP.
+Queues the final HTML briefing email in the outbox (tools/outbox.py), which
+delivers it via SMTP in the background.
 """
 
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from crewai.tools import BaseTool
@@ -11,16 +11,13 @@ from pydantic import Field, BaseModel
 from typing import Type
 
 from config.settings import (
-    SMTP_SERVER,
-    SMTP_PORT,
-    SMTP_USERNAME,
-    SMTP_PASSWORD,
     EMAIL_FROM,
     EMAIL_FROM_NAME,
     EMAIL_TO,
     get_email_recipients,
     get_email_recipients_by_type,
 )
+from tools.outbox import enqueue
 
 
 class SendEmailInput(BaseModel):
@@ -43,7 +40,7 @@ class SendEmailTool(BaseTool):
     args_schema: Type[BaseModel] = SendEmailInput
 
     def _run(self, subject: str, html_body: str) -> str:
-        """Send the email and return status."""
+        """Queue the email for delivery and return status."""
         try:
             # Get recipients grouped by type (TO/CC/BCC)
             by_type = get_email_recipients_by_type("daily_briefing")
@@ -65,23 +62,14 @@ class SendEmailTool(BaseTool):
             html_part = MIMEText(html_body, "html")
             msg.attach(html_part)
 
-            # Connect to Office 365 SMTP and send
-            with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-                server.ehlo()
-                server.starttls()
-                server.ehlo()
-                server.login(SMTP_USERNAME, SMTP_PASSWORD)
-                server.sendmail(EMAIL_FROM, all_recipients, msg.as_string())
+            # Spool for the background Office 365 sender (retries on failure;
+            # check delivery with `py -3.12 -m tools.outbox --status`)
+            msg_id = enqueue(msg, all_recipients)
 
-            return f"Email sent successfully to {len(all_recipients)} recipients with subject: {subject}"
-
-        except smtplib.SMTPAuthenticationError:
             return (
-                "Email authentication failed. Check SMTP_USERNAME and "
-                "SMTP_PASSWORD in your .env file. For Office 365, you may "
-                "need an App Password if MFA is enabled."
+                f"Email queued successfully for {len(all_recipients)} recipients "
+                f"(outbox {msg_id}) with subject: {subject}"
             )
-        except smtplib.SMTPException as e:
-            return f"SMTP Error: {str(e)}"
+
         except Exception as e:
-            return f"Error sending email: {str(e)}"
+            return f"Error queueing email: {str(e)}"
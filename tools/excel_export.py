@@ -0,0 +1,137 @@
+"""
+Streaming, constant-memory Excel export engine.
+
+`DataFrame.to_excel` builds the full openpyxl object model (one Python object
+per cell, plus styles) before anything is written, so a 2,000-row x 60-column
+NSE snapshot costs hundreds of MB and several seconds per file. This engine
+uses openpyxl's write-only mode instead: rows are serialized to a temp XML
+stream as they are appended, so memory stays flat no matter how many rows go
+through, and the DataFrames can arrive in chunks straight from
+`pd.read_sql(..., chunksize=N)`.
+
+A single StreamingWorkbook can be fed from several threads (the weekly
+screening report streams each view from its own SQL worker into one
+consolidated workbook); appends are serialized with a lock.
+
+Usage:
+    book = StreamingWorkbook("exports/report.xlsx")
+    book.reserve_sheets(["Snapshot", "Top 10 Gain"])     # fix sheet order
+    for chunk in pd.read_sql(sql, conn, chunksize=500):
+        book.append_frame("Snapshot", chunk)
+    book.save()
+"""
+
+import threading
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+# Excel hard limit on worksheet title length.
+MAX_SHEET_TITLE = 31
+
+_HEADER_FONT = Font(bold=True)
+
+
+def sheet_title(label: str) -> str:
+    """Trim a label to a legal worksheet title."""
+    return label[:MAX_SHEET_TITLE]
+
+
+def read_sql_chunks(sql: str, conn, params=None, chunksize: int = 500):
+    """Yield DataFrame chunks of a query (at least one, possibly empty, frame).
+
+    pandas already yields an empty frame carrying the column names for an
+    empty result, so the sheet still gets its header row.
+    """
+    return pd.read_sql(sql, conn, params=params, chunksize=chunksize)
+
+
+def _frame_rows(df: pd.DataFrame):
+    """Rows as plain tuples with NaN/NaT mapped to empty cells."""
+    cleaned = df.astype(object).where(df.notna(), None)
+    return cleaned.itertuples(index=False, name=None)
+
+
+class StreamingWorkbook:
+    """Write-only workbook that accepts whole DataFrames or chunks of one."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._wb = Workbook(write_only=True)
+        self._sheets = {}          # title -> worksheet
+        self._has_header = set()   # titles whose header row is written
+        self._rows = {}            # title -> data rows written
+        self._lock = threading.Lock()
+        self._saved = False
+
+    def _sheet(self, title: str):
+        title = sheet_title(title)
+        if title not in self._sheets:
+            self._sheets[title] = self._wb.create_sheet(title)
+            self._rows[title] = 0
+        return title, self._sheets[title]
+
+    def reserve_sheets(self, titles) -> None:
+        """Create sheets up front so their order doesn't depend on which
+        producer finishes first. Sheets that never receive data are dropped
+        on save."""
+        with self._lock:
+            for t in titles:
+                self._sheet(t)
+
+    def append_frame(self, title: str, df: pd.DataFrame) -> int:
+        """Append one DataFrame (or one chunk of a larger one) to a sheet.
+
+        The header row is taken from the first frame appended to the sheet.
+
+        Returns:
+            Number of data rows appended.
+        """
+        with self._lock:
+            title, ws = self._sheet(title)
+            if title not in self._has_header:
+                header = []
+                for col in df.columns:
+                    cell = WriteOnlyCell(ws, value=str(col))
+                    cell.font = _HEADER_FONT
+                    header.append(cell)
+                ws.append(header)
+                self._has_header.add(title)
+            n = 0
+            for row in _frame_rows(df):
+                ws.append(row)
+                n += 1
+            self._rows[title] += n
+            return n
+
+    def append_chunks(self, title: str, chunks) -> int:
+        """Append every DataFrame from an iterable of chunks; returns row count."""
+        return sum(self.append_frame(title, chunk) for chunk in chunks)
+
+    def row_counts(self) -> dict[str, int]:
+        return dict(self._rows)
+
+    def save(self) -> str:
+        """Write the workbook to disk (once) and return its path."""
+        with self._lock:
+            if not self._saved:
+                for title, ws in list(self._sheets.items()):
+                    if title not in self._has_header:
+                        self._wb.remove(ws)
+                if not self._has_header:
+                    # openpyxl refuses to save a workbook without sheets
+                    self._wb.create_sheet("Empty")
+                self._wb.save(self.path)
+                self._saved = True
+            return self.path
+
+
+def write_frames_xlsx(path: str, sheets) -> str:
+    """Write {title: DataFrame} (or (title, DataFrame) pairs) as one workbook."""
+    items = sheets.items() if isinstance(sheets, dict) else sheets
+    book = StreamingWorkbook(path)
+    for title, df in items:
+        book.append_frame(title, df)
+    return book.save()
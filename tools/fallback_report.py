@@ -12,9 +12,6 @@ result sets (e.g. the consolidated forex query) a curated column subset is
 displayed so the tables stay email-friendly.
 """
 
-import pyodbc
-
-from config.settings import get_sql_connection_string
 from config.sql_queries import (
     MARKET_INTEL_QUERIES,
     ML_ANALYST_QUERIES,
@@ -24,6 +21,8 @@ from config.sql_queries import (
     RISK_QUERIES,
     CROSS_STRATEGY_QUERIES,
 )
+from tools.db_pool import get_pool
+from tools.tracing import span
 
 # ---------------------------------------------------------------------------
 # Section -> queries mapping
@@ -75,15 +74,15 @@ SECTIONS: dict[str, list[tuple]] = {
 
 def _run_query(sql: str) -> tuple[list[str], list[tuple]]:
     """Execute a read-only query and return (columns, rows). Raises on error."""
-    conn = pyodbc.connect(get_sql_connection_string())
-    try:
+    with span("sql.query", category="sql", query=" ".join(sql.split())[:160]) as sql_span, \
+            get_pool().connection() as conn:
         cursor = conn.cursor()
         cursor.execute(sql)
         columns = [desc[0] for desc in cursor.description]
         rows = cursor.fetchall()
+        cursor.close()
+        sql_span.set(rows=len(rows))
         return columns, [tuple(r) for r in rows]
-    finally:
-        conn.close()
 
 
 def _fmt(value) -> str:
@@ -0,0 +1,226 @@
+"""
+Deterministic fast path for the chat assistant.
+
+Many chat questions ("what is USD/INR today", "show my open trades") map one
+to one to a predefined query. Sending those through a Crew costs several LLM
+calls just to pick the query name and restate the table. This router
+matches the question against the query descriptions (config/sql_queries.py
+QUERY_DESCRIPTIONS) with plain keyword scoring — no model, no embeddings — and
+answers a confident match straight from the query, formatted by a template.
+
+Scoring: question and descriptions are normalized (lowercase, light
+stemming, currency pairs, "tier 1", "last week" ...) into terms weighted by
+IDF across all descriptions, so "usd/inr" or "family" count for more than
+"signal".
+
+A route is taken only when all of these hold:
+
+  - every question term is known and the best query's description explains
+    at least MIN_COVERAGE of the question's weight ("how did the nasdaq do
+    last month" is not answered by a 30-day model accuracy table);
+  - confidence = (best query's matched weight - runner-up's) / question
+    weight, the share of the question only the best query explains,
+    reaches CHAT_FAST_PATH_MIN_CONFIDENCE;
+  - the question asks for no reasoning or forecast (why, compare, should,
+    tomorrow, ...) and names no ticker — predefined queries return today's
+    lists, not one stock or one past date.
+
+Anything else returns None and the caller falls back to the LLM.
+
+    python -m tools.intent_router "What is the current USD/INR rate?"
+"""
+
+import math
+import re
+from dataclasses import dataclass
+
+from config.settings import CHAT_FAST_PATH_MAX_ROWS, CHAT_FAST_PATH_MIN_CONFIDENCE
+
+# Rewritten before tokenizing, so multi-word phrases become single terms
+_PHRASES = [
+    (re.compile(r"\b[a-z]{3}\s*[/\-]\s*[a-z]{3}\b"), " fxpair "),
+    (re.compile(r"\b(?:usdinr|eurusd|gbpusd|usdjpy|eurinr|gbpinr)\b"), " fxpair "),
+    (re.compile(r"\btier[\s\-]*(?:1|one|i)\b"), " tier1 "),
+    (re.compile(r"\btier[\s\-]*(?:2|two|ii)\b"), " tier2 "),
+    (re.compile(r"\bstrategy[\s\-]*(?:1|one)\b"), " strategy1 "),
+    (re.compile(r"\bstrategy[\s\-]*(?:2|two)\b"), " strategy2 "),
+    (re.compile(r"\b(?:7|seven)[\s\-]*days?\b|\b(?:last|this|past)\s+week\b|\bweekly\b"), " 7d "),
+    (re.compile(r"\b(?:14|fourteen)[\s\-]*days?\b|\b(?:2|two)\s+weeks\b"), " 14d "),
+    (re.compile(r"\b(?:30|thirty)[\s\-]*days?\b|\b(?:last|this|past)\s+month\b|\bmonthly\b"), " 30d "),
+    (re.compile(r"\b(?:1|one)[\s\-]*day\b"), " 1d "),
+    (re.compile(r"\bnasdaq[\s\-]*100\b"), " nasdaq "),
+    (re.compile(r"\bnse[\s\-]*500\b"), " nse "),
+    (re.compile(r"\bmachine\s+learning\b"), " ml "),
+    (re.compile(r"\bnet\s+worth\b"), " networth "),
+    (re.compile(r"\bstop[\s\-]*loss\b"), " stoploss "),
+    (re.compile(r"\bhit\s+rate\b"), " accuracy "),
+]
+
+# Same concept, one term
+_SYNONYMS = {
+    "gainer": "mover", "loser": "mover", "movement": "mover",
+    "accurate": "accuracy", "performance": "accuracy", "performing": "accuracy",
+    "perform": "accuracy", "scorecard": "accuracy", "success": "accuracy",
+    "currency": "forex", "fx": "forex", "exchange": "forex", "rupee": "forex", "inr": "forex",
+    "dollar": "forex", "usd": "forex",
+    "indian": "nse", "india": "nse",
+    "holding": "portfolio", "position": "portfolio",
+    "asset": "asset", "wealth": "networth",
+    "warning": "risk", "risky": "risk",
+    "disagree": "conflicting", "conflict": "conflicting", "contradicting": "conflicting",
+    "prediction": "predict", "predicted": "predict", "forecast": "predict",
+    "classifier": "ml", "ai": "ai",
+    "opportunity": "opportunity", "setup": "opportunity", "trade": "trade", "trading": "trade",
+    "bullish": "buy", "bearish": "sell",
+    "overview": "summary", "advancer": "breadth", "decliner": "breadth",
+    "rate": "rate", "price": "price",
+}
+
+_STOPWORDS = set("""
+    a an and are as at be by can current currently do does did for from get give has have
+    how i in is it its latest list me most my now of on or our over please right see show
+    so tell that the their them there these this those to today today's us was we what
+    whats what's when where which who with you your data all any there's any now day daily
+    info information look looking about find out up down top last after best were total
+""".split())
+
+# Words that ask for judgement, a forecast or a comparison the template can't give
+_REASONING = set("""
+    why explain compare comparison versus vs should would could recommend recommendation
+    advice advise suggest analyze analyse if better worse reason because expect
+    think opinion tomorrow will going next outlook future
+""".split())
+
+# Share of the question's weight the best description must explain
+MIN_COVERAGE = 0.9
+
+# Upper-case words that are not tickers
+_ACRONYMS = {"ML", "AI", "NSE", "USD", "INR", "EUR", "GBP", "JPY", "RSI", "MACD", "FX", "TIER",
+             "SMA", "EMA", "BB", "LR", "GB", "RF", "NASDAQ", "OK", "P&L", "PNL", "I", "A"}
+_TICKER = re.compile(r"\b[A-Z]{2,5}(?:\.NS)?\b|\b[A-Za-z]{1,10}\.NS\b")
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _stem(word: str) -> str:
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def terms(text: str) -> list[str]:
+    """Normalized content terms of a question or description."""
+    text = text.lower().replace("'s", "")
+    for pattern, replacement in _PHRASES:
+        text = pattern.sub(replacement, text)
+    out = []
+    for word in _WORD.findall(text):
+        if word in _STOPWORDS:
+            continue
+        word = _stem(word)
+        out.append(_SYNONYMS.get(word, word))
+    return out
+
+
+def _tickers(question: str) -> list[str]:
+    """Ticker-looking words (AAPL, RELIANCE.NS) in the question."""
+    return [t for t in _TICKER.findall(question) if t.upper() not in _ACRONYMS]
+
+
+@dataclass
+class Route:
+    query_name: str
+    confidence: float
+    coverage: float     # share of the question's weight the query matches
+    runner_up: str | None
+
+
+class IntentRouter:
+    """Keyword router over {query_name: description}."""
+
+    def __init__(self, descriptions: dict[str, str]):
+        self.docs = {name: set(terms(text)) for name, text in descriptions.items() if text}
+        frequency: dict[str, int] = {}
+        for doc in self.docs.values():
+            for term in doc:
+                frequency[term] = frequency.get(term, 0) + 1
+        n = len(self.docs)
+        self.idf = {term: math.log(1 + n / count) for term, count in frequency.items()}
+
+    def rank(self, question: str) -> list[tuple[str, float]]:
+        """[(query_name, matched weight)] best first, zero scores dropped."""
+        asked = set(terms(question))
+        scores = [(name, sum(self.idf[t] for t in asked & doc)) for name, doc in self.docs.items()]
+        return sorted((s for s in scores if s[1] > 0), key=lambda s: (-s[1], s[0]))
+
+    def route(self, question: str, min_confidence: float = CHAT_FAST_PATH_MIN_CONFIDENCE) -> Route | None:
+        """The query that answers `question`, or None if it isn't a clear match."""
+        asked = set(terms(question))
+        if not asked or asked & _REASONING or _tickers(question):
+            return None
+        ranked = self.rank(question)
+        if not ranked:
+            return None
+        best_name, best = ranked[0]
+        second_name, second = ranked[1] if len(ranked) > 1 else (None, 0.0)
+        if any(t not in self.idf for t in asked):
+            return None  # asks about something no query describes
+        total = sum(self.idf[t] for t in asked)
+        confidence = (best - second) / total
+        if best / total < MIN_COVERAGE or confidence < min_confidence:
+            return None
+        return Route(best_name, round(confidence, 3), round(best / total, 3), second_name)
+
+
+def format_rows(columns: list[str], rows: list, max_rows: int = CHAT_FAST_PATH_MAX_ROWS) -> str:
+    """Rows as the same pipe table the SQL tools give the agents."""
+    lines = [" | ".join(columns)]
+    lines.append("-" * len(lines[0]))
+    for row in rows[:max_rows]:
+        lines.append(" | ".join("NULL" if v is None else str(v) for v in row))
+    shown = f"{min(len(rows), max_rows)} of {len(rows)}" if len(rows) > max_rows else str(len(rows))
+    return "\n".join(lines) + f"\n\n({shown} rows)"
+
+
+def _as_of(columns: list[str], rows: list) -> str | None:
+    """The first date-like value of the first row, for the answer heading."""
+    for index, column in enumerate(columns):
+        if rows and "date" in column.lower() and rows[0][index] is not None:
+            return str(rows[0][index])[:10]
+    return None
+
+
+def answer(route: Route, sql: str, description: str) -> str:
+    """Templated answer for a routed question, from the (cached) query result."""
+    from tools.result_cache import cached_query
+
+    columns, rows, _hit = cached_query(sql)
+    heading = description.split(":", 1)[0]
+    as_of = _as_of(columns, rows)
+    lines = [f"{heading}{f' (as of {as_of})' if as_of else ''}", ""]
+    lines.append(format_rows(columns, rows) if rows else "The query returned no rows.")
+    lines.append("")
+    lines.append(f"Answered directly from the predefined query '{route.query_name}'.")
+    return "\n".join(lines)
+
+
+def main():
+    import argparse
+
+    from config.sql_queries import QUERY_DESCRIPTIONS
+
+    parser = argparse.ArgumentParser(description="Show how the chat fast path routes a question")
+    parser.add_argument("question")
+    args = parser.parse_args()
+
+    router = IntentRouter(QUERY_DESCRIPTIONS)
+    print(f"terms: {terms(args.question)}")
+    for name, score in router.rank(args.question)[:5]:
+        print(f"  {score:6.2f}  {name}")
+    route = router.route(args.question)
+    print(f"-> {route}" if route else "-> LLM (no confident match)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,495 @@
+"""
+Outbox spool + background SMTP sender.
+
+Every send path (daily briefing, SendEmailTool, the bucket/tomorrow/screening
+reports) used to open its own SMTP session, STARTTLS, log in and block until
+Office 365 accepted the message — and a transient SMTP failure lost the email.
+Now they call `enqueue()`, which writes the rendered message to a spool
+directory and returns immediately; the pipeline's critical path ends there.
+
+A sender drains the spool:
+  - one authenticated SMTP session is reused for every message in a drain
+  - failures are retried with exponential backoff (OUTBOX_BACKOFF_*)
+  - after OUTBOX_MAX_ATTEMPTS the message is moved to failed/
+  - each message carries a JSON delivery record (status, attempts, last
+    error, sent_at, refused recipients)
+
+Spool layout (OUTBOX_DIR):
+    pending/<id>.eml  + <id>.json   waiting for (re)delivery
+    inflight/<id>.eml + <id>.json   claimed by a sender, being delivered
+    sent/<id>.eml     + <id>.json   delivered
+    failed/<id>.eml   + <id>.json   gave up after max attempts
+
+Several senders may drain the same spool (every report process kicks one,
+and `--watch` runs another). A sender claims a message by renaming its
+record into inflight/ before sending; the rename is atomic, so exactly one
+sender wins and the others skip it. Claims left behind by a sender that
+died are returned to pending/ after INFLIGHT_STALE_SEC.
+
+`enqueue()` also kicks a process-wide background sender thread. It is a
+non-daemon thread, so a short-lived report script still delivers before the
+interpreter exits; messages still backing off after OUTBOX_LINGER_SEC are
+left in pending/ for the next drain.
+
+Usage:
+    py -3.12 -m tools.outbox              # drain pending messages once
+    py -3.12 -m tools.outbox --watch      # keep draining (scheduler/service)
+    py -3.12 -m tools.outbox --status     # counts + recent delivery records
+"""
+
+import argparse
+import json
+import os
+import smtplib
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from config.settings import (
+    EMAIL_FROM,
+    OUTBOX_BACKOFF_BASE_SEC,
+    OUTBOX_BACKOFF_MAX_SEC,
+    OUTBOX_DIR,
+    OUTBOX_LINGER_SEC,
+    OUTBOX_MAX_ATTEMPTS,
+    SMTP_PASSWORD,
+    SMTP_PORT,
+    SMTP_SERVER,
+    SMTP_USE_TLS,
+    SMTP_USERNAME,
+)
+from tools.tracing import span
+
+PENDING, INFLIGHT, SENT, FAILED = "pending", "inflight", "sent", "failed"
+
+# A claim this old belongs to a sender that died mid-delivery
+INFLIGHT_STALE_SEC = 3600
+
+
+# ---------------------------------------------------------------------------
+# Spool
+# ---------------------------------------------------------------------------
+class Outbox:
+    """Directory-backed message spool."""
+
+    def __init__(self, root: str = OUTBOX_DIR):
+        self.root = root
+        for state in (PENDING, INFLIGHT, SENT, FAILED):
+            os.makedirs(os.path.join(root, state), exist_ok=True)
+
+    def _path(self, state: str, msg_id: str, ext: str) -> str:
+        return os.path.join(self.root, state, f"{msg_id}.{ext}")
+
+    def _write_json(self, path: str, record: dict) -> None:
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2, default=str)
+        os.replace(tmp, path)
+
+    def put(self, raw_message: bytes, recipients: list[str], subject: str = "",
+            sender: str = EMAIL_FROM) -> str:
+        """Spool one rendered message. Returns its id.
+
+        The .eml is written first and the .json record last, so a message is
+        only visible to the sender once both files are complete.
+        """
+        msg_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{uuid.uuid4().hex[:8]}"
+        eml_path = self._path(PENDING, msg_id, "eml")
+        with open(f"{eml_path}.tmp", "wb") as f:
+            f.write(raw_message)
+        os.replace(f"{eml_path}.tmp", eml_path)
+
+        now = datetime.now().isoformat()
+        self._write_json(self._path(PENDING, msg_id, "json"), {
+            "id": msg_id,
+            "subject": subject,
+            "sender": sender,
+            "recipients": list(recipients),
+            "status": PENDING,
+            "created_at": now,
+            "attempts": 0,
+            "next_attempt_at": now,
+            "last_error": None,
+            "sent_at": None,
+            "refused": {},
+        })
+        return msg_id
+
+    def pending(self, due_only: bool = True) -> list[dict]:
+        """Pending delivery records, oldest first."""
+        now = datetime.now().isoformat()
+        records = []
+        pending_dir = os.path.join(self.root, PENDING)
+        for name in sorted(os.listdir(pending_dir)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(pending_dir, name), "r", encoding="utf-8") as f:
+                    rec = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            if not isinstance(rec, dict):
+                continue
+            rec["id"] = name[:-len(".json")]
+            if due_only and rec.get("next_attempt_at", "") > now:
+                continue
+            records.append(rec)
+        return records
+
+    def claim(self, msg_id: str) -> dict | None:
+        """Take a pending message for delivery. Returns its current record, or
+        None if another sender claimed (or finished) it first."""
+        try:
+            os.rename(self._path(PENDING, msg_id, "json"), self._path(INFLIGHT, msg_id, "json"))
+        except FileNotFoundError:
+            return None
+        os.utime(self._path(INFLIGHT, msg_id, "json"))  # claim time, for recover_stale
+        try:
+            os.rename(self._path(PENDING, msg_id, "eml"), self._path(INFLIGHT, msg_id, "eml"))
+        except FileNotFoundError:
+            pass  # body missing: read_message fails and the record is charged
+        try:
+            with open(self._path(INFLIGHT, msg_id, "json"), "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except OSError:
+            return None
+        except json.JSONDecodeError:
+            record = None
+        if not isinstance(record, dict):
+            # Corrupt record: the drain charges it as a permanent failure
+            record = {"id": msg_id, "attempts": 0}
+        record["id"] = msg_id
+        return record
+
+    def read_message(self, msg_id: str) -> bytes:
+        with open(self._path(INFLIGHT, msg_id, "eml"), "rb") as f:
+            return f.read()
+
+    def update(self, record: dict) -> None:
+        """Release a claimed message back to pending/ with its new record.
+        A message whose body is gone can never be sent and goes to failed/."""
+        msg_id = record["id"]
+        try:
+            os.replace(self._path(INFLIGHT, msg_id, "eml"), self._path(PENDING, msg_id, "eml"))
+        except FileNotFoundError:
+            if not os.path.exists(self._path(PENDING, msg_id, "eml")):
+                self.move(record, FAILED)
+                return
+        self._write_json(self._path(INFLIGHT, msg_id, "json"), record)
+        os.replace(self._path(INFLIGHT, msg_id, "json"), self._path(PENDING, msg_id, "json"))
+
+    def move(self, record: dict, state: str) -> None:
+        """Finalize a claimed record into sent/ or failed/."""
+        record["status"] = state
+        msg_id = record["id"]
+        try:
+            os.replace(self._path(INFLIGHT, msg_id, "eml"), self._path(state, msg_id, "eml"))
+        except FileNotFoundError:
+            pass
+        self._write_json(self._path(state, msg_id, "json"), record)
+        try:
+            os.remove(self._path(INFLIGHT, msg_id, "json"))
+        except FileNotFoundError:
+            pass
+
+    def recover_stale(self, older_than: float = INFLIGHT_STALE_SEC) -> int:
+        """Return claims abandoned by a dead sender to pending/. Returns the count."""
+        inflight_dir = os.path.join(self.root, INFLIGHT)
+        cutoff = time.time() - older_than
+        recovered = 0
+        for name in os.listdir(inflight_dir):
+            if not name.endswith(".json"):
+                continue
+            msg_id = name[:-len(".json")]
+            try:
+                if os.path.getmtime(os.path.join(inflight_dir, name)) > cutoff:
+                    continue
+                if os.path.exists(self._path(INFLIGHT, msg_id, "eml")):
+                    os.replace(self._path(INFLIGHT, msg_id, "eml"), self._path(PENDING, msg_id, "eml"))
+                os.replace(self._path(INFLIGHT, msg_id, "json"), self._path(PENDING, msg_id, "json"))
+                recovered += 1
+            except FileNotFoundError:
+                continue  # another sender recovered it
+        return recovered
+
+    def record(self, msg_id: str) -> dict | None:
+        """Current delivery record for a message, whichever state it is in."""
+        for state in (SENT, FAILED, INFLIGHT, PENDING):
+            path = self._path(state, msg_id, "json")
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+        return None
+
+    def status(self, recent: int = 10) -> dict:
+        counts = {}
+        latest = []
+        for state in (PENDING, INFLIGHT, SENT, FAILED):
+            d = os.path.join(self.root, state)
+            names = sorted(n for n in os.listdir(d) if n.endswith(".json"))
+            counts[state] = len(names)
+            for name in names[-recent:]:
+                try:
+                    with open(os.path.join(d, name), "r", encoding="utf-8") as f:
+                        latest.append(json.load(f))
+                except (OSError, json.JSONDecodeError):
+                    continue
+        latest.sort(key=lambda r: r.get("created_at", ""))
+        return {"counts": counts, "recent": latest[-recent:]}
+
+
+# ---------------------------------------------------------------------------
+# Sender
+# ---------------------------------------------------------------------------
+def backoff_seconds(attempts: int, base: float = OUTBOX_BACKOFF_BASE_SEC,
+                    cap: float = OUTBOX_BACKOFF_MAX_SEC) -> float:
+    """Delay before retry number `attempts` (1-based): base, 2x, 4x ... capped."""
+    return min(cap, base * (2 ** max(0, attempts - 1)))
+
+
+class OutboxSender:
+    """Drains an Outbox over a single reused SMTP session."""
+
+    def __init__(self, outbox: Outbox, host: str = SMTP_SERVER, port: int = SMTP_PORT,
+                 username: str = SMTP_USERNAME, password: str = SMTP_PASSWORD,
+                 use_tls: bool = SMTP_USE_TLS, max_attempts: int = OUTBOX_MAX_ATTEMPTS,
+                 backoff_base: float = OUTBOX_BACKOFF_BASE_SEC,
+                 backoff_max: float = OUTBOX_BACKOFF_MAX_SEC, timeout: float = 60):
+        self.outbox = outbox
+        self.host, self.port = host, port
+        self.username, self.password = username, password
+        self.use_tls = use_tls
+        self.max_attempts = max_attempts
+        self.backoff_base, self.backoff_max = backoff_base, backoff_max
+        self.timeout = timeout
+        self._smtp = None
+        self.sessions_opened = 0
+
+    def _connect(self):
+        with span("smtp.connect", category="smtp", host=self.host):
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            server.ehlo()
+            if self.use_tls:
+                server.starttls()
+                server.ehlo()
+            if self.username:
+                server.login(self.username, self.password)
+        self.sessions_opened += 1
+        return server
+
+    def _session(self):
+        if self._smtp is None:
+            self._smtp = self._connect()
+        return self._smtp
+
+    def close(self) -> None:
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+
+    def _deliver(self, record: dict, raw: bytes) -> dict:
+        """Send over the shared session, reconnecting once if it went stale."""
+        with span("smtp.send", category="smtp", msg_id=record["id"],
+                  recipients=len(record["recipients"]), bytes=len(raw)):
+            try:
+                return self._session().sendmail(record["sender"], record["recipients"], raw)
+            except smtplib.SMTPServerDisconnected:
+                self._smtp = None
+                return self._session().sendmail(record["sender"], record["recipients"], raw)
+
+    def _record_failure(self, record: dict, error: Exception, permanent: bool = False) -> None:
+        """Count a failed attempt: schedule a retry, or give up on a permanent
+        (5xx) rejection of this message / after max_attempts."""
+        record["attempts"] = record.get("attempts", 0) + 1
+        record["last_error"] = f"{type(error).__name__}: {error}"
+        permanent = permanent or isinstance(error, smtplib.SMTPRecipientsRefused) or (
+            isinstance(error, smtplib.SMTPResponseException)
+            and not isinstance(error, smtplib.SMTPAuthenticationError)
+            and 500 <= error.smtp_code < 600
+        )
+        if permanent or record["attempts"] >= self.max_attempts:
+            self.outbox.move(record, FAILED)
+            return
+        delay = backoff_seconds(record["attempts"], self.backoff_base, self.backoff_max)
+        record["next_attempt_at"] = (datetime.now() + timedelta(seconds=delay)).isoformat()
+        self.outbox.update(record)
+
+    def drain(self) -> dict:
+        """Attempt every due pending message once. Returns per-state counts.
+
+        Each message is claimed first; one another sender already took is
+        skipped. If the server can't be reached or rejects the login, the
+        drain stops after charging the attempt to the first message — the
+        rest would fail the same way and are picked up by the next drain.
+        A message that can't be read or built (corrupt .json/.eml) goes to
+        failed/ and the drain moves on.
+        """
+        result = {"sent": 0, "retry": 0, "failed": 0}
+        self.outbox.recover_stale()
+        try:
+            for listed in self.outbox.pending(due_only=True):
+                record = self.outbox.claim(listed["id"])
+                if record is None:
+                    continue  # someone else has it
+                try:
+                    self._session()
+                except (smtplib.SMTPException, OSError) as e:
+                    self._record_failure(record, e)
+                    result["failed" if record["status"] == FAILED else "retry"] += 1
+                    break
+                try:
+                    raw = self.outbox.read_message(record["id"])
+                    refused = self._deliver(record, raw)
+                except (smtplib.SMTPException, OSError) as e:
+                    if not isinstance(e, smtplib.SMTPResponseException):
+                        # Connection-level problem — drop the session so the
+                        # next message starts a fresh one.
+                        self.close()
+                    else:
+                        # Leave the session usable for the next message.
+                        try:
+                            self._smtp.rset()
+                        except Exception:
+                            self.close()
+                    self._record_failure(record, e)
+                    result["failed" if record["status"] == FAILED else "retry"] += 1
+                    continue
+                except Exception as e:
+                    # Corrupt record or message: retrying won't fix it
+                    try:
+                        self._smtp.rset()
+                    except Exception:
+                        self.close()
+                    self._record_failure(record, e, permanent=True)
+                    result["failed"] += 1
+                    continue
+                record["attempts"] = record.get("attempts", 0) + 1
+                record["sent_at"] = datetime.now().isoformat()
+                record["last_error"] = None
+                record["refused"] = {k: list(v) for k, v in (refused or {}).items()}
+                self.outbox.move(record, SENT)
+                result["sent"] += 1
+        finally:
+            self.close()
+        return result
+
+    def run_until_empty(self, linger: float = OUTBOX_LINGER_SEC, poll: float = 1.0,
+                        stop: threading.Event | None = None) -> None:
+        """Drain repeatedly until nothing is pending, or `linger` seconds pass
+        with only backing-off messages left."""
+        deadline = time.monotonic() + linger
+        while not (stop and stop.is_set()):
+            self.drain()
+            remaining = self.outbox.pending(due_only=False)
+            if not remaining or time.monotonic() >= deadline:
+                return
+            next_due = min(r["next_attempt_at"] for r in remaining)
+            wait = (datetime.fromisoformat(next_due) - datetime.now()).total_seconds()
+            wait = max(poll, min(wait, deadline - time.monotonic()))
+            if stop:
+                stop.wait(wait)
+            else:
+                time.sleep(wait)
+
+
+# ---------------------------------------------------------------------------
+# Process-wide helpers used by the send paths
+# ---------------------------------------------------------------------------
+_outbox: Outbox | None = None
+_sender_thread: threading.Thread | None = None
+_sender_lock = threading.Lock()
+
+
+def get_outbox() -> Outbox:
+    global _outbox
+    if _outbox is None:
+        _outbox = Outbox()
+    return _outbox
+
+
+def kick_sender() -> threading.Thread:
+    """Start the background sender thread if it isn't already running."""
+    global _sender_thread
+    with _sender_lock:
+        if _sender_thread is None or not _sender_thread.is_alive():
+            sender = OutboxSender(get_outbox())
+            _sender_thread = threading.Thread(
+                target=sender.run_until_empty, name="outbox-sender", daemon=False
+            )
+            _sender_thread.start()
+        return _sender_thread
+
+
+def enqueue(msg, recipients: list[str], kick: bool = True) -> str:
+    """Spool an email.message.Message for delivery and return its id.
+
+    `recipients` is the full envelope list (TO + CC + BCC). The Bcc header is
+    dropped from the stored message so BCC addresses aren't visible to the
+    other recipients.
+    """
+    del msg["Bcc"]
+    with span("outbox.enqueue", category="smtp", recipients=len(recipients)):
+        msg_id = get_outbox().put(
+            msg.as_bytes(), recipients, subject=str(msg.get("Subject", "")),
+        )
+    if kick:
+        kick_sender()
+    return msg_id
+
+
+def wait_for(msg_id: str, timeout: float = 60.0, poll: float = 0.5) -> dict | None:
+    """Block until a message's first delivery attempt has happened (sent,
+    failed, or backing off with last_error set) and return its record."""
+    deadline = time.monotonic() + timeout
+    while True:
+        rec = get_outbox().record(msg_id)
+        if rec is None or rec["status"] != PENDING or rec["attempts"] > 0:
+            return rec
+        if time.monotonic() >= deadline:
+            return rec
+        time.sleep(poll)
+
+
+def flush(timeout: float | None = None) -> bool:
+    """Wait for the background sender to finish. True if it did."""
+    thread = _sender_thread
+    if thread is None:
+        return True
+    thread.join(timeout)
+    return not thread.is_alive()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drain or inspect the email outbox.")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep draining every --interval seconds.")
+    parser.add_argument("--interval", type=float, default=30.0)
+    parser.add_argument("--status", action="store_true", help="Show spool counts and recent records.")
+    args = parser.parse_args()
+
+    outbox = get_outbox()
+    if args.status:
+        st = outbox.status()
+        print(f"Outbox {outbox.root}: " + ", ".join(f"{k}={v}" for k, v in st["counts"].items()))
+        for r in st["recent"]:
+            print(f"  [{r['status']:7s}] {r['created_at'][:19]}  attempts={r['attempts']}  "
+                  f"{r['subject'][:60]}" + (f"  — {r['last_error'][:80]}" if r.get("last_error") else ""))
+        return
+
+    sender = OutboxSender(outbox)
+    while True:
+        result = sender.drain()
+        print(f"Outbox drain: {result}")
+        if not args.watch:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
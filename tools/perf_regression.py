@@ -0,0 +1,155 @@
+"""
+Cross-run performance regression detection over the run store.
+
+Each run is reduced to a set of duration metrics:
+
+    total                   total_duration_sec
+    stage:<name>            run_record["stage_durations"] (preflight, agents, compile_send)
+    agent:<key>             agent_details[<key>]["duration_sec"]
+
+A run's metric is flagged when it sits more than k·MAD above the median of
+the preceding PERF_BASELINE_RUNS comparable runs (same pipeline and mode, not
+failed). MAD is scaled by 1.4826 so k reads like a number of standard
+deviations, and a flag also needs an absolute slowdown of at least
+PERF_MIN_DELTA_SEC — otherwise a pipeline with near-identical timings (MAD≈0)
+would flag every one-second wobble.
+
+Because run records carry `llm_model`, a flagged run that is also the first
+on a new model is reported as such: the usual cause of a step change.
+
+Usage:
+    from tools.perf_regression import detect_regressions, rolling_percentiles
+    flags = detect_regressions(run_record, history)
+"""
+
+from config.settings import (
+    PERF_BASELINE_RUNS,
+    PERF_MAD_K,
+    PERF_MIN_BASELINE,
+    PERF_MIN_DELTA_SEC,
+)
+
+_MAD_SCALE = 1.4826
+_BASELINE_STATUSES = {"success", "partial", "degraded_no_llm"}
+
+
+def run_metrics(record: dict) -> dict[str, float]:
+    """{metric: seconds} for one run record (missing timings are skipped)."""
+    metrics: dict[str, float] = {}
+    if record.get("total_duration_sec") is not None:
+        metrics["total"] = float(record["total_duration_sec"])
+    for stage, sec in (record.get("stage_durations") or {}).items():
+        if sec is not None:
+            metrics[f"stage:{stage}"] = float(sec)
+    for key, detail in (record.get("agent_details") or {}).items():
+        if detail.get("duration_sec") is not None:
+            metrics[f"agent:{key}"] = float(detail["duration_sec"])
+    return metrics
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    """Linear-interpolated percentile, q in [0, 100]."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q / 100.0
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def _comparable(record: dict, other: dict) -> bool:
+    return (
+        other.get("status") in _BASELINE_STATUSES
+        and other.get("pipeline", "daily_briefing") == record.get("pipeline", "daily_briefing")
+        and other.get("mode") == record.get("mode")
+    )
+
+
+def baseline_for(record: dict, history: list[dict], window: int = PERF_BASELINE_RUNS) -> list[dict]:
+    """The last `window` comparable runs that started before `record`."""
+    started = record.get("started_at") or "9999"
+    prior = [
+        r for r in history
+        if (r.get("started_at") or "") < started and r is not record and _comparable(record, r)
+    ]
+    return prior[-window:]
+
+
+def detect_regressions(record: dict, history: list[dict], k: float = PERF_MAD_K,
+                       window: int = PERF_BASELINE_RUNS,
+                       min_baseline: int = PERF_MIN_BASELINE,
+                       min_delta_sec: float = PERF_MIN_DELTA_SEC) -> list[dict]:
+    """Metrics of `record` that are more than k·MAD above their baseline median.
+
+    `history` is any list of run records (oldest first); only comparable runs
+    before `record` are used. Returns one dict per flagged metric, worst first.
+    """
+    baseline = baseline_for(record, history, window)
+    if len(baseline) < min_baseline:
+        return []
+
+    prev_model = baseline[-1].get("llm_model")
+    model = record.get("llm_model")
+    model_changed = bool(model and prev_model and model != prev_model)
+
+    series: dict[str, list[float]] = {}
+    for r in baseline:
+        for metric, sec in run_metrics(r).items():
+            series.setdefault(metric, []).append(sec)
+
+    flags = []
+    for metric, value in run_metrics(record).items():
+        values = series.get(metric, [])
+        if len(values) < min_baseline:
+            continue
+        median = percentile(values, 50)
+        mad = _MAD_SCALE * percentile([abs(v - median) for v in values], 50)
+        threshold = median + k * mad
+        if value > threshold and value - median >= min_delta_sec:
+            flags.append({
+                "metric": metric,
+                "value_sec": round(value, 1),
+                "median_sec": round(median, 1),
+                "p95_sec": round(percentile(values, 95), 1),
+                "threshold_sec": round(threshold, 1),
+                "mads_above": round((value - median) / mad, 1) if mad else None,
+                "baseline_runs": len(values),
+                "model_changed": f"{prev_model} -> {model}" if model_changed else None,
+            })
+    flags.sort(key=lambda f: f["value_sec"] - f["median_sec"], reverse=True)
+    return flags
+
+
+def rolling_percentiles(history: list[dict], window: int = PERF_BASELINE_RUNS,
+                        mode: str | None = "llm") -> dict[str, dict]:
+    """{metric: {"p50", "p95", "n"}} over the last `window` successful-ish runs
+    (of `mode`, when given)."""
+    runs = [
+        r for r in history
+        if r.get("status") in _BASELINE_STATUSES and (mode is None or r.get("mode") == mode)
+    ][-window:]
+    series: dict[str, list[float]] = {}
+    for r in runs:
+        for metric, sec in run_metrics(r).items():
+            series.setdefault(metric, []).append(sec)
+    return {
+        metric: {
+            "p50": round(percentile(values, 50), 1),
+            "p95": round(percentile(values, 95), 1),
+            "n": len(values),
+        }
+        for metric, values in series.items()
+    }
+
+
+def format_regression(flag: dict) -> str:
+    """One-line description of a flagged metric, for logs and --status."""
+    spread = f"{flag['mads_above']} MAD above" if flag["mads_above"] is not None else "above"
+    text = (
+        f"{flag['metric']} took {flag['value_sec']:.0f}s vs median {flag['median_sec']:.0f}s "
+        f"(p95 {flag['p95_sec']:.0f}s, {spread}, n={flag['baseline_runs']})"
+    )
+    if flag.get("model_changed"):
+        text += f" — LLM_MODEL changed {flag['model_changed']}"
+    return text
@@ -2,10 +2,20 @@
 Pre-flight validation checks for the Daily Briefing pipeline.
 Runs before any agent to catch configuration, connectivity, and data
 freshness issues early — avoiding wasted API tokens and time.
+
+The checks run concurrently, each against its own deadline. All SQL work goes
+through the process-wide connection pool (tools/db_pool.py): the SQL Server
+check opens — and so warms — one pooled connection, the SQL-dependent checks
+wait for it and reuse it, and the agents' SQL tools pick up the same session
+afterwards. A slow or dead server therefore costs one login timeout, not one
+per check.
 """
 
 import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from datetime import datetime, timedelta
 
 import pyodbc
@@ -19,10 +29,13 @@ from config.settings import (
     SMTP_PASSWORD,
     EMAIL_FROM,
     EMAIL_TO,
-    get_sql_connection_string,
+    SQL_CONNECT_TIMEOUT,
     get_email_recipients,
     model_always_thinks,
 )
+from tools.db_pool import get_pool
+
+ANTHROPIC_LIVE_CHECK = "Anthropic API Live"
 
 
 class PreflightResult:
@@ -33,6 +46,7 @@ class PreflightResult:
         self.passed = passed
         self.message = message
         self.critical = critical  # If True, pipeline should abort on failure
+        self.elapsed_sec = 0.0    # Set by run_preflight_checks
 
     def __repr__(self):
         status = "PASS" if self.passed else "FAIL"
@@ -118,16 +132,35 @@ def check_anthropic_live(max_tokens: int | None = None) -> tuple[bool, str]:
         return False, reason
 
 
+def check_anthropic_live_result() -> PreflightResult:
+    """check_anthropic_live() as a (non-critical) pre-flight result, so the
+    probe runs alongside the other checks instead of after them."""
+    available, reason = check_anthropic_live()
+    return PreflightResult(
+        ANTHROPIC_LIVE_CHECK, available, "Available" if available else reason,
+        critical=False,  # No credits -> data-only email, not an abort
+    )
+
+
+def live_api_status(results: list[PreflightResult]) -> tuple[bool, str]:
+    """(available, reason) from a run_preflight_checks(live_api=True) result
+    list; probes directly if the live check wasn't part of it."""
+    for r in results:
+        if r.name == ANTHROPIC_LIVE_CHECK:
+            return r.passed, "" if r.passed else r.message
+    return check_anthropic_live()
+
+
 def check_sql_connection() -> PreflightResult:
-    """Verify SQL Server is reachable."""
+    """Verify SQL Server is reachable (and warm the shared connection pool)."""
     try:
-        conn_str = get_sql_connection_string()
-        conn = pyodbc.connect(conn_str, timeout=10)
-        cursor = conn.cursor()
-        cursor.execute("SELECT 1")
-        cursor.close()
-        conn.close()
-        return PreflightResult("SQL Server", True, "Connected successfully")
+        start = time.perf_counter()
+        with get_pool().connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+        ms = (time.perf_counter() - start) * 1000
+        return PreflightResult("SQL Server", True, f"Connected successfully ({ms:.0f}ms, pooled)")
     except pyodbc.Error as e:
         return PreflightResult(
             "SQL Server",
@@ -145,80 +178,66 @@ def check_sql_connection() -> PreflightResult:
 
 
 def check_data_freshness(max_stale_days: int = 3) -> PreflightResult:
-    """Check that market data is reasonably fresh (not older than max_stale_days).
+    """Check that every table the agents query is reasonably fresh (not older
+    than max_stale_days).
 
-    We allow up to 3 days to cover weekends (Friday data checked on Monday).
+    The table set and date columns come from tools/watermarks.py (derived from
+    config/sql_queries.py) and are resolved in one UNION ALL batch; the map is
+    cached for the rest of the run. We allow up to 3 days to cover weekends
+    (Friday data checked on Monday).
     """
+    from tools.watermarks import WATERMARK_REGISTRY, get_watermarks, watermark_label
+
     try:
-        conn = pyodbc.connect(get_sql_connection_string(), timeout=10)
-        cursor = conn.cursor()
-
-        stale_tables = []
-        tables = {
-            "NASDAQ prices": "SELECT MAX(trading_date) FROM nasdaq_100_hist_data",
-            "NSE prices": "SELECT MAX(trading_date) FROM nse_500_hist_data",
-            "NASDAQ ML predictions": (
-                "SELECT MAX(trading_date) FROM ml_trading_predictions"
-            ),
-            "NSE ML predictions": (
-                "SELECT MAX(trading_date) FROM ml_nse_trading_predictions"
-            ),
-        }
-
-        cutoff = datetime.now() - timedelta(days=max_stale_days)
-        details = []
-
-        for label, sql in tables.items():
-            try:
-                cursor.execute(sql)
-                row = cursor.fetchone()
-                if row and row[0]:
-                    latest = row[0]
-                    # Handle both date and datetime objects
-                    if hasattr(latest, "date"):
-                        latest_dt = datetime.combine(latest, datetime.min.time())
-                    elif isinstance(latest, datetime):
-                        latest_dt = latest
-                    else:
-                        latest_dt = datetime.strptime(str(latest)[:10], "%Y-%m-%d")
-
-                    age_days = (datetime.now() - latest_dt).days
-                    if latest_dt < cutoff:
-                        stale_tables.append(f"{label} ({age_days}d old)")
-                    details.append(f"{label}: {str(latest)[:10]} ({age_days}d)")
-                else:
-                    stale_tables.append(f"{label} (no data)")
-            except Exception:
-                # Table might not exist — non-critical
-                details.append(f"{label}: table not found")
-
-        cursor.close()
-        conn.close()
-
-        if stale_tables:
-            return PreflightResult(
-                "Data Freshness",
-                False,
-                f"Stale data: {', '.join(stale_tables)}. All: {'; '.join(details)}",
-                critical=False,  # Warn but don't abort
-            )
+        watermarks = get_watermarks(refresh=True)
+    except Exception as e:
         return PreflightResult(
             "Data Freshness",
-            True,
-            f"All fresh: {'; '.join(details)}",
+            False,
+            f"Check failed: {e}",
+            critical=False,
         )
 
-    except Exception as e:
+    cutoff = (datetime.now() - timedelta(days=max_stale_days)).date()
+    today = datetime.now().date()
+    stale_tables = []
+    details = []
+    for table in WATERMARK_REGISTRY:
+        label = watermark_label(table)
+        if table not in watermarks:
+            # Table/view might not exist — non-critical
+            details.append(f"{label}: table not found")
+            continue
+        latest = watermarks[table]
+        if latest is None:
+            stale_tables.append(f"{label} (no data)")
+            continue
+        age_days = (today - latest).days
+        if latest < cutoff:
+            stale_tables.append(f"{label} ({age_days}d old)")
+        details.append(f"{label}: {latest.isoformat()} ({age_days}d)")
+
+    if stale_tables:
         return PreflightResult(
             "Data Freshness",
             False,
-            f"Check failed: {e}",
-            critical=False,
+            f"Stale data: {', '.join(stale_tables)}. All: {'; '.join(details)}",
+            critical=False,  # Warn but don't abort
         )
+    return PreflightResult(
+        "Data Freshness",
+        True,
+        f"All fresh ({len(details)} sources): {'; '.join(details)}",
+    )
+
 
+def check_email_config(lookup_recipients: bool = True) -> PreflightResult:
+    """Verify email configuration is present (not connectivity — that's slow).
 
-def check_email_config() -> PreflightResult:
-    """Verify email configuration is present (not connectivity — that's slow)."""
+    Args:
+        lookup_recipients: Resolve recipients through the email_recipients
+            table. False (SQL Server unreachable) checks .env EMAIL_TO only.
+    """
     missing = []
     if not SMTP_USERNAME:
         missing.append("SMTP_USERNAME")
@@ -227,7 +246,10 @@ def check_email_config() -> PreflightResult:
     if not EMAIL_FROM:
         missing.append("EMAIL_FROM")
 
-    recipients = get_email_recipients("daily_briefing")
+    if lookup_recipients:
+        recipients = get_email_recipients("daily_briefing")
+    else:
+        recipients = [addr.strip() for addr in EMAIL_TO.split(",") if addr.strip()]
     if not recipients:
         missing.append("EMAIL_TO / email_recipients table")
 
@@ -247,12 +269,27 @@ def check_email_config() -> PreflightResult:
 
 
 def check_template_exists() -> PreflightResult:
-    """Verify the Jinja2 email template file is present."""
-    template_path = os.path.join(
-        os.path.dirname(os.path.dirname(__file__)), "templates", "briefing_email.html"
-    )
+    """Verify the Jinja2 email template file is present and precompile it.
+
+    Compiling here (bytecode-cache hit on scheduled runs) means the render at
+    the end of the pipeline is a pure in-memory cache lookup.
+    """
+    from tools.template_service import TEMPLATES_DIR, precompile_templates
+
+    template_path = os.path.join(TEMPLATES_DIR, "briefing_email.html")
     if os.path.exists(template_path):
-        return PreflightResult("Email Template", True, "briefing_email.html found")
+        try:
+            timings = precompile_templates()
+        except Exception as e:
+            return PreflightResult(
+                "Email Template", False, f"briefing_email.html failed to compile: {e}",
+                critical=True,
+            )
+        return PreflightResult(
+            "Email Template",
+            True,
+            f"briefing_email.html found (compiled in {timings.get('briefing_email.html', 0):.1f}ms)",
+        )
     return PreflightResult(
         "Email Template",
         False,
@@ -261,25 +298,89 @@ def check_template_exists() -> PreflightResult:
     )
 
 
-def run_preflight_checks(verbose: bool = True) -> tuple[bool, list[PreflightResult]]:
-    """Run all pre-flight checks and return (all_critical_passed, results).
+# (display name, check, deadline in seconds from preflight start,
+#  critical if it times out, needs SQL)
+PREFLIGHT_CHECKS = [
+    ("Anthropic API Key", check_api_key, 5, True, False),
+    ("SQL Server", check_sql_connection, SQL_CONNECT_TIMEOUT + 5, True, False),
+    ("Data Freshness", check_data_freshness, SQL_CONNECT_TIMEOUT + 20, False, True),
+    ("Email Config", check_email_config, SQL_CONNECT_TIMEOUT + 10, False, True),
+    ("Email Template", check_template_exists, 15, True, False),
+]
+LIVE_API_CHECK = (ANTHROPIC_LIVE_CHECK, check_anthropic_live_result, 30, False, False)
+
+
+def _timed(check_fn):
+    start = time.perf_counter()
+    result = check_fn()
+    result.elapsed_sec = time.perf_counter() - start
+    return result
+
+
+def _after_sql(name, check_fn, sql_future, sql_deadline_at, sql_lock):
+    """Run a SQL-dependent check once the SQL check has warmed the pool.
+
+    The SQL-dependent checks take turns (their queries are quick) so they all
+    reuse the one warm pooled connection instead of each logging in. If the
+    SQL check fails or misses its deadline they don't touch the server at all:
+    freshness is skipped and the email check only looks at .env.
+    """
+    try:
+        sql_ok = sql_future.result(timeout=max(0.0, sql_deadline_at - time.monotonic())).passed
+    except Exception:
+        sql_ok = False
+    if not sql_ok:
+        if check_fn is check_email_config:
+            return _timed(lambda: check_email_config(lookup_recipients=False))
+        return PreflightResult(name, False, "Skipped — SQL Server unreachable", critical=False)
+    with sql_lock:
+        return _timed(check_fn)
+
+
+def run_preflight_checks(verbose: bool = True,
+                         live_api: bool = False) -> tuple[bool, list[PreflightResult]]:
+    """Run all pre-flight checks concurrently and return (all_critical_passed, results).
+
+    Args:
+        live_api: Also probe the Anthropic API (check_anthropic_live) in the
+            same concurrent batch; read the outcome with live_api_status().
 
     Returns:
         Tuple of (can_proceed: bool, results: list[PreflightResult])
-        can_proceed is False only if a CRITICAL check failed.
+        can_proceed is False only if a CRITICAL check failed or timed out.
     """
-    checks = [
-        check_api_key,
-        check_sql_connection,
-        check_data_freshness,
-        check_email_config,
-        check_template_exists,
-    ]
+    checks = PREFLIGHT_CHECKS + ([LIVE_API_CHECK] if live_api else [])
+
+    start = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=len(checks), thread_name_prefix="preflight")
+    futures = {}
+    sql_lock = threading.Lock()
+    sql_deadline_at = start + next(d for _, fn, d, _, _ in checks if fn is check_sql_connection)
+    sql_future = executor.submit(_timed, check_sql_connection)
+    for name, check_fn, _, _, needs_sql in checks:
+        if check_fn is check_sql_connection:
+            futures[name] = sql_future
+        elif needs_sql:
+            futures[name] = executor.submit(
+                _after_sql, name, check_fn, sql_future, sql_deadline_at, sql_lock
+            )
+        else:
+            futures[name] = executor.submit(_timed, check_fn)
 
     results = []
-    for check_fn in checks:
-        result = check_fn()
+    for name, _, deadline, critical, _ in checks:
+        remaining = max(0.0, start + deadline - time.monotonic())
+        try:
+            result = futures[name].result(timeout=remaining)
+        except FutureTimeout:
+            result = PreflightResult(name, False, f"Timed out after {deadline}s", critical=critical)
+            result.elapsed_sec = time.monotonic() - start
+        except Exception as e:
+            result = PreflightResult(name, False, f"Check raised: {e}", critical=critical)
         results.append(result)
+    # Don't wait on a check that blew its deadline — it finishes in the background.
+    executor.shutdown(wait=False, cancel_futures=True)
+    wall_sec = time.monotonic() - start
 
     critical_failures = [r for r in results if not r.passed and r.critical]
     warnings = [r for r in results if not r.passed and not r.critical]
@@ -290,7 +391,8 @@ def run_preflight_checks(verbose: bool = True) -> tuple[bool, list[PreflightResu
         print("PRE-FLIGHT CHECKS")
         print("=" * 60)
         for r in results:
-            print(f"  {r}")
+            print(f"  {r} ({r.elapsed_sec:.1f}s)")
+        print(f"\n  Completed in {wall_sec:.1f}s (checks run concurrently)")
         if warnings:
             print(f"\n  Warnings: {len(warnings)} (non-blocking)")
         if critical_failures:
@@ -0,0 +1,152 @@
+"""
+Process-wide cache of SQL query results, keyed by data watermark.
+
+A result is stored under (normalized SQL, query_watermark(sql)) — the latest
+date of every registry table the query reads (tools/watermarks.py). When new
+data lands the watermark moves, the key changes, and the next call re-runs
+the query; until then every caller in the process gets the stored rows. That
+is what lets one A2A host serve six agents (and the /data endpoint, and the
+crew) from a single copy.
+
+Queries that read none of the registry tables, or any table outside it
+(trade log, portfolio, alerts), have no watermark and are never cached. Entries also expire after RESULT_CACHE_TTL_SEC as an upper
+bound on staleness, and the cache holds at most RESULT_CACHE_MAX_ENTRIES
+results (least recently used evicted first).
+
+Concurrent misses on the same key run the query once; the other callers
+wait for that result.
+
+Usage:
+    from tools.result_cache import cached_query
+
+    columns, rows, hit = cached_query(sql)
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from config.settings import RESULT_CACHE_MAX_ENTRIES, RESULT_CACHE_TTL_SEC
+
+
+_READ_ONLY = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+
+
+def normalize_sql(sql: str) -> str:
+    return " ".join(sql.split())
+
+
+class ResultCache:
+    """LRU of {(sql, watermark): (columns, rows)} with single-flight misses."""
+
+    def __init__(self, max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+                 ttl_sec: float = RESULT_CACHE_TTL_SEC):
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self._entries: OrderedDict = OrderedDict()
+        self._inflight: dict = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+
+    def key_for(self, sql: str):
+        """Cache key for a query, or None if it has no watermark."""
+        from tools.watermarks import query_watermark
+
+        if not _READ_ONLY.match(sql):
+            return None
+        try:
+            watermark = query_watermark(sql)
+        except Exception:
+            return None  # watermarks unavailable: don't cache blind
+        if not watermark:
+            return None
+        return normalize_sql(sql), watermark
+
+    def fetch(self, sql: str, run) -> tuple[list[str], list[tuple], bool]:
+        """(columns, rows, hit). `run()` executes the query on a miss and
+        returns (columns, rows)."""
+        key = self.key_for(sql)
+        if key is None:
+            with self._lock:
+                self.uncacheable += 1
+            columns, rows = run()
+            return columns, rows, False
+
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and time.monotonic() - entry[0] <= self.ttl_sec:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1], entry[2], True
+                waiter = self._inflight.get(key)
+                if waiter is None:
+                    self._inflight[key] = threading.Event()
+                    self.misses += 1
+                    break
+            waiter.wait()  # someone else is running it; re-check afterwards
+
+        try:
+            columns, rows = run()
+            rows = [tuple(r) for r in rows]
+            with self._lock:
+                self._entries[key] = (time.monotonic(), columns, rows)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return columns, rows, False
+        finally:
+            with self._lock:
+                self._inflight.pop(key).set()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "uncacheable": self.uncacheable,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+            }
+
+
+_cache: ResultCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """Process-wide cache shared by every agent and endpoint in the process."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache()
+        return _cache
+
+
+def execute_query(sql: str) -> tuple[list[str], list[tuple]]:
+    """Run a query on a pooled connection (uncached). Returns (columns, rows)."""
+    from tools.db_pool import get_pool
+    from tools.tracing import span
+
+    with span("sql.query", category="sql", query=normalize_sql(sql)[:160]) as sql_span, \
+            get_pool().connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(sql)
+        columns = [desc[0] for desc in cursor.description]
+        rows = [tuple(r) for r in cursor.fetchall()]
+        cursor.close()
+        sql_span.set(rows=len(rows))
+    return columns, rows
+
+
+def cached_query(sql: str) -> tuple[list[str], list[tuple], bool]:
+    """(columns, rows, hit) through the process-wide result cache."""
+    return get_result_cache().fetch(sql, lambda: execute_query(sql))
@@ -0,0 +1,236 @@
+"""
+Append-only SQLite store for pipeline run records.
+
+The old run_history.json was rewritten in full on every save (load, append,
+truncate to 100, dump), and print_status_report parsed all of it again — two
+processes finishing together could interleave and corrupt it. Here each run
+is one INSERT in its own transaction (WAL mode, so readers never block the
+writer), the summary columns are indexed for date-range / status queries,
+and retention is by age (RUN_HISTORY_RETENTION_DAYS) rather than a fixed
+count of 100.
+
+The full record is kept as JSON in `record`; the columns next to it are just
+what the queries filter and aggregate on.
+
+An existing logs/run_history.json is imported once on first open and renamed
+to run_history.json.migrated (once in total, even when several processes
+open the store together).
+
+Usage:
+    store = get_run_store()
+    store.append(run_record)
+    store.query(since="2026-10-01", status="failed")
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from config.settings import RUN_HISTORY_RETENTION_DAYS
+
+_LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs")
+RUN_STORE_FILE = os.path.join(_LOG_DIR, "run_history.db")
+LEGACY_JSON_FILE = os.path.join(_LOG_DIR, "run_history.json")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id                 INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id             TEXT NOT NULL,
+    pipeline           TEXT NOT NULL DEFAULT 'daily_briefing',
+    started_at         TEXT NOT NULL,
+    finished_at        TEXT,
+    status             TEXT,
+    total_duration_sec REAL,
+    email_sent         INTEGER,
+    record             TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_runs_started ON runs (started_at);
+CREATE INDEX IF NOT EXISTS ix_runs_status_started ON runs (status, started_at);
+CREATE INDEX IF NOT EXISTS ix_runs_pipeline_started ON runs (pipeline, started_at);
+"""
+
+
+def _iso(value) -> str | None:
+    """Normalize a date/datetime/ISO string bound to an ISO string."""
+    if value is None:
+        return None
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+class RunStore:
+    """SQLite-backed run history (one row per run)."""
+
+    def __init__(self, path: str = RUN_STORE_FILE,
+                 retention_days: int = RUN_HISTORY_RETENTION_DAYS,
+                 legacy_json: str | None = LEGACY_JSON_FILE):
+        self.path = path
+        self.retention_days = retention_days
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+        if legacy_json and os.path.exists(legacy_json):
+            self.migrate_json(legacy_json)
+
+    @contextmanager
+    def _connect(self):
+        """One short-lived connection per operation, committed and closed on
+        exit — safe across threads and processes; the busy timeout lets
+        concurrent writers queue instead of failing."""
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            with conn:  # transaction: commit, or roll back on error
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row_values(record: dict, pipeline: str) -> tuple:
+        return (
+            str(record.get("run_id") or datetime.now().strftime("%Y%m%d_%H%M%S")),
+            record.get("pipeline") or pipeline,
+            _iso(record.get("started_at")) or datetime.now().isoformat(),
+            _iso(record.get("finished_at")),
+            record.get("status"),
+            record.get("total_duration_sec"),
+            int(bool(record.get("email_sent"))),
+            json.dumps(record, default=str),
+        )
+
+    def append(self, record: dict, pipeline: str = "daily_briefing") -> int:
+        """Insert one run record atomically and apply age retention.
+
+        Returns:
+            The row id of the new record.
+        """
+        with self._connect() as conn:
+            cur = conn.execute(
+                "INSERT INTO runs (run_id, pipeline, started_at, finished_at, status, "
+                "total_duration_sec, email_sent, record) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                self._row_values(record, pipeline),
+            )
+            row_id = cur.lastrowid
+            if self.retention_days:
+                conn.execute("DELETE FROM runs WHERE started_at < ?", (self._cutoff(),))
+        return row_id
+
+    def _cutoff(self, days: int | None = None) -> str:
+        days = self.retention_days if days is None else days
+        return (datetime.now() - timedelta(days=days)).isoformat()
+
+    def query(self, since=None, until=None, status: str | list[str] | None = None,
+              pipeline: str | None = None, limit: int | None = None,
+              newest_first: bool = False) -> list[dict]:
+        """Run records filtered by started_at range [since, until), status and
+        pipeline. With a limit, the most recent `limit` matches are returned
+        (still ordered oldest-first unless newest_first)."""
+        where, params = [], []
+        if since is not None:
+            where.append("started_at >= ?")
+            params.append(_iso(since))
+        if until is not None:
+            where.append("started_at < ?")
+            params.append(_iso(until))
+        if status is not None:
+            statuses = [status] if isinstance(status, str) else list(status)
+            where.append(f"status IN ({', '.join('?' * len(statuses))})")
+            params.extend(statuses)
+        if pipeline is not None:
+            where.append("pipeline = ?")
+            params.append(pipeline)
+        sql = "SELECT record FROM runs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY started_at DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._connect() as conn:
+            rows = [json.loads(r["record"]) for r in conn.execute(sql, params)]
+        return rows if newest_first else rows[::-1]
+
+    def last(self, n: int = 10, pipeline: str | None = None) -> list[dict]:
+        """The most recent n runs, oldest first."""
+        return self.query(pipeline=pipeline, limit=n)
+
+    def status_counts(self, since=None, pipeline: str | None = None) -> dict[str, int]:
+        """{status: run count}, aggregated in SQL."""
+        where, params = [], []
+        if since is not None:
+            where.append("started_at >= ?")
+            params.append(_iso(since))
+        if pipeline is not None:
+            where.append("pipeline = ?")
+            params.append(pipeline)
+        sql = "SELECT status, COUNT(*) AS n FROM runs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " GROUP BY status"
+        with self._connect() as conn:
+            return {r["status"]: r["n"] for r in conn.execute(sql, params)}
+
+    def prune(self, older_than_days: int | None = None) -> int:
+        """Delete runs that started more than older_than_days ago. Returns count."""
+        with self._connect() as conn:
+            cur = conn.execute("DELETE FROM runs WHERE started_at < ?",
+                               (self._cutoff(older_than_days),))
+            return cur.rowcount
+
+    def migrate_json(self, json_path: str) -> int:
+        """Import a legacy run_history.json (skipping runs already present),
+        then rename it to *.migrated. Returns the number imported.
+
+        Safe when several processes open the store at once: the import runs
+        under one write lock (BEGIN IMMEDIATE), and whoever gets it second
+        finds the file already renamed and imports nothing."""
+        imported = 0
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                with open(json_path, "r", encoding="utf-8") as f:
+                    history = json.load(f)
+            except FileNotFoundError:
+                return 0  # another process migrated it
+            except (OSError, json.JSONDecodeError):
+                history = []
+            existing = {
+                (r["run_id"], r["started_at"])
+                for r in conn.execute("SELECT run_id, started_at FROM runs")
+            }
+            for record in history if isinstance(history, list) else []:
+                values = self._row_values(record, "daily_briefing")
+                if (values[0], values[2]) in existing:
+                    continue
+                conn.execute(
+                    "INSERT INTO runs (run_id, pipeline, started_at, finished_at, status, "
+                    "total_duration_sec, email_sent, record) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    values,
+                )
+                imported += 1
+            # Renamed before the commit releases the lock, so no one else
+            # can read the file after these rows are in
+            try:
+                os.replace(json_path, json_path + ".migrated")
+            except FileNotFoundError:
+                pass
+        return imported
+
+
+_store: RunStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_run_store() -> RunStore:
+    """Process-wide store at logs/run_history.db (migrates the legacy JSON once)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = RunStore()
+        return _store
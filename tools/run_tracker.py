@@ -1,16 +1,32 @@
 """
 Structured logging for the Daily Briefing pipeline.
 Provides per-agent timing, success/failure tracking, and a persistent
-JSON run history for post-mortem analysis and the --status CLI flag.
+run history (SQLite, see tools/run_store.py) for post-mortem analysis and
+the --status CLI flag.
 """
 
+import atexit
+import glob
+import gzip
 import json
 import logging
+import logging.handlers
 import os
+import queue
+import shutil
 import sys
-from datetime import datetime
+import threading
+from datetime import date, datetime
 from typing import Optional
 
+from config.settings import (
+    LLM_MODEL,
+    LOG_BACKUP_COUNT,
+    LOG_FORMAT,
+    LOG_MAX_BYTES,
+    PERF_BASELINE_RUNS,
+)
+
 
 # ---------------------------------------------------------------------------
 # Module-level logger setup
@@ -19,15 +35,66 @@ from typing import Optional
 _LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
 os.makedirs(_LOG_DIR, exist_ok=True)
 
-# JSON run-history file (appended after each run)
+# Legacy JSON run history — migrated into the SQLite run store on first use
 RUN_HISTORY_FILE = os.path.join(_LOG_DIR, "run_history.json")
 
+# Started by setup_logging(); owns the real (blocking) handlers.
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line (LOG_FORMAT=json)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def _gzip_file(source: str, dest: str) -> None:
+    with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+def compress_old_logs(log_dir: Optional[str] = None) -> int:
+    """Gzip briefing_YYYYMMDD.log/.jsonl files from previous days. Returns count."""
+    log_dir = log_dir or _LOG_DIR
+    today = date.today().strftime("%Y%m%d")
+    compressed = 0
+    for path in glob.glob(os.path.join(log_dir, "briefing_*.log*")) + \
+            glob.glob(os.path.join(log_dir, "briefing_*.jsonl*")):
+        if path.endswith(".gz"):
+            continue
+        day = os.path.basename(path)[len("briefing_"):][:8]
+        if not day.isdigit() or day >= today:
+            continue
+        try:
+            _gzip_file(path, path + ".gz")
+            compressed += 1
+        except OSError:
+            pass  # still open by another process — next run picks it up
+    return compressed
+
 
 def setup_logging(log_level: int = logging.INFO) -> logging.Logger:
     """Configure and return the root pipeline logger.
 
-    Logs to both console (INFO+) and a timestamped file (DEBUG+).
+    Logs to both console (INFO+) and a per-day file (DEBUG+). The logger
+    itself only has a QueueHandler: callers (agent threads included) enqueue
+    the record and return, and a QueueListener thread does the console and
+    file I/O. The file rotates by size (LOG_MAX_BYTES, LOG_BACKUP_COUNT
+    gzipped backups); files from previous days are gzipped in the background.
+    LOG_FORMAT=json writes the file as JSON lines instead of text.
     """
+    global _listener
     logger = logging.getLogger("stockdata_agenticai")
     if logger.handlers:
         return logger  # already configured
@@ -42,19 +109,41 @@ def setup_logging(log_level: int = logging.INFO) -> logging.Logger:
     console = logging.StreamHandler(sys.stdout)
     console.setLevel(log_level)
     console.setFormatter(formatter)
-    logger.addHandler(console)
 
-    # File handler — one per day
+    # File handler — one per day, size-rotated with gzipped backups
     today_str = datetime.now().strftime("%Y%m%d")
-    log_file = os.path.join(_LOG_DIR, f"briefing_{today_str}.log")
-    file_h = logging.FileHandler(log_file, encoding="utf-8")
+    json_logs = LOG_FORMAT == "json"
+    log_file = os.path.join(_LOG_DIR, f"briefing_{today_str}.{'jsonl' if json_logs else 'log'}")
+    file_h = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8",
+    )
+    file_h.namer = lambda name: name + ".gz"
+    file_h.rotator = _gzip_file
     file_h.setLevel(logging.DEBUG)
-    file_h.setFormatter(formatter)
-    logger.addHandler(file_h)
+    file_h.setFormatter(JsonFormatter() if json_logs else formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()  # unbounded: put() never blocks
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(
+        log_queue, console, file_h, respect_handler_level=True,
+    )
+    _listener.start()
+    atexit.register(stop_logging)
 
+    threading.Thread(target=compress_old_logs, name="log-compress", daemon=True).start()
     return logger
 
 
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread (idempotent)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
 # ---------------------------------------------------------------------------
 # Run record dataclass (dict-based for JSON serialization)
 # ---------------------------------------------------------------------------
@@ -75,6 +164,9 @@ def _new_run_record() -> dict:
         "preflight_passed": None,
         "preflight_warnings": [],
         "agent_details": {},
+        "stage_durations": {},  # preflight | agents | compile_send -> seconds
+        "llm_model": LLM_MODEL,
+        "perf_regressions": [],
         "error": None,
     }
 
@@ -96,38 +188,48 @@ def _new_agent_record(agent_name: str) -> dict:
 # Persistent run history
 # ---------------------------------------------------------------------------
 
-def save_run_record(record: dict) -> None:
-    """Append a run record to the JSON run-history file."""
-    history = load_run_history()
-    history.append(record)
+def save_run_record(record: dict, pipeline: str = "daily_briefing") -> None:
+    """Append a run record to the run store (one atomic INSERT)."""
+    from tools.run_store import get_run_store
 
-    # Keep last 100 runs to avoid unbounded growth
-    if len(history) > 100:
-        history = history[-100:]
+    get_run_store().append(record, pipeline=pipeline)
 
-    with open(RUN_HISTORY_FILE, "w", encoding="utf-8") as f:
-        json.dump(history, f, indent=2, default=str)
 
+def load_run_history(last_n: Optional[int] = None, since=None, until=None,
+                     status=None, pipeline: Optional[str] = None) -> list[dict]:
+    """Load run records, oldest first, optionally filtered by date range/status."""
+    from tools.run_store import get_run_store
 
-def load_run_history() -> list[dict]:
-    """Load run history from disk."""
-    if not os.path.exists(RUN_HISTORY_FILE):
-        return []
     try:
-        with open(RUN_HISTORY_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, Exception):
+        return get_run_store().query(
+            since=since, until=until, status=status, pipeline=pipeline, limit=last_n,
+        )
+    except Exception:
         return []
 
 
+def flag_regressions(record: dict, pipeline: str = "daily_briefing") -> list[dict]:
+    """Compare a finished run with its recent history and store the flagged
+    metrics in record["perf_regressions"] (see tools/perf_regression.py)."""
+    from tools.perf_regression import detect_regressions
+
+    history = load_run_history(last_n=PERF_BASELINE_RUNS * 3, pipeline=pipeline)
+    record["perf_regressions"] = detect_regressions(record, history)
+    return record["perf_regressions"]
+
+
 def print_status_report(last_n: int = 10) -> None:
     """Print a human-readable status report of last N runs."""
-    history = load_run_history()
-    if not history:
+    from tools.perf_regression import detect_regressions, format_regression, rolling_percentiles
+    from tools.run_store import get_run_store
+
+    # Extra history so the oldest displayed run still has a full baseline
+    history = load_run_history(last_n=last_n + PERF_BASELINE_RUNS * 3)
+    runs = history[-last_n:]
+    if not runs:
         print("No run history found.")
         return
 
-    runs = history[-last_n:]
     print("\n" + "=" * 80)
     print(f"PIPELINE STATUS — Last {len(runs)} Run(s)")
     print("=" * 80)
@@ -164,13 +266,35 @@ def print_status_report(last_n: int = 10) -> None:
             for w in warnings:
                 print(f"      WARNING: {w}")
 
+        # Slow runs (recomputed, so older records without the field are covered)
+        for flag in detect_regressions(run, history):
+            print(f"      SLOW: {format_regression(flag)}")
+
     # Summary
-    total = len(history)
-    successes = sum(1 for r in history if r.get("status") == "success")
-    partials = sum(1 for r in history if r.get("status") == "partial")
-    failures = sum(1 for r in history if r.get("status") == "failed")
+    counts = get_run_store().status_counts()
+    total = sum(counts.values())
+    successes = counts.get("success", 0)
+    partials = counts.get("partial", 0)
+    failures = counts.get("failed", 0)
     rate = (successes / total * 100) if total else 0
 
-    print(f"\n  --- All-Time ({total} runs) ---")
+    print(f"\n  --- Retained History ({total} runs) ---")
     print(f"  Success: {successes} ({rate:.0f}%)  |  Partial: {partials}  |  Failed: {failures}")
+
+    # Rolling duration percentiles for full LLM runs
+    percentiles = rolling_percentiles(history)
+    if percentiles:
+        n = max(p["n"] for p in percentiles.values())
+        print(f"\n  --- Durations, last {n} LLM run(s) ---")
+        print(f"  {'Metric':<28} {'p50':>8} {'p95':>8}")
+        for metric in sorted(percentiles, key=lambda m: (m != "total", not m.startswith("stage:"), m)):
+            p = percentiles[metric]
+            print(f"  {metric:<28} {p['p50']:>7.0f}s {p['p95']:>7.0f}s")
+
+    models = [r.get("llm_model") for r in runs if r.get("llm_model")]
+    if len(set(models)) > 1:
+        changes = [
+            f"{a} -> {b}" for a, b in zip(models, models[1:]) if a != b
+        ]
+        print(f"\n  LLM_MODEL changed in this window: {', '.join(changes)}")
     print("=" * 80)
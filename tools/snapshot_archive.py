@@ -0,0 +1,154 @@
+"""
+Local columnar archive of weekly screening snapshots.
+
+The screening views (vw_fair_value_estimates, vw_growth_stocks_screen, ...)
+are expensive window-function views and only expose what the upstream tables
+still hold. Each weekly run of weekly_screening_report.py persists the latest
+snapshot per market and view as a zstd-compressed Parquet file:
+
+    <SCREENING_ARCHIVE_DIR>/<market>/<view_key>/<fetch_date>.parquet
+
+so the prior week (and 4/12/52-week history for score momentum) is read from
+disk, column-pruned to just ticker + score, instead of re-running the view.
+
+A fresh snapshot is written chunk by chunk as it streams from SQL
+(`SnapshotArchive.writer`, one Parquet row group per chunk), so archiving
+doesn't hold the whole snapshot in memory.
+
+pyarrow is needed for Parquet I/O. Without it the archive reports itself as
+unavailable and the report falls back to reading everything from SQL.
+"""
+
+import datetime
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    _HAS_PYARROW = True
+except ImportError:
+    _HAS_PYARROW = False
+
+PARQUET_COMPRESSION = "zstd"
+
+
+def _date_key(value) -> str:
+    """'YYYY-MM-DD' for a date, datetime or date-like string."""
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.strftime("%Y-%m-%d")
+    return str(value)[:10]
+
+
+class SnapshotWriter:
+    """Incremental writer for one snapshot: append() DataFrame chunks, then
+    close() to publish the file, or abort() to discard it.
+
+    The schema comes from the first chunk (all-null columns as strings); later
+    chunks are cast to it. Writes go to a .tmp file renamed on close(), so a
+    failed or interrupted run never leaves half a snapshot behind.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._tmp = f"{path}.tmp"
+        self._writer = None
+        self._schema = None
+        self.rows = 0
+
+    def append(self, df: pd.DataFrame) -> None:
+        if self._writer is None:
+            schema = pa.Schema.from_pandas(df, preserve_index=False)
+            for i, field in enumerate(schema):
+                if pa.types.is_null(field.type):
+                    schema = schema.set(i, field.with_type(pa.string()))
+            self._schema = schema
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._writer = pq.ParquetWriter(self._tmp, schema, compression=PARQUET_COMPRESSION)
+        table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+        self._writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self) -> str | None:
+        """Publish the snapshot. Returns its path, or None if nothing was appended."""
+        if self._writer is None:
+            return None
+        self._writer.close()
+        self._writer = None
+        os.replace(self._tmp, self.path)
+        return self.path
+
+    def abort(self) -> None:
+        if self._writer is not None:
+            try:
+                self._writer.close()
+            finally:
+                self._writer = None
+        try:
+            os.remove(self._tmp)
+        except FileNotFoundError:
+            pass
+
+
+class SnapshotArchive:
+    """Parquet-per-snapshot store keyed by (market, view_key, fetch_date)."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    @property
+    def available(self) -> bool:
+        return bool(self.root) and _HAS_PYARROW
+
+    def _dir(self, market: str, view_key: str) -> str:
+        return os.path.join(self.root, market.lower(), view_key)
+
+    def path(self, market: str, view_key: str, fetch_date) -> str:
+        return os.path.join(self._dir(market, view_key), f"{_date_key(fetch_date)}.parquet")
+
+    def has(self, market: str, view_key: str, fetch_date) -> bool:
+        return self.available and os.path.exists(self.path(market, view_key, fetch_date))
+
+    def dates(self, market: str, view_key: str) -> list[datetime.date]:
+        """Archived fetch_dates for this market+view, oldest first."""
+        d = self._dir(market, view_key)
+        if not os.path.isdir(d):
+            return []
+        out = []
+        for name in os.listdir(d):
+            if name.endswith(".parquet"):
+                try:
+                    out.append(datetime.date.fromisoformat(name[:-len(".parquet")]))
+                except ValueError:
+                    continue
+        return sorted(out)
+
+    def write(self, market: str, view_key: str, fetch_date, df: pd.DataFrame) -> str:
+        """Persist one snapshot (atomically — a crash never leaves half a file)."""
+        path = self.path(market, view_key, fetch_date)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        df.to_parquet(tmp, index=False, compression=PARQUET_COMPRESSION)
+        os.replace(tmp, path)
+        return path
+
+    def writer(self, market: str, view_key: str, fetch_date) -> SnapshotWriter:
+        """Incremental alternative to write() for a snapshot streamed in chunks."""
+        return SnapshotWriter(self.path(market, view_key, fetch_date))
+
+    def read(self, market: str, view_key: str, fetch_date, columns=None) -> pd.DataFrame:
+        """Load one snapshot, optionally only the given columns."""
+        return pd.read_parquet(self.path(market, view_key, fetch_date), columns=columns)
+
+    def nearest(self, market: str, view_key: str, target, tolerance_days: int = 3):
+        """Archived date closest to `target` within +/- tolerance_days, or None.
+        Snapshots are weekly but the fetch day can drift by a day or two."""
+        target = datetime.date.fromisoformat(_date_key(target))
+        candidates = [
+            d for d in self.dates(market, view_key)
+            if abs((d - target).days) <= tolerance_days
+        ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda d: abs((d - target).days))
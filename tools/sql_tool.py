@@ -1,7 +1,9 @@
 """
 SQL Server query tool for CrewAI agents.
 Provides a reusable tool that any agent can use to execute SQL queries
-against the local SQL Server database via pyodbc.
+against the local SQL Server database via pyodbc. Connections come from the
+shared pool (tools/db_pool.py) that preflight has already warmed, and results
+go through the watermark-keyed result cache (tools/result_cache.py).
 """
 
 import pyodbc
@@ -10,7 +12,7 @@ from pydantic import Field
 from typing import Type
 from pydantic import BaseModel
 
-from config.settings import get_sql_connection_string
+from tools.result_cache import cached_query
 
 
 class SQLQueryInput(BaseModel):
@@ -35,18 +37,9 @@ class SQLQueryTool(BaseTool):
     def _run(self, query: str) -> str:
         """Execute the SQL query and return formatted results."""
         try:
-            conn_str = get_sql_connection_string()
-            conn = pyodbc.connect(conn_str)
-            cursor = conn.cursor()
-            cursor.execute(query)
-
-            # Get column names
-            columns = [desc[0] for desc in cursor.description]
-
-            # Fetch all rows
-            rows = cursor.fetchall()
-            cursor.close()
-            conn.close()
+            # Shared, watermark-keyed cache: repeat queries over unchanged
+            # data (other agents, other A2A callers) skip SQL Server entirely.
+            columns, rows, _hit = cached_query(query)
 
             if not rows:
                 return "Query returned no results."
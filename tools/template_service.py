@@ -0,0 +1,135 @@
+"""
+Shared Jinja2 template service for every HTML renderer.
+
+The daily briefing and each standalone report (ml/forex bucket + tomorrow)
+used to build a fresh Jinja `Environment` and reparse their template on every
+render. This module holds ONE module-level Environment for the whole process:
+
+  - in-process: compiled templates are kept in the Environment's own cache, so
+    a second render of the same template is a dictionary lookup
+  - across processes: a FileSystemBytecodeCache on disk (TEMPLATE_CACHE_DIR)
+    stores the compiled bytecode, so a cold scheduled run skips the Jinja
+    parser/compiler entirely unless the .html source changed
+
+Load/compile time per template is recorded and can be logged by the caller
+(see format_template_timings).
+
+briefing_email.html is rendered WITHOUT autoescape — its sections are
+pre-rendered HTML fragments (agent markdown -> HTML, fallback tables). Every
+other template keeps the select_autoescape(["html"]) behaviour the report
+scripts always had.
+
+Usage:
+    py -3.12 -m tools.template_service      # precompile all templates (warm cache)
+"""
+
+import os
+import time
+
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    select_autoescape,
+)
+
+from config.settings import TEMPLATE_CACHE_DIR
+from tools.tracing import span
+
+TEMPLATES_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates"
+)
+
+# Templates whose variables are already HTML and must not be escaped.
+_RAW_HTML_TEMPLATES = {"briefing_email.html"}
+
+_html_autoescape = select_autoescape(["html"])
+
+
+def _autoescape(template_name):
+    if template_name in _RAW_HTML_TEMPLATES:
+        return False
+    return _html_autoescape(template_name)
+
+
+def _build_environment() -> Environment:
+    bytecode_cache = None
+    try:
+        os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)
+    except OSError:
+        pass  # Read-only checkout — fall back to the in-process cache only
+    return Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        autoescape=_autoescape,
+        bytecode_cache=bytecode_cache,
+    )
+
+
+_ENV = _build_environment()
+
+# template name -> {"load_ms": float, "render_ms": float | None}
+_TIMINGS: dict[str, dict] = {}
+
+
+def get_template(name: str):
+    """Return the compiled template, recording how long the first load took.
+
+    The first call per process is either a bytecode-cache hit (fast) or a full
+    parse + compile (slow, then written to the cache). Later calls are served
+    from the Environment's in-memory cache.
+    """
+    start = time.perf_counter()
+    template = _ENV.get_template(name)
+    if name not in _TIMINGS:
+        _TIMINGS[name] = {
+            "load_ms": round((time.perf_counter() - start) * 1000, 2),
+            "render_ms": None,
+        }
+    return template
+
+
+def render_template(name: str, **context) -> str:
+    """Render a template by name with the shared Environment."""
+    template = get_template(name)
+    start = time.perf_counter()
+    with span("template.render", category="template", template=name):
+        html = template.render(**context)
+    _TIMINGS[name]["render_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return html
+
+
+def precompile_templates() -> dict[str, float]:
+    """Load every template under templates/ so later renders are cache lookups.
+
+    Returns:
+        Dict of template name -> load/compile time in milliseconds.
+    """
+    for name in _ENV.list_templates(extensions=["html"]):
+        get_template(name)
+    return {name: t["load_ms"] for name, t in _TIMINGS.items()}
+
+
+def template_timings() -> dict[str, dict]:
+    """Copy of the recorded per-template load/render timings."""
+    return {name: dict(t) for name, t in _TIMINGS.items()}
+
+
+def format_template_timings(name: str | None = None) -> str:
+    """One-line summary of template timings, e.g. for a log line."""
+    names = [name] if name else sorted(_TIMINGS)
+    parts = []
+    for n in names:
+        t = _TIMINGS.get(n)
+        if not t:
+            continue
+        render = f"{t['render_ms']}ms" if t["render_ms"] is not None else "-"
+        parts.append(f"{n} load={t['load_ms']}ms render={render}")
+    return "; ".join(parts) if parts else "no templates loaded"
+
+
+if __name__ == "__main__":
+    timings = precompile_templates()
+    print(f"Precompiled {len(timings)} template(s) into {TEMPLATE_CACHE_DIR}:")
+    for tname, ms in sorted(timings.items()):
+        print(f"  {tname:35s} {ms:8.2f} ms")
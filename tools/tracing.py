@@ -0,0 +1,395 @@
+"""
+Lightweight span tracing with a local HTML timeline — no collector needed.
+
+Per-agent `duration_sec` can't say whether an agent's 90s went to Claude,
+to SQL, to CrewAI's own orchestration or to a rate-limit sleep. Spans can:
+
+    with span("sql", category="sql", query=sql[:120]):
+        ...
+
+Spans nest through a context variable. Spans opened on other threads (the
+outbox sender, pooled workers) attach to the trace's root span. When no trace
+is active, `span()` is a near no-op, so library code can be instrumented
+unconditionally.
+
+A run is wrapped with `trace_run("daily_briefing")` (decorator) or
+`start_trace()` / `end_trace()`. On end, the spans are written to
+    logs/traces/<trace_id>.jsonl     one JSON span per line
+    logs/traces/<trace_id>.html      self-contained timeline (inline CSS)
+
+A span listener (`listen_spans`) sees every span opened in its context, with
+or without an active trace — the A2A streaming endpoint uses it to report
+SQL/LLM progress while an agent runs.
+
+Categories used across the pipeline: run, agent, crewai, llm, sql,
+template, smtp, sleep, preflight.
+
+Re-render a timeline from its JSONL:
+    py -3.12 -m tools.tracing logs/traces/20261018_063000.jsonl
+"""
+
+import contextvars
+import functools
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from config.settings import TRACING_ENABLED
+
+TRACE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs", "traces")
+
+CATEGORY_COLORS = {
+    "run": "#34495e",
+    "agent": "#2980b9",
+    "crewai": "#8e44ad",
+    "llm": "#e67e22",
+    "sql": "#27ae60",
+    "template": "#16a085",
+    "smtp": "#c0392b",
+    "sleep": "#bdc3c7",
+    "preflight": "#7f8c8d",
+}
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+_span_listener: contextvars.ContextVar = contextvars.ContextVar("span_listener", default=None)
+_active_trace = None
+_trace_lock = threading.Lock()
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "category", "attrs",
+                 "start", "end", "thread", "error")
+
+    def __init__(self, trace, span_id, parent_id, name, category, attrs):
+        self.trace = trace
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.category = category
+        self.attrs = attrs
+        self.start = time.time()
+        self.end = None
+        self.thread = threading.current_thread().name
+        self.error = None
+
+    def set(self, **attrs) -> None:
+        """Attach attributes discovered while the span is open (row counts, ...)."""
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "category": self.category,
+            "start": self.start,
+            "end": self.end,
+            "duration_ms": round(((self.end or time.time()) - self.start) * 1000, 2),
+            "thread": self.thread,
+            "error": self.error,
+            "attrs": self.attrs,
+        }
+
+
+class _NoopSpan:
+    def set(self, **attrs) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class _AttrSpan:
+    """Stand-in span when only a listener is watching: keeps set() attrs."""
+    __slots__ = ("attrs",)
+
+    def __init__(self, attrs: dict):
+        self.attrs = attrs
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+
+class Trace:
+    """Collects the spans of one run."""
+
+    def __init__(self, trace_id: str, name: str):
+        self.trace_id = trace_id
+        self.name = name
+        self.spans: list[Span] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.root: Span | None = None
+
+    def new_span(self, name, category, parent_id, attrs) -> Span:
+        with self._lock:
+            s = Span(self, next(self._ids), parent_id, name, category, attrs)
+            self.spans.append(s)
+            return s
+
+    @property
+    def jsonl_path(self) -> str:
+        return os.path.join(TRACE_DIR, f"{self.trace_id}.jsonl")
+
+    @property
+    def html_path(self) -> str:
+        return os.path.join(TRACE_DIR, f"{self.trace_id}.html")
+
+
+def current_trace() -> Trace | None:
+    return _active_trace
+
+
+@contextmanager
+def listen_spans(callback):
+    """Call `callback(phase, name, category, attrs, duration_sec, error)` for
+    every span opened in this context; phase is "start" or "end" (duration
+    and error are None on start). Nested listeners all see the span.
+    Listener errors are swallowed."""
+    outer = _span_listener.get()
+    if outer is not None:
+        inner = callback
+
+        def callback(*event):
+            _notify(outer, *event)
+            inner(*event)
+
+    token = _span_listener.set(callback)
+    try:
+        yield
+    finally:
+        _span_listener.reset(token)
+
+
+def _notify(listener, *event) -> None:
+    try:
+        listener(*event)
+    except Exception:
+        pass
+
+
+@contextmanager
+def span(name: str, category: str = "other", **attrs):
+    """Time a block as a child of the current span (no-op without a trace)."""
+    listener = _span_listener.get()
+    if listener is None:
+        with _span(name, category, attrs) as s:
+            yield s
+        return
+    _notify(listener, "start", name, category, attrs, None, None)
+    started = time.perf_counter()
+    error = None
+    try:
+        with _span(name, category, attrs) as s:
+            yield _AttrSpan(attrs) if s is _NOOP else s
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"[:300]
+        raise
+    finally:
+        _notify(listener, "end", name, category, attrs, time.perf_counter() - started, error)
+
+
+@contextmanager
+def _span(name: str, category: str, attrs: dict):
+    trace = _active_trace
+    if trace is None:
+        yield _NOOP
+        return
+    parent = _current_span.get()
+    if parent is None or parent.trace is not trace:
+        parent = trace.root
+    s = trace.new_span(name, category, parent.span_id if parent else None, attrs)
+    token = _current_span.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.error = f"{type(e).__name__}: {e}"[:300]
+        raise
+    finally:
+        s.end = time.time()
+        _current_span.reset(token)
+
+
+def traced(name: str | None = None, category: str = "other"):
+    """Decorator form of span()."""
+    def wrap(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with span(label, category):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def start_trace(name: str, trace_id: str | None = None) -> Trace | None:
+    """Begin a trace (and its root span) for this process. Returns None when
+    tracing is disabled or another trace is already active."""
+    global _active_trace
+    if not TRACING_ENABLED:
+        return None
+    with _trace_lock:
+        if _active_trace is not None:
+            return None
+        trace = Trace(trace_id or datetime.now().strftime("%Y%m%d_%H%M%S"), name)
+        trace.root = trace.new_span(name, "run", None, {})
+        _current_span.set(trace.root)
+        _active_trace = trace
+        return trace
+
+
+def end_trace(trace: Trace | None) -> str | None:
+    """Close the trace, export JSONL + HTML, and return the HTML path."""
+    global _active_trace
+    if trace is None:
+        return None
+    with _trace_lock:
+        if _active_trace is trace:
+            _active_trace = None
+    trace.root.end = time.time()
+    _current_span.set(None)
+    try:
+        return export_trace(trace)
+    except Exception as e:
+        print(f"[tracing] export failed: {e}", file=sys.stderr)
+        return None
+
+
+def trace_run(name: str):
+    """Decorator: run the function inside its own trace and export it after."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            trace = start_trace(name)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                end_trace(trace)
+        return inner
+    return wrap
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+def export_trace(trace: Trace) -> str:
+    os.makedirs(TRACE_DIR, exist_ok=True)
+    spans = [s.to_dict() for s in trace.spans]
+    with open(trace.jsonl_path, "w", encoding="utf-8") as f:
+        for s in spans:
+            f.write(json.dumps(s, default=str) + "\n")
+    return render_timeline(spans, trace.html_path, title=f"{trace.name} — {trace.trace_id}")
+
+
+def load_spans(jsonl_path: str) -> list[dict]:
+    with open(jsonl_path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _depths(spans: list[dict]) -> dict:
+    parents = {s["span_id"]: s["parent_id"] for s in spans}
+    depths = {}
+    for sid in parents:
+        d, p = 0, parents[sid]
+        while p is not None and d < 50:
+            d, p = d + 1, parents.get(p)
+        depths[sid] = d
+    return depths
+
+
+def breakdown(spans: list[dict], category: str = "agent") -> list[dict]:
+    """Per-span time split for every span of `category`: how much of it was
+    spent in descendant llm / sql / sleep spans, and the remainder."""
+    children: dict = {}
+    for s in spans:
+        children.setdefault(s["parent_id"], []).append(s)
+
+    def leaf_totals(sid, acc):
+        for c in children.get(sid, []):
+            if c["category"] in ("llm", "sql", "sleep"):
+                acc[c["category"]] += c["duration_ms"]
+            else:
+                leaf_totals(c["span_id"], acc)
+        return acc
+
+    rows = []
+    for s in spans:
+        if s["category"] != category:
+            continue
+        acc = leaf_totals(s["span_id"], {"llm": 0.0, "sql": 0.0, "sleep": 0.0})
+        other = max(0.0, s["duration_ms"] - sum(acc.values()))
+        rows.append({"name": s["name"], "total_ms": s["duration_ms"], **acc, "other": other})
+    return rows
+
+
+def render_timeline(spans: list[dict], out_path: str, title: str = "Trace") -> str:
+    """Write a self-contained HTML timeline for a list of span dicts."""
+    from tools.template_service import render_template
+
+    if not spans:
+        t0, t1 = 0.0, 1.0
+    else:
+        t0 = min(s["start"] for s in spans)
+        t1 = max((s["end"] or s["start"]) for s in spans)
+    total = max(t1 - t0, 1e-6)
+    depths = _depths(spans)
+
+    rows = []
+    for s in sorted(spans, key=lambda s: (s["start"], s["span_id"])):
+        end = s["end"] or s["start"]
+        attrs = ", ".join(f"{k}={v}" for k, v in (s.get("attrs") or {}).items())
+        rows.append({
+            "name": s["name"],
+            "category": s["category"],
+            "indent": depths.get(s["span_id"], 0) * 14,
+            "left": (s["start"] - t0) / total * 100,
+            "width": max((end - s["start"]) / total * 100, 0.15),
+            "duration_ms": s["duration_ms"],
+            "offset_ms": (s["start"] - t0) * 1000,
+            "color": CATEGORY_COLORS.get(s["category"], "#95a5a6"),
+            "thread": s.get("thread", ""),
+            "error": s.get("error"),
+            "attrs": attrs,
+        })
+
+    by_category: dict = {}
+    for s in spans:
+        if s["category"] != "run":
+            by_category[s["category"]] = by_category.get(s["category"], 0.0) + s["duration_ms"]
+
+    html = render_template(
+        "trace_timeline.html",
+        title=title,
+        total_ms=total * 1000,
+        started=datetime.fromtimestamp(t0).strftime("%Y-%m-%d %H:%M:%S") if spans else "",
+        rows=rows,
+        span_count=len(spans),
+        categories=sorted(by_category.items(), key=lambda kv: -kv[1]),
+        colors=CATEGORY_COLORS,
+        agents=breakdown(spans, "agent"),
+    )
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        f.write(html)
+    return out_path
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: py -3.12 -m tools.tracing <trace.jsonl>")
+        sys.exit(2)
+    src = sys.argv[1]
+    out = render_timeline(load_spans(src), os.path.splitext(src)[0] + ".html",
+                          title=os.path.basename(src))
+    print(f"Timeline written to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Data watermarks: the latest date each source table/view holds.
+
+The registry is derived from config/sql_queries.py rather than hand-listed:
+every `MAX(<date_col>) FROM <table>` in a predefined query names a table the
+agents depend on *and* the column that query treats as "latest". So adding a
+query over a new table automatically brings it under the freshness check.
+Tables the queries read as "latest row" (ORDER BY date DESC) or only through
+a join are added from EXTRA_WATERMARKS.
+
+Tables with no date that moves when their rows change (open trades,
+portfolio, alerts, signal outcomes filled in after the fact) can't be
+watermarked. A query or agent reading one of them has no watermark at all:
+`query_watermark` returns () and callers don't cache it.
+
+All watermarks are resolved in ONE round trip: a single batch builds a
+UNION ALL of `SELECT MAX(col) FROM table` over the registry entries that
+actually exist (OBJECT_ID / COL_LENGTH filter), so a missing table is
+reported as missing instead of failing the whole batch.
+
+The resulting {table: date} map is cached for the run (WATERMARK_CACHE_TTL_SEC)
+and is the shared key for anything that caches query results:
+`query_watermark(sql)` returns the watermarks of the tables a query touches,
+which changes exactly when that query's answer can change.
+
+Usage:
+    from tools.watermarks import get_watermarks, query_watermark
+
+    marks = get_watermarks()          # {'nasdaq_100_hist_data': date(...), ...}
+    key = query_watermark(sql)        # (('nasdaq_100_hist_data', '2026-10-16'),)
+"""
+
+import re
+import threading
+import time
+from datetime import date, datetime
+
+from config import sql_queries
+from config.settings import WATERMARK_CACHE_TTL_SEC
+
+# Friendlier names for the preflight report; anything else shows its table name.
+WATERMARK_LABELS = {
+    "nasdaq_100_hist_data": "NASDAQ prices",
+    "nse_500_hist_data": "NSE prices",
+    "ml_trading_predictions": "NASDAQ ML predictions",
+    "ml_nse_trading_predictions": "NSE ML predictions",
+    "forex_hist_data": "Forex prices",
+    "forex_ml_predictions": "Forex ML predictions",
+    "ai_prediction_history": "AI prediction history",
+    "vw_PowerBI_AI_Technical_Combos": "AI/technical combos",
+    "ml_prediction_summary": "NASDAQ ML run summary",
+    "ml_nse_predict_summary": "NSE ML run summary",
+}
+
+# Read without a MAX() over them, so build_registry can't see their column.
+# A derived entry wins if a query ever adds one.
+EXTRA_WATERMARKS = {
+    "ml_prediction_summary": "run_date",
+    "ml_nse_predict_summary": "analysis_date",
+    "Forex_macd": "trading_date",
+    "Forex_bollingerband": "trading_date",
+    "Forex_stochastic": "trading_date",
+}
+
+# Reference lists (index membership) that don't change what "latest" means;
+# reading them doesn't make a query uncacheable.
+STATIC_TABLES = {"nse_500", "nasdaq_top100"}
+
+_MAX_FROM = re.compile(
+    r"MAX\(\s*(?:\w+\.)?(\w+)\s*\)\s*(?:AS\s+\w+\s*)?FROM\s+(?:\[?dbo\]?\.)?\[?(\w+)\]?",
+    re.IGNORECASE,
+)
+_TABLE_REF = re.compile(r"\b(?:FROM|JOIN)\s+(?:\[?dbo\]?\.)?\[?(\w+)\]?", re.IGNORECASE)
+_CTE_NAME = re.compile(r"(?:\bWITH|,)\s*(\w+)\s+AS\s*\(", re.IGNORECASE)
+
+
+def query_sets() -> dict[str, dict[str, str]]:
+    """Every *_QUERIES dict defined in config/sql_queries.py."""
+    return {
+        name: value for name, value in vars(sql_queries).items()
+        if name.endswith("_QUERIES") and isinstance(value, dict)
+    }
+
+
+def build_registry() -> dict[str, str]:
+    """{table: watermark date column}, derived from the predefined queries.
+
+    If queries disagree on a table's column the most frequently used one wins;
+    EXTRA_WATERMARKS fills in tables no MAX() names.
+    """
+    votes: dict[str, dict[str, int]] = {}
+    for queries in query_sets().values():
+        for sql in queries.values():
+            for column, table in _MAX_FROM.findall(sql):
+                counts = votes.setdefault(table, {})
+                counts[column] = counts.get(column, 0) + 1
+    registry = {table: max(counts, key=counts.get) for table, counts in votes.items()}
+    for table, column in EXTRA_WATERMARKS.items():
+        registry.setdefault(table, column)
+    return dict(sorted(registry.items()))
+
+
+WATERMARK_REGISTRY = build_registry()
+
+
+def watermark_label(table: str) -> str:
+    return WATERMARK_LABELS.get(table, table)
+
+
+def _sql_literal(value: str) -> str:
+    return "N'" + value.replace("'", "''") + "'"
+
+
+def watermark_batch_sql(registry: dict[str, str] | None = None) -> str:
+    """One batch returning (table_name, watermark) for every registry entry
+    whose table and column exist."""
+    registry = WATERMARK_REGISTRY if registry is None else registry
+    values = ",\n        ".join(
+        f"({_sql_literal(t)}, {_sql_literal(c)})" for t, c in registry.items()
+    )
+    return f"""
+    SET NOCOUNT ON;
+    DECLARE @sql NVARCHAR(MAX);
+    SELECT @sql = STRING_AGG(
+        CAST(N'SELECT N''' + t.table_name + N''' AS table_name, '
+             + N'CAST(MAX(' + QUOTENAME(t.date_col) + N') AS DATE) AS watermark '
+             + N'FROM ' + QUOTENAME(t.table_name) AS NVARCHAR(MAX)),
+        N' UNION ALL ')
+    FROM (VALUES
+        {values}
+    ) AS t(table_name, date_col)
+    WHERE OBJECT_ID(t.table_name) IS NOT NULL
+      AND COL_LENGTH(t.table_name, t.date_col) IS NOT NULL;
+    IF @sql IS NOT NULL EXEC sp_executesql @sql;
+    """
+
+
+def _as_date(value):
+    if value is None or (isinstance(value, date) and not isinstance(value, datetime)):
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    return date.fromisoformat(str(value)[:10])
+
+
+def fetch_watermarks(conn, registry: dict[str, str] | None = None) -> dict[str, date | None]:
+    """Resolve every watermark in one round trip.
+
+    Returns {table: latest date}; None means the table holds no rows, and a
+    registry table that doesn't exist (or lacks the column) is absent.
+    """
+    registry = WATERMARK_REGISTRY if registry is None else registry
+    cursor = conn.cursor()
+    try:
+        cursor.execute(watermark_batch_sql(registry))
+        rows = cursor.fetchall() if cursor.description else []
+    finally:
+        cursor.close()
+    return {row[0]: _as_date(row[1]) for row in rows}
+
+
+# ---------------------------------------------------------------------------
+# Run-scoped cache
+# ---------------------------------------------------------------------------
+_cache: dict[str, date | None] | None = None
+_cache_at = 0.0
+_cache_lock = threading.Lock()
+
+
+def get_watermarks(refresh: bool = False, conn=None) -> dict[str, date | None]:
+    """Cached watermark map (reloaded after WATERMARK_CACHE_TTL_SEC or on refresh).
+
+    Uses `conn` if given, otherwise a connection from the shared pool.
+    """
+    global _cache, _cache_at
+    with _cache_lock:
+        fresh = _cache is not None and time.monotonic() - _cache_at <= WATERMARK_CACHE_TTL_SEC
+        if refresh or not fresh:
+            if conn is not None:
+                _cache = fetch_watermarks(conn)
+            else:
+                from tools.db_pool import get_pool
+
+                with get_pool().connection() as pooled:
+                    _cache = fetch_watermarks(pooled)
+            _cache_at = time.monotonic()
+        return dict(_cache)
+
+
+def invalidate() -> None:
+    """Forget the cached map; the next get_watermarks() re-queries."""
+    global _cache
+    with _cache_lock:
+        _cache = None
+
+
+def tables_in(sql: str) -> list[str]:
+    """Registry tables referenced (FROM/JOIN) by a query, sorted."""
+    return sorted({t for t in _TABLE_REF.findall(sql) if t in WATERMARK_REGISTRY})
+
+
+def unwatermarked_tables(sql: str) -> list[str]:
+    """Tables a query reads that no watermark covers (CTE names and
+    STATIC_TABLES excluded), sorted. Non-empty means its result can change
+    without any watermark moving."""
+    return sorted(
+        set(_TABLE_REF.findall(sql)) - set(WATERMARK_REGISTRY)
+        - set(_CTE_NAME.findall(sql)) - STATIC_TABLES
+    )
+
+
+def query_watermark(sql: str, watermarks: dict | None = None) -> tuple:
+    """Cache-key component for a query: ((table, 'YYYY-MM-DD'|None), ...) for
+    the registry tables it reads. Empty tuple — don't cache — if it reads none
+    of them or any table outside the registry."""
+    if unwatermarked_tables(sql):
+        return ()
+    marks = get_watermarks() if watermarks is None else watermarks
+    return tuple(
+        (t, marks[t].isoformat() if marks.get(t) else None) for t in tables_in(sql)
+    )
@@ -19,38 +19,68 @@ Views used (all live in dbo, joined on ticker across weekly fetch_date snapshots
     vw_fair_value_estimates      -> margin_of_safety_pct / valuation_verdict
     vw_dividend_stocks_screen    -> dividend_score     / dividend_category (no market col — derived from ticker suffix: .NS/.BO = NSE)
 
+Each snapshot is also archived locally as Parquet (SCREENING_ARCHIVE_DIR); once
+history accumulates, the prior week comes from the archive instead of SQL and a
+"Score Momentum" sheet adds 4/12/52-week score changes per ticker.
+
 Usage:
     py -3.12 weekly_screening_report.py --market nasdaq
     py -3.12 weekly_screening_report.py --market nse --dry-run
+    py -3.12 weekly_screening_report.py --market nse --workers 1   # sequential
+    py -3.12 weekly_screening_report.py --market nse --single-workbook  # 1 multi-sheet file
+    py -3.12 weekly_screening_report.py --market nse --no-archive       # SQL only
 """
 
 import argparse
 import datetime
 import os
-import smtplib
 import sys
+import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from email.mime.application import MIMEApplication
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
 import pandas as pd
-import pyodbc
 
+from config.recipients import address_message, report_recipients
 from config.settings import (
     EMAIL_FROM,
     EMAIL_FROM_NAME,
-    SMTP_PASSWORD,
-    SMTP_PORT,
-    SMTP_SERVER,
-    SMTP_USERNAME,
-    get_sql_connection_string,
 )
+from tools.db_pool import ConnectionPool
+from tools.excel_export import StreamingWorkbook, read_sql_chunks, write_frames_xlsx
+from tools.outbox import enqueue
+from tools.snapshot_archive import SnapshotArchive
 
 warnings.filterwarnings("ignore", message=".*pandas only supports SQLAlchemy.*")
 
 EXPORT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "exports")
 
+# Views are fetched concurrently, each worker on its own pooled connection.
+# Excel files are written on a separate single writer thread so serialization
+# of one view overlaps with the SQL fetch of the next.
+SCREENING_WORKERS = int(os.getenv("SCREENING_REPORT_WORKERS", "3"))
+
+# Latest snapshots are streamed from SQL in chunks of this many rows straight
+# into a write-only worksheet (tools/excel_export.py); only the few columns the
+# week-over-week diff needs are kept in memory.
+EXPORT_CHUNK_ROWS = int(os.getenv("SCREENING_EXPORT_CHUNK_ROWS", "500"))
+
+# One consolidated multi-sheet workbook per market instead of 14 files.
+SINGLE_WORKBOOK = os.getenv("SCREENING_REPORT_SINGLE_WORKBOOK", "false").lower() == "true"
+
+# Every weekly snapshot is persisted as Parquet under this dir
+# (tools/snapshot_archive.py). Prior-week diffs and 4/12/52-week score momentum
+# are then read from disk instead of re-running the heavy views. Set the env
+# var to an empty string to disable.
+ARCHIVE_DIR = os.getenv(
+    "SCREENING_ARCHIVE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "archive", "screening"),
+)
+MOMENTUM_WEEKS = (4, 12, 52)
+
 # Ticker suffix used to tell NSE apart from NASDAQ in the 2 views that don't
 # carry their own `market` column (fundamental scoring, dividend screen).
 # nse_500 tickers are 100% covered by .NS (2071) or the one legacy .BO ticker
@@ -63,12 +93,14 @@ MARKET_CONFIG = {
         "market_name": "NASDAQ 100",
         "from_name": "NASDAQ Weekly Screening Report",
         "recipients_env": "SCREENING_REPORT_EMAIL_TO_NASDAQ",
+        "briefing_type": "screening_nasdaq",
     },
     "nse": {
         "market_value": "NSE",
         "market_name": "NSE 500",
         "from_name": "NSE Weekly Screening Report",
         "recipients_env": "SCREENING_REPORT_EMAIL_TO_NSE",
+        "briefing_type": "screening_nse",
     },
 }
 
@@ -95,70 +127,107 @@ VIEWS = [
 # ---------------------------------------------------------------------------
 # SQL access
 # ---------------------------------------------------------------------------
-def _connect():
-    return pyodbc.connect(get_sql_connection_string())
-
-
 def _market_expr(view_cfg):
     return "market" if view_cfg["has_market_col"] else MARKET_EXPR_DERIVED
 
 
 def get_snapshot_dates(conn, view_cfg, market_value):
     """Return (latest_date, prev_date) for this view+market. prev_date is None
-    if this is the first snapshot on record (no week-over-week comparison yet)."""
+    if this is the first snapshot on record (no week-over-week comparison yet).
+
+    One TOP 2 over the distinct fetch_dates instead of two MAX() queries — the
+    views are expensive window-function views, so every extra scan counts."""
     expr = _market_expr(view_cfg)
     cur = conn.cursor()
-    cur.execute(f"SELECT MAX(fetch_date) FROM [dbo].[{view_cfg['view']}] WHERE {expr} = ?", market_value)
-    latest = cur.fetchone()[0]
-    if latest is None:
-        cur.close()
-        return None, None
     cur.execute(
-        f"SELECT MAX(fetch_date) FROM [dbo].[{view_cfg['view']}] WHERE {expr} = ? AND fetch_date < ?",
-        market_value, latest,
+        f"SELECT DISTINCT TOP 2 fetch_date FROM [dbo].[{view_cfg['view']}] "
+        f"WHERE {expr} = ? ORDER BY fetch_date DESC",
+        market_value,
     )
-    prev = cur.fetchone()[0]
+    dates = [r[0] for r in cur.fetchall()]
     cur.close()
-    return latest, prev
+    if not dates:
+        return None, None
+    return dates[0], (dates[1] if len(dates) > 1 else None)
 
 
-def fetch_latest_snapshot(conn, view_cfg, market_value, latest_date):
-    """Full latest-week snapshot for this view+market, best score first."""
+def fetch_latest_snapshot(conn, view_cfg, market_value, latest_date, chunksize=None):
+    """Full latest-week snapshot for this view+market, best score first.
+
+    With chunksize, returns an iterator of DataFrame chunks instead."""
     expr = _market_expr(view_cfg)
     select_cols = "*" if view_cfg["has_market_col"] else f"*, {MARKET_EXPR_DERIVED} AS market"
     sql = (
         f"SELECT {select_cols} FROM [dbo].[{view_cfg['view']}] "
         f"WHERE {expr} = ? AND fetch_date = ? ORDER BY {view_cfg['score_col']} DESC"
     )
+    if chunksize:
+        return read_sql_chunks(sql, conn, params=[market_value, latest_date], chunksize=chunksize)
     return pd.read_sql(sql, conn, params=[market_value, latest_date])
 
 
-def fetch_score_changes(conn, view_cfg, market_value, latest_date, prev_date):
-    """Tickers present in both the latest and prior snapshot, with score_change
-    (latest score - prior score) computed. Empty if there's no prior snapshot."""
+def fetch_prior_scores(conn, view_cfg, market_value, prev_date):
+    """Prior-week (ticker, prev_score) only — the narrowest read that still
+    lets the week-over-week change be computed. Empty if there's no prior
+    snapshot."""
     if prev_date is None:
-        return pd.DataFrame()
+        return pd.DataFrame(columns=["ticker", "prev_score"])
     expr = _market_expr(view_cfg)
     score = view_cfg["score_col"]
-    cat = view_cfg["category_col"]
-    select_cols = "*" if view_cfg["has_market_col"] else f"*, {MARKET_EXPR_DERIVED} AS market"
-    sql = f"""
-        WITH latest AS (
-            SELECT {select_cols} FROM [dbo].[{view_cfg['view']}]
-            WHERE {expr} = ? AND fetch_date = ? AND {score} IS NOT NULL
-        ),
-        prior AS (
-            SELECT ticker, {score} AS prev_score
-            FROM [dbo].[{view_cfg['view']}]
-            WHERE {expr} = ? AND fetch_date = ? AND {score} IS NOT NULL
-        )
-        SELECT l.ticker, l.company_name, l.market, l.{cat} AS category,
-               p.prev_score AS prev_score, l.{score} AS latest_score,
-               (l.{score} - p.prev_score) AS score_change
-        FROM latest l
-        INNER JOIN prior p ON l.ticker = p.ticker
-    """
-    return pd.read_sql(sql, conn, params=[market_value, latest_date, market_value, prev_date])
+    sql = (
+        f"SELECT ticker, {score} AS prev_score FROM [dbo].[{view_cfg['view']}] "
+        f"WHERE {expr} = ? AND fetch_date = ? AND {score} IS NOT NULL"
+    )
+    return pd.read_sql(sql, conn, params=[market_value, prev_date])
+
+
+def _diff_columns(view_cfg):
+    """Latest-snapshot columns compute_score_changes needs."""
+    return ["ticker", "company_name", "market", view_cfg["category_col"], view_cfg["score_col"]]
+
+
+def compute_score_changes(snap_df, prior_df, view_cfg):
+    """Tickers present in both the latest and prior snapshot, with score_change
+    (latest score - prior score) computed from the already-loaded latest
+    snapshot. Empty if there's no prior snapshot."""
+    if snap_df.empty or prior_df.empty:
+        return pd.DataFrame()
+    score = view_cfg["score_col"]
+    latest = snap_df.loc[snap_df[score].notna(), _diff_columns(view_cfg)]
+    latest = latest.rename(columns={view_cfg["category_col"]: "category", score: "latest_score"})
+    chg = latest.merge(prior_df, on="ticker", how="inner")
+    chg["score_change"] = chg["latest_score"] - chg["prev_score"]
+    return chg[["ticker", "company_name", "market", "category",
+                "prev_score", "latest_score", "score_change"]]
+
+
+def compute_momentum(archive, market_key, view_cfg, latest_date, snap_df):
+    """Latest score vs. the archived snapshot ~N weeks back, per MOMENTUM_WEEKS.
+
+    Returns (momentum_df, windows) where windows lists the week counts that
+    had an archived snapshot. momentum_df is empty when none did."""
+    if archive is None or not archive.available or snap_df.empty:
+        return pd.DataFrame(), []
+    score = view_cfg["score_col"]
+    out = snap_df[_diff_columns(view_cfg)].rename(
+        columns={view_cfg["category_col"]: "category", score: "latest_score"}
+    )
+    windows = []
+    for weeks in MOMENTUM_WEEKS:
+        past_date = archive.nearest(market_key, view_cfg["key"],
+                                    latest_date - datetime.timedelta(weeks=weeks))
+        if past_date is None:
+            continue
+        past = archive.read(market_key, view_cfg["key"], past_date, columns=["ticker", score])
+        past = past.rename(columns={score: "past_score"}).drop_duplicates("ticker")
+        out = out.merge(past, on="ticker", how="left")
+        out[f"score_chg_{weeks}w"] = out["latest_score"] - out["past_score"]
+        out = out.drop(columns="past_score")
+        windows.append(weeks)
+    if not windows:
+        return pd.DataFrame(), []
+    out = out.sort_values(f"score_chg_{windows[0]}w", ascending=False, na_position="last")
+    return out, windows
 
 
 # ---------------------------------------------------------------------------
@@ -168,35 +237,90 @@ def _safe_name(label):
     return label.replace(" ", "_")
 
 
-def write_full_snapshot_xlsx(df, market_key, view_cfg, latest_date):
+def _snapshot_path(market_key, view_cfg, latest_date):
     fname = f"{market_key.upper()}_{_safe_name(view_cfg['label'])}_{latest_date}.xlsx"
-    path = os.path.join(EXPORT_DIR, fname)
-    df.to_excel(path, index=False, sheet_name=view_cfg["label"][:31])
-    return path
+    return os.path.join(EXPORT_DIR, fname)
 
 
-def write_top10_xlsx(chg_df, market_key, view_cfg, latest_date):
+def _top10_path(market_key, view_cfg, latest_date):
     fname = f"{market_key.upper()}_{_safe_name(view_cfg['label'])}_Top10_{latest_date}.xlsx"
-    path = os.path.join(EXPORT_DIR, fname)
+    return os.path.join(EXPORT_DIR, fname)
+
+
+def _consolidated_path(market_key, run_date):
+    return os.path.join(EXPORT_DIR, f"{market_key.upper()}_Weekly_Screening_{run_date}.xlsx")
+
+
+def _snapshot_title(view_cfg):
+    return view_cfg["label"]
+
+
+def _top10_titles(view_cfg, consolidated):
+    """Sheet titles for the gain/loss tables — prefixed by view in the
+    consolidated workbook so 7 views can share one file."""
+    if not consolidated:
+        return "Top 10 Gain", "Top 10 Loss"
+    prefix = view_cfg["key"].title()
+    return f"{prefix} Top 10 Gain", f"{prefix} Top 10 Loss"
+
+
+def _momentum_title(view_cfg, consolidated):
+    return f"{view_cfg['key'].title()} Score Momentum" if consolidated else "Score Momentum"
+
+
+def _top10_frames(chg_df):
     if chg_df.empty:
-        gain_df, loss_df = chg_df, chg_df
-    else:
-        gain_df = chg_df.sort_values("score_change", ascending=False).head(10)
-        loss_df = chg_df.sort_values("score_change", ascending=True).head(10)
-    with pd.ExcelWriter(path, engine="openpyxl") as writer:
-        gain_df.to_excel(writer, index=False, sheet_name="Top 10 Gain")
-        loss_df.to_excel(writer, index=False, sheet_name="Top 10 Loss")
-    return path
+        return chg_df, chg_df
+    gain_df = chg_df.sort_values("score_change", ascending=False).head(10)
+    loss_df = chg_df.sort_values("score_change", ascending=True).head(10)
+    return gain_df, loss_df
+
+
+def write_full_snapshot_xlsx(df, market_key, view_cfg, latest_date):
+    path = _snapshot_path(market_key, view_cfg, latest_date)
+    return write_frames_xlsx(path, {_snapshot_title(view_cfg): df})
+
+
+def write_top10_xlsx(chg_df, market_key, view_cfg, latest_date, book=None, momentum_df=None):
+    """Gain/loss workbook for one view, plus a Score Momentum sheet when
+    archived history exists. With `book` (the consolidated workbook) the
+    sheets are appended there and None is returned."""
+    gain_df, loss_df = _top10_frames(chg_df)
+    consolidated = book is not None
+    gain_title, loss_title = _top10_titles(view_cfg, consolidated)
+    sheets = [(gain_title, gain_df), (loss_title, loss_df)]
+    if momentum_df is not None and not momentum_df.empty:
+        sheets.append((_momentum_title(view_cfg, consolidated), momentum_df))
+    if consolidated:
+        for title, df in sheets:
+            book.append_frame(title, df)
+        return None
+    path = _top10_path(market_key, view_cfg, latest_date)
+    return write_frames_xlsx(path, sheets)
 
 
 # ---------------------------------------------------------------------------
 # Email
 # ---------------------------------------------------------------------------
 def get_recipients(cfg):
-    return [addr.strip() for addr in os.getenv(cfg["recipients_env"], "").split(",") if addr.strip()]
+    """TO/CC/BCC from email_recipients (briefing_type), else the market's env var."""
+    return report_recipients(cfg["briefing_type"], cfg["recipients_env"])
+
+
+def build_timings_html(summary_rows, total_sec):
+    """Small footer line: SQL fetch / Excel write seconds per view."""
+    parts = [
+        f"{r['label']}: SQL {r['sql_sec']:.1f}s / Excel {r['xlsx_sec']:.1f}s"
+        for r in summary_rows
+    ]
+    return (
+        f"Run time {total_sec:.1f}s &mdash; " + " &middot; ".join(parts)
+    )
 
 
-def build_summary_html(cfg, summary_rows):
+def build_summary_html(cfg, summary_rows, timings_html="", consolidated=False):
+    layout = ("one workbook with a sheet per table" if consolidated
+              else "2 files per view, 14 attachments total")
     rows_html = ""
     for r in summary_rows:
         rows_html += f"""
@@ -207,14 +331,15 @@ def build_summary_html(cfg, summary_rows):
           <td style="padding:8px;border-bottom:1px solid #eee;">{r['prev_date'] or '—'}</td>
           <td style="padding:8px;border-bottom:1px solid #eee;color:#27ae60;">{r['top_gainer']}</td>
           <td style="padding:8px;border-bottom:1px solid #eee;color:#e74c3c;">{r['top_loser']}</td>
+          <td style="padding:8px;border-bottom:1px solid #eee;text-align:center;">{r['momentum']}</td>
         </tr>"""
 
     return f"""
     <html><body style="font-family:'Segoe UI',Arial,sans-serif;color:#2c3e50;">
       <h2 style="color:#2c3e50;">{cfg['market_name']} Weekly Stock Screening Report</h2>
       <p>Attached: the latest weekly snapshot and a week-over-week Top 10 Score
-         Gain / Top 10 Score Loss workbook for each of 7 fundamental screening
-         views &mdash; 2 files per view, 14 attachments total. Gain/loss is ranked
+         Gain / Top 10 Score Loss table for each of 7 fundamental screening
+         views &mdash; {layout}. Gain/loss is ranked
          by the change in each view's own score (e.g. growth_score, value_score)
          between this week's and last week's snapshot.</p>
       <table style="border-collapse:collapse;width:100%;font-size:13px;">
@@ -226,6 +351,7 @@ def build_summary_html(cfg, summary_rows):
             <th style="padding:8px;">Prior Snapshot</th>
             <th style="padding:8px;">Top Score Gainer (WoW)</th>
             <th style="padding:8px;">Top Score Loser (WoW)</th>
+            <th style="padding:8px;">Momentum History</th>
           </tr>
         </thead>
         <tbody>{rows_html}</tbody>
@@ -233,13 +359,14 @@ def build_summary_html(cfg, summary_rows):
       <p style="color:#7f8c8d;font-size:12px;margin-top:16px;">
         Generated {datetime.datetime.now().strftime('%Y-%m-%d %H:%M')}
       </p>
+      <p style="color:#95a5a6;font-size:11px;">{timings_html}</p>
     </body></html>
     """
 
 
 def send_email(cfg, subject, html_body, attachment_paths):
     recipients = get_recipients(cfg)
-    if not recipients:
+    if not any(recipients.values()):
         raise RuntimeError(
             f"No recipients configured for {cfg['market_name']}. "
             f"Set {cfg['recipients_env']} in .env (comma-separated)."
@@ -249,7 +376,7 @@ def send_email(cfg, subject, html_body, attachment_paths):
     msg = MIMEMultipart("mixed")
     msg["Subject"] = subject
     msg["From"] = f"{display_name} <{EMAIL_FROM}>" if display_name else EMAIL_FROM
-    msg["To"] = ", ".join(recipients)
+    all_recipients = address_message(msg, recipients)
 
     body_part = MIMEMultipart("alternative")
     body_part.attach(MIMEText(html_body, "html"))
@@ -261,64 +388,225 @@ def send_email(cfg, subject, html_body, attachment_paths):
         part["Content-Disposition"] = f'attachment; filename="{os.path.basename(path)}"'
         msg.attach(part)
 
-    with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-        server.ehlo()
-        server.starttls()
-        server.ehlo()
-        server.login(SMTP_USERNAME, SMTP_PASSWORD)
-        server.sendmail(EMAIL_FROM, recipients, msg.as_string())
-    return len(recipients)
+    enqueue(msg, all_recipients)
+    return len(all_recipients)
 
 
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
-def run(market, dry_run=False):
+def _frame_chunks(df, chunksize):
+    for i in range(0, max(len(df), 1), chunksize):
+        yield df.iloc[i:i + chunksize]
+
+
+def _read_archived_prior(archive, market, vcfg, prev_date):
+    score = vcfg["score_col"]
+    prior = archive.read(market, vcfg["key"], prev_date, columns=["ticker", score])
+    prior = prior.rename(columns={score: "prev_score"})
+    return prior[prior["prev_score"].notna()]
+
+
+def fetch_view(pool, market, vcfg, market_value, book=None, archive=None):
+    """Data half of one view: snapshot dates, latest snapshot, prior scores.
+
+    Runs on a worker thread with its own pooled connection. The latest
+    snapshot is streamed in EXPORT_CHUNK_ROWS chunks straight into its
+    worksheet — into `book` (the consolidated workbook) when given, otherwise
+    into this view's own file. Only the diff columns stay in memory.
+
+    With an `archive`, snapshots already on disk (the prior week, or the
+    latest one on a re-run) are read from Parquet instead of the view, and a
+    freshly fetched latest snapshot is archived for next week — chunk by
+    chunk as it streams, so archiving doesn't hold it in memory either.
+
+    Returns None if the view has no data for this market.
+    """
+    start = time.perf_counter()
+    xlsx_sec = 0.0
+    snap_path = None
+    use_archive = archive is not None and archive.available
+    with pool.connection() as conn:
+        latest_date, prev_date = get_snapshot_dates(conn, vcfg, market_value)
+        if latest_date is None:
+            return None
+
+        latest_archived = use_archive and archive.has(market, vcfg["key"], latest_date)
+        if latest_archived:
+            chunks = _frame_chunks(archive.read(market, vcfg["key"], latest_date), EXPORT_CHUNK_ROWS)
+        else:
+            chunks = fetch_latest_snapshot(conn, vcfg, market_value, latest_date,
+                                           chunksize=EXPORT_CHUNK_ROWS)
+        archive_out = (archive.writer(market, vcfg["key"], latest_date)
+                       if use_archive and not latest_archived else None)
+
+        target = book or StreamingWorkbook(_snapshot_path(market, vcfg, latest_date))
+        title = _snapshot_title(vcfg)
+        diff_cols = _diff_columns(vcfg)
+        row_count = 0
+        diff_parts = []
+        try:
+            for chunk in chunks:
+                t = time.perf_counter()
+                row_count += target.append_frame(title, chunk)
+                xlsx_sec += time.perf_counter() - t
+                diff_parts.append(chunk[diff_cols])
+                if archive_out is not None:
+                    try:
+                        archive_out.append(chunk)
+                    except Exception as e:
+                        # The archive is an optimisation — never fail the report over it.
+                        print(f"[{market}] WARNING: could not archive {vcfg['label']} snapshot: {e}")
+                        archive_out.abort()
+                        archive_out = None
+        except BaseException:
+            if archive_out is not None:
+                archive_out.abort()
+            raise
+        if book is None:
+            t = time.perf_counter()
+            snap_path = target.save()
+            xlsx_sec += time.perf_counter() - t
+
+        prior_archived = (prev_date is not None and use_archive
+                          and archive.has(market, vcfg["key"], prev_date))
+        if prior_archived:
+            prior_df = _read_archived_prior(archive, market, vcfg, prev_date)
+        else:
+            prior_df = fetch_prior_scores(conn, vcfg, market_value, prev_date)
+
+    if archive_out is not None:
+        try:
+            archive_out.close()
+        except Exception as e:
+            archive_out.abort()
+            print(f"[{market}] WARNING: could not archive {vcfg['label']} snapshot: {e}")
+
+    snap_df = pd.concat(diff_parts, ignore_index=True) if diff_parts else pd.DataFrame(columns=diff_cols)
+    chg_df = compute_score_changes(snap_df, prior_df, vcfg)
+    momentum_df, momentum_weeks = compute_momentum(
+        archive if use_archive else None, market, vcfg, latest_date, snap_df)
+    return {
+        "latest_date": latest_date,
+        "prev_date": prev_date,
+        "row_count": row_count,
+        "snap_path": snap_path,
+        "chg_df": chg_df,
+        "momentum_df": momentum_df,
+        "momentum_weeks": momentum_weeks,
+        "source": f"latest={'archive' if latest_archived else 'sql'} "
+                  f"prior={'archive' if prior_archived else 'sql'}",
+        "sql_sec": time.perf_counter() - start - xlsx_sec,
+        "stream_xlsx_sec": xlsx_sec,
+    }
+
+
+def write_view_files(market, vcfg, fetched, book=None):
+    """Excel half of one view (the Top 10 gain/loss tables; the snapshot was
+    already streamed by fetch_view). Returns (paths, seconds)."""
+    start = time.perf_counter()
+    paths = [fetched["snap_path"]] if fetched["snap_path"] else []
+    top10 = write_top10_xlsx(fetched["chg_df"], market, vcfg, fetched["latest_date"],
+                             book=book, momentum_df=fetched["momentum_df"])
+    if top10:
+        paths.append(top10)
+    return paths, time.perf_counter() - start + fetched["stream_xlsx_sec"]
+
+
+def _summary_row(vcfg, fetched, xlsx_sec):
+    chg_df = fetched["chg_df"]
+    if not chg_df.empty:
+        top_gainer = chg_df.sort_values("score_change", ascending=False).iloc[0]
+        top_loser = chg_df.sort_values("score_change", ascending=True).iloc[0]
+        gainer_txt = f"{top_gainer['ticker']} (+{top_gainer['score_change']:.1f})"
+        loser_txt = f"{top_loser['ticker']} ({top_loser['score_change']:.1f})"
+    else:
+        gainer_txt = loser_txt = "n/a (no prior snapshot)"
+
+    return {
+        "label": vcfg["label"],
+        "latest_date": fetched["latest_date"],
+        "prev_date": fetched["prev_date"],
+        "row_count": fetched["row_count"],
+        "top_gainer": gainer_txt,
+        "top_loser": loser_txt,
+        "momentum": " / ".join(f"{w}w" for w in fetched["momentum_weeks"]) or "—",
+        "sql_sec": fetched["sql_sec"],
+        "xlsx_sec": xlsx_sec,
+    }
+
+
+def run(market, dry_run=False, workers=SCREENING_WORKERS, single_workbook=SINGLE_WORKBOOK,
+        archive_dir=ARCHIVE_DIR):
     cfg = MARKET_CONFIG[market]
     market_value = cfg["market_value"]
     os.makedirs(EXPORT_DIR, exist_ok=True)
 
-    conn = _connect()
-    attachments = []
-    summary_rows = []
-    try:
+    run_start = time.perf_counter()
+    workers = max(1, min(workers, len(VIEWS)))
+    pool = ConnectionPool(max_size=workers)
+
+    archive = SnapshotArchive(archive_dir) if archive_dir else None
+    if archive is not None and not archive.available:
+        print(f"[{market}] WARNING: pyarrow not installed — snapshot archive disabled, "
+              f"all snapshots read from SQL.")
+
+    book = None
+    if single_workbook:
+        book = StreamingWorkbook(_consolidated_path(market, datetime.date.today()))
+        titles = []
         for vcfg in VIEWS:
-            latest_date, prev_date = get_snapshot_dates(conn, vcfg, market_value)
-            if latest_date is None:
-                print(f"[{market}] {vcfg['label']}: no data available, skipping.")
-                continue
-
-            snap_df = fetch_latest_snapshot(conn, vcfg, market_value, latest_date)
-            attachments.append(write_full_snapshot_xlsx(snap_df, market, vcfg, latest_date))
-
-            chg_df = fetch_score_changes(conn, vcfg, market_value, latest_date, prev_date)
-            attachments.append(write_top10_xlsx(chg_df, market, vcfg, latest_date))
-
-            if not chg_df.empty:
-                top_gainer = chg_df.sort_values("score_change", ascending=False).iloc[0]
-                top_loser = chg_df.sort_values("score_change", ascending=True).iloc[0]
-                gainer_txt = f"{top_gainer['ticker']} (+{top_gainer['score_change']:.1f})"
-                loser_txt = f"{top_loser['ticker']} ({top_loser['score_change']:.1f})"
-            else:
-                gainer_txt = loser_txt = "n/a (no prior snapshot)"
-
-            summary_rows.append({
-                "label": vcfg["label"],
-                "latest_date": latest_date,
-                "prev_date": prev_date,
-                "row_count": len(snap_df),
-                "top_gainer": gainer_txt,
-                "top_loser": loser_txt,
-            })
-            print(f"[{market}] {vcfg['label']}: latest={latest_date} prev={prev_date} rows={len(snap_df)}")
+            titles.append(_snapshot_title(vcfg))
+            titles.extend(_top10_titles(vcfg, consolidated=True))
+            titles.append(_momentum_title(vcfg, consolidated=True))
+        book.reserve_sheets(titles)
+
+    # Results are collected per view key and re-assembled in VIEWS order so the
+    # email table and attachment list don't depend on completion order.
+    fetched_by_key = {}
+    write_futures = {}
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sql") as sql_pool, \
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix="xlsx") as xlsx_pool:
+            sql_futures = {
+                sql_pool.submit(fetch_view, pool, market, vcfg, market_value, book, archive): vcfg
+                for vcfg in VIEWS
+            }
+            for fut in as_completed(sql_futures):
+                vcfg = sql_futures[fut]
+                fetched = fut.result()
+                if fetched is None:
+                    print(f"[{market}] {vcfg['label']}: no data available, skipping.")
+                    continue
+                fetched_by_key[vcfg["key"]] = fetched
+                write_futures[vcfg["key"]] = xlsx_pool.submit(
+                    write_view_files, market, vcfg, fetched, book)
+                print(f"[{market}] {vcfg['label']}: latest={fetched['latest_date']} "
+                      f"prev={fetched['prev_date']} rows={fetched['row_count']} "
+                      f"sql={fetched['sql_sec']:.1f}s ({fetched['source']})")
+
+            attachments = []
+            summary_rows = []
+            for vcfg in VIEWS:
+                if vcfg["key"] not in fetched_by_key:
+                    continue
+                paths, xlsx_sec = write_futures[vcfg["key"]].result()
+                attachments.extend(paths)
+                summary_rows.append(_summary_row(vcfg, fetched_by_key[vcfg["key"]], xlsx_sec))
+        if book is not None and summary_rows:
+            attachments.append(book.save())
     finally:
-        conn.close()
+        pool.close_all()
 
     if not summary_rows:
         print(f"[{market}] No data available for any screening view. Aborting.")
         return 1
 
-    html = build_summary_html(cfg, summary_rows)
+    total_sec = time.perf_counter() - run_start
+    print(f"[{market}] {len(summary_rows)} views processed in {total_sec:.1f}s "
+          f"with {workers} worker(s)")
+    html = build_summary_html(cfg, summary_rows, build_timings_html(summary_rows, total_sec),
+                              consolidated=book is not None)
     overall_date = summary_rows[0]["latest_date"]
     subject = f"{cfg['market_name']} Weekly Stock Screening Report — {overall_date.strftime('%b %d, %Y')}"
 
@@ -332,12 +620,14 @@ def run(market, dry_run=False):
     try:
         n = send_email(cfg, subject, html, attachments)
     except Exception as e:
-        print(f"[{market}] ERROR sending email: {e}")
+        print(f"[{market}] ERROR queueing email: {e}")
         print(f"[{market}] Attachments NOT deleted — left in {EXPORT_DIR} for retry.")
         return 1
 
-    print(f"[{market}] Email sent to {n} recipients with {len(attachments)} attachments: {subject}")
+    print(f"[{market}] Email queued for {n} recipients with {len(attachments)} attachments: {subject}")
 
+    # The spooled message carries its own copy of the attachments, so the
+    # exports can go now; delivery retries are the outbox's job.
     for p in attachments:
         try:
             os.remove(p)
@@ -355,8 +645,16 @@ def main():
                          help="Which market to report on.")
     parser.add_argument("--dry-run", action="store_true",
                          help="Write Excel files to exports/ and skip sending/deleting.")
+    parser.add_argument("--workers", type=int, default=SCREENING_WORKERS,
+                         help=f"Views fetched concurrently (default: {SCREENING_WORKERS}).")
+    parser.add_argument("--single-workbook", action="store_true", default=SINGLE_WORKBOOK,
+                         help="Attach one multi-sheet workbook instead of 2 files per view.")
+    parser.add_argument("--no-archive", action="store_true",
+                         help="Skip the local Parquet snapshot archive (read everything from SQL).")
     args = parser.parse_args()
-    sys.exit(run(args.market, dry_run=args.dry_run))
+    sys.exit(run(args.market, dry_run=args.dry_run, workers=args.workers,
+                 single_workbook=args.single_workbook,
+                 archive_dir=None if args.no_archive else ARCHIVE_DIR))
 
 
 if __name__ == "__main__":